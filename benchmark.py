@@ -0,0 +1,319 @@
+"""Набор тестов производительности для горячих путей геометрии и отрисовки
+
+Запуск:
+    python benchmark.py --output bench.json
+    python benchmark.py --quick --baseline bench.json --tolerance 0.25
+
+Работает без дисплея (видеодрайвер SDL "dummy"). Результаты пишутся в JSON
+вместе с кривыми масштабирования по числу граней; с --baseline скрипт
+завершается с кодом 1, если какой-либо замер медленнее базового больше
+чем на tolerance.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pygame
+from parallel import ParallelEngine
+from polyhedron import Polyhedron
+from transformations import rotation_x_matrix, rotation_y_matrix, translation_matrix
+from visualizer import Visualizer
+
+PLATONIC = [
+    ("tetrahedron", Polyhedron.create_tetrahedron),
+    ("hexahedron", Polyhedron.create_hexahedron),
+    ("octahedron", Polyhedron.create_octahedron),
+    ("icosahedron", Polyhedron.create_icosahedron),
+    ("dodecahedron", Polyhedron.create_dodecahedron),
+]
+
+def measure(func, min_time=0.2, max_repeats=50):
+    """Время выполнения func: лучшее и медианное по нескольким повторам"""
+    times = []
+    total = 0.0
+    while len(times) < max_repeats and (total < min_time or len(times) < 3):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+        if elapsed > min_time:
+            break
+    return {"best": min(times), "median": float(np.median(times)), "repeats": len(times)}
+
+def mesh_suite(max_faces):
+    """Сетки для замеров: пять Платоновых тел и разбиения икосаэдра"""
+    meshes = [(name, factory()) for name, factory in PLATONIC]
+    level = 1
+    while 20 * 4 ** level <= max_faces:
+        meshes.append((f"geodesic-{level}", Polyhedron.create_geodesic_sphere(level)))
+        level += 1
+    return meshes
+
+def run_benchmarks(max_faces, max_draw_faces, max_point_faces):
+    results = []
+    
+    def record(name, mesh_name, mesh, timing):
+        entry = {"benchmark": name, "mesh": mesh_name,
+                 "vertices": int(len(mesh.vertex_array)) if mesh is not None else 0,
+                 "faces": int(len(mesh.face_offsets) - 1) if mesh is not None else 0}
+        entry.update(timing)
+        results.append(entry)
+        print(f"{name:28s} {mesh_name:16s} {entry['faces']:>9d} faces  "
+              f"{timing['best'] * 1e3:10.3f} ms (x{timing['repeats']})")
+    
+    for name, factory in PLATONIC:
+        record("create", name, factory(), measure(factory))
+    level = 1
+    while 20 * 4 ** level <= max_faces:
+        mesh = Polyhedron.create_geodesic_sphere(level)
+        record("create_geodesic_sphere", f"geodesic-{level}", mesh,
+               measure(lambda: Polyhedron.create_geodesic_sphere(level), max_repeats=10))
+        level += 1
+    
+    # Время до первого кадра: новый процесс main.py, выход после одного кадра
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    record("startup_first_frame", "tetrahedron", None,
+           measure(lambda: subprocess.run([sys.executable, script, "--frames", "1"],
+                                          check=True, stdout=subprocess.DEVNULL),
+                   min_time=1.0, max_repeats=5))
+    
+    pygame.init()
+    window = Visualizer(640, 480)
+    headless = Visualizer(640, 480, backend="headless")
+    for visualizer in (window, headless):
+        # Замеряется отрисовка самой сетки; фоновая сборка пирамиды
+        # детализации меняла бы рисуемый уровень посреди замера
+        visualizer.lod_enabled = False
+    
+    # Задержка переключения многогранника клавишей: фабрика и новый кадр
+    for name, factory in PLATONIC:
+        def switch():
+            window.set_polyhedron(factory(), name)
+            window.draw_frame()
+        
+        record("switch_polyhedron", name, factory(), measure(switch))
+    matrix = rotation_x_matrix(1.0) @ rotation_y_matrix(2.0) @ translation_matrix(0.01, 0, 0)
+    
+    for mesh_name, mesh in mesh_suite(max_faces):
+        faces = len(mesh.face_offsets) - 1
+        
+        def transform_lazy():
+            mesh.apply_transform(matrix)
+            mesh.vertex_array
+        
+        eager = Polyhedron.from_arrays(mesh.vertex_array.copy(), mesh.face_index,
+                                       mesh.face_offsets, lazy=False)
+        record("apply_transform", mesh_name, mesh, measure(transform_lazy))
+        record("apply_transform_eager", mesh_name, mesh, measure(lambda: eager.apply_transform(matrix)))
+        
+        def center():
+            mesh.apply_transform(matrix)
+            mesh.calculate_center()
+        
+        record("calculate_center", mesh_name, mesh, measure(center))
+        vertex_array = mesh.vertex_array
+        for projection in ("axonometric", "perspective"):
+            window.projection_type = projection
+            record(f"project_vertices_{projection}", mesh_name, mesh,
+                   measure(lambda: window.project_vertices(vertex_array)))
+        if faces <= max_point_faces:
+            points = list(mesh.vertices)
+            record("project_point_loop", mesh_name, mesh,
+                   measure(lambda: [window.project_point(p) for p in points]))
+        
+        if faces <= max_draw_faces:
+            for label, visualizer in (("draw_polyhedron_pygame", window),
+                                      ("draw_polyhedron_headless", headless)):
+                visualizer.projection_type = "perspective"
+                visualizer.set_polyhedron(mesh, mesh_name)
+                record(label, mesh_name, mesh, measure(visualizer.draw_polyhedron, max_repeats=20))
+    pygame.quit()
+    return results
+
+def scaling_curves(results):
+    """Кривые время(число граней) и показатель степени по log-log регрессии"""
+    curves = {}
+    for name in sorted({r["benchmark"] for r in results}):
+        points = sorted((r["faces"], r["best"]) for r in results
+                        if r["benchmark"] == name and r["mesh"].startswith("geodesic"))
+        if len(points) < 2:
+            continue
+        faces, seconds = np.array(points, dtype=float).T
+        exponent = np.polyfit(np.log(faces), np.log(np.maximum(seconds, 1e-12)), 1)[0]
+        curves[name] = {"faces": faces.astype(int).tolist(), "seconds": seconds.tolist(),
+                        "exponent": float(exponent)}
+    return curves
+
+def parallel_scaling(vertex_count, max_processes):
+    """Время преобразования и проекции vertex_count вершин в ParallelEngine
+    для числа процессов 1, 2, 4, ... max_processes и ускорение относительно одного"""
+    vertices = np.random.default_rng(0).uniform(-1, 1, size=(vertex_count, 3))
+    matrix = rotation_x_matrix(1.0) @ rotation_y_matrix(2.0)
+    counts = sorted({min(2 ** i, max_processes) for i in range(max_processes.bit_length() + 1)})
+    seconds = []
+    for processes in counts:
+        with ParallelEngine(processes, threshold=0) as engine:
+            shared = engine.share(vertices)
+            
+            def step():
+                engine.transform(shared, matrix)
+                engine.project(shared.array, "perspective", 1000, 700)
+            
+            step()  # запуск пула и подключение разделяемой памяти
+            seconds.append(measure(step, max_repeats=5)["best"])
+        print(f"parallel_transform_project  {processes:3d} processes {vertex_count:>10d} vertices "
+              f"{seconds[-1] * 1e3:10.3f} ms (x{seconds[0] / seconds[-1]:.2f})")
+    return {"vertices": vertex_count, "processes": counts, "seconds": seconds,
+            "speedup": [seconds[0] / t for t in seconds]}
+
+def memory_footprint(max_faces):
+    """Память (memory_usage) самой большой геодезической сферы в float64 и float32
+    после одного кадра: вершины, грани, топология и кэши, байт на вершину"""
+    level = 1
+    while 20 * 4 ** (level + 1) <= max_faces:
+        level += 1
+    mesh = Polyhedron.create_geodesic_sphere(level)
+    report = {"mesh": f"geodesic-{level}", "faces": len(mesh.face_offsets) - 1}
+    for dtype in (np.float64, np.float32):
+        copy = mesh.astype(dtype)
+        copy.apply_transform(rotation_x_matrix(10.0))
+        copy.vertex_array, copy.face_normals, copy.face_centroids, copy.get_edges()
+        usage = copy.memory_usage()
+        usage["bytes_per_vertex"] = usage["total"] / len(copy.base_vertices)
+        report[np.dtype(dtype).name] = usage
+        print(f"memory_usage {np.dtype(dtype).name:8s} {report['mesh']:>15s} "
+              f"{usage['total'] / 2**20:10.1f} MiB ({usage['bytes_per_vertex']:.0f} B/vertex)")
+    return report
+
+def naive_hull_vertices(points, tolerance=1e-10):
+    """Вершины выпуклой оболочки перебором всех троек точек, O(N^4):
+    тройка задаёт грань, если все точки по одну сторону её плоскости"""
+    triples = np.array(list(itertools.combinations(range(len(points)), 3)))
+    a, b, c = (points[triples[:, i]] for i in range(3))
+    normals = np.cross(b - a, c - a)
+    distance = points @ normals.T - np.einsum("ij,ij->i", normals, a)
+    scale = tolerance * np.linalg.norm(normals, axis=1)
+    faces = np.all(distance <= scale, axis=0) | np.all(distance >= -scale, axis=0)
+    faces &= np.linalg.norm(normals, axis=1) > 0
+    return np.unique(triples[faces])
+
+def hull_scaling(max_points):
+    """Время Polyhedron.from_convex_hull на облаках из шара и со сферы
+    (10^3 ... max_points точек) и сравнение с перебором троек на малых облаках
+    
+    У облака из шара вершин оболочки мало, у облака со сферы вершины - все
+    точки, это худший случай для quickhull: на больших облаках время на
+    точку растёт как log n, и 10^6 точек со сферы строятся около минуты.
+    Время на точку выводится и пишется в отчёт, чтобы этот предел был
+    виден.
+    """
+    rng = np.random.default_rng(0)
+    
+    def sphere(count):
+        points = rng.normal(size=(count, 3))
+        return points / np.linalg.norm(points, axis=1)[:, None]
+    
+    def ball(count):
+        return sphere(count) * rng.uniform(0, 1, (count, 1)) ** (1 / 3)
+    
+    report = {"cloud": [], "points": [], "hull_vertices": [], "seconds": [], "us_per_point": [], "naive": []}
+    for cloud, sample in (("ball", ball), ("sphere", sphere)):
+        count = 1000
+        while count <= max_points:
+            points = sample(count)
+            hull = Polyhedron.from_convex_hull(points)
+            seconds = measure(lambda: Polyhedron.from_convex_hull(points), max_repeats=5)["best"]
+            report["cloud"].append(cloud)
+            report["points"].append(count)
+            report["hull_vertices"].append(len(hull.base_vertices))
+            report["seconds"].append(seconds)
+            report["us_per_point"].append(seconds / count * 1e6)
+            print(f"from_convex_hull {cloud:10s} {count:>10d} points {len(hull.base_vertices):>7d} vertices "
+                  f"{seconds * 1e3:10.3f} ms {seconds / count * 1e6:8.2f} us/point")
+            count *= 10
+    
+    for count in (25, 50, 100):
+        points = ball(count)
+        naive = measure(lambda: naive_hull_vertices(points), max_repeats=3)["best"]
+        fast = measure(lambda: Polyhedron.from_convex_hull(points))["best"]
+        # Обе оболочки должны иметь одни и те же вершины
+        same = np.array_equal(np.unique(points[naive_hull_vertices(points)], axis=0),
+                              np.unique(Polyhedron.from_convex_hull(points).base_vertices, axis=0))
+        report["naive"].append({"points": count, "naive_seconds": naive, "seconds": fast, "same_vertices": same})
+        print(f"convex_hull_naive           {count:>10d} points {naive * 1e3:10.3f} ms "
+              f"(from_convex_hull {fast * 1e3:.3f} ms)")
+    return report
+
+def compare(results, baseline, tolerance):
+    """Замеры, ставшие медленнее базовых более чем на tolerance"""
+    reference = {(r["benchmark"], r["mesh"]): r["best"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        base = reference.get((r["benchmark"], r["mesh"]))
+        if base is not None and r["best"] > base * (1.0 + tolerance):
+            regressions.append({"benchmark": r["benchmark"], "mesh": r["mesh"],
+                                "baseline": base, "current": r["best"],
+                                "ratio": r["best"] / base})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polyhedron performance benchmarks")
+    parser.add_argument("--output", default="bench_output.json", help="JSON file for results")
+    parser.add_argument("--max-faces", type=int, default=1_500_000,
+                        help="largest subdivided mesh (faces) to benchmark")
+    parser.add_argument("--max-draw-faces", type=int, default=100_000,
+                        help="largest mesh to benchmark draw_polyhedron on")
+    parser.add_argument("--max-point-faces", type=int, default=20_000,
+                        help="largest mesh to benchmark the per-point project_point loop on")
+    parser.add_argument("--quick", action="store_true", help="small meshes only (up to 20480 faces)")
+    parser.add_argument("--parallel", type=int, metavar="VERTICES", nargs="?", const=10_000_000,
+                        help="also measure ParallelEngine scaling over process counts "
+                             "(default 10M vertices)")
+    parser.add_argument("--hull", type=int, metavar="POINTS", nargs="?", const=1_000_000,
+                        help="also measure from_convex_hull on point clouds up to POINTS "
+                             "(default 10^6) against a brute-force hull")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    
+    max_faces = min(args.max_faces, 20_480) if args.quick else args.max_faces
+    results = run_benchmarks(max_faces, args.max_draw_faces, args.max_point_faces)
+    report = {
+        "meta": {"python": sys.version.split()[0], "numpy": np.__version__,
+                 "pygame": pygame.version.ver, "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+        "scaling": scaling_curves(results),
+        "memory": memory_footprint(max_faces),
+    }
+    if args.parallel:
+        report["parallel"] = parallel_scaling(args.parallel, os.cpu_count() or 1)
+    if args.hull:
+        report["hull"] = hull_scaling(args.hull)
+    
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']} {r['mesh']}: "
+                  f"{r['baseline'] * 1e3:.3f} ms -> {r['current'] * 1e3:.3f} ms (x{r['ratio']:.2f})")
+        status = 1 if regressions else 0
+    
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
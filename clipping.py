@@ -0,0 +1,218 @@
+import numpy as np
+from spatial import face_corners
+
+def as_planes(planes):
+    """Плоскости (P, 4): строки (a, b, c, d), сохраняется сторона a x + b y + c z + d >= 0"""
+    return np.asarray(planes, dtype=float).reshape(-1, 4)
+
+def classify(vertices, planes):
+    """Расстояния со знаком всех вершин (N, 3) до всех плоскостей (N, P) одним умножением"""
+    planes = as_planes(planes)
+    return vertices @ planes[:, :3].T + planes[:, 3]
+
+def _following(face_offsets, count):
+    """Номер следующего угла той же грани для каждого элемента face_index"""
+    following = np.arange(1, count + 1)
+    following[face_offsets[1:] - 1] = face_offsets[:-1]
+    return following
+
+def _distances(vertices, plane):
+    """Расстояния вершин до плоскости, обнулённые в пределах допуска
+    
+    Допуск - несколько ulp от масштаба координат и плоскости: вершина на
+    плоскости не даёт точки пересечения (иначе появляются её копии,
+    стороны нулевой длины и плоские грани)
+    """
+    distance = vertices @ plane[:3] + plane[3]
+    scale = np.abs(plane[:3]).sum() * (np.abs(vertices).max() if len(vertices) else 0.0) + abs(plane[3])
+    tolerance = 16 * np.finfo(vertices.dtype).eps * scale
+    distance[np.abs(distance) <= tolerance] = 0.0
+    return distance
+
+def _edge_points(vertices, distance, start, end):
+    """Точки пересечения плоскости со сторонами (start, end), общие для
+    обеих граней ребра: (точки (K, 3), номер точки для каждой стороны)
+    
+    Точка считается по ребру (меньшая вершина, большая вершина), поэтому
+    у соседних граней она совпадает до бита.
+    """
+    low = np.minimum(start, end).astype(np.int64)
+    high = np.maximum(start, end).astype(np.int64)
+    keys, inverse = np.unique(low * len(vertices) + high, return_inverse=True)
+    low, high = np.divmod(keys, len(vertices))
+    t = distance[low] / (distance[low] - distance[high])
+    points = vertices[low] + t[:, None] * (vertices[high] - vertices[low])
+    return points.astype(vertices.dtype, copy=False), inverse.reshape(-1)
+
+def _clip_by_plane(vertices, face_index, face_offsets, faces, plane):
+    """Отсечение всех граней одной плоскостью (Сазерленд - Ходжмен на плоских массивах)
+    
+    Каждая сторона (i -> j) даёт вершину i, если она внутри или на
+    плоскости, и точку пересечения, если i и j строго по разные стороны.
+    Грани, целиком оставшиеся снаружи, и грани, от которых остались только
+    вершины на плоскости, исчезают.
+    """
+    distance = _distances(vertices, plane)
+    # Сторона вершины: 1 - строго внутри, 2 - строго снаружи, 0 - на плоскости
+    side = (distance > 0).astype(np.uint8) | ((distance < 0).astype(np.uint8) << 1)
+    corner_side = side[face_index]
+    corner_inside = corner_side != 2
+    if corner_inside.all():
+        return vertices, face_index, face_offsets, faces
+    
+    following = _following(face_offsets, len(face_index))
+    crossing = (corner_side | corner_side[following]) == 3
+    points, point_index = _edge_points(vertices, distance, face_index[crossing], face_index[following[crossing]])
+    
+    # Число выходных вершин каждой стороны и их места в новом face_index
+    emitted = corner_inside.astype(np.int64) + crossing
+    position = np.cumsum(emitted) - emitted
+    clipped = np.empty(int(emitted.sum()), dtype=face_index.dtype)
+    clipped[position[corner_inside]] = face_index[corner_inside]
+    clipped[position[crossing] + corner_inside[crossing]] = len(vertices) + point_index
+    
+    starts = face_offsets[:-1]
+    if len(face_index):
+        sizes = np.add.reduceat(emitted, starts)
+        # Грань без вершин строго внутри, но с вершинами снаружи, сжалась в плоскость
+        flat = np.bitwise_or.reduceat(corner_side, starts) == 2
+    else:
+        sizes = np.zeros(0, dtype=np.int64)
+        flat = np.zeros(0, dtype=bool)
+    kept = (sizes >= 3) & ~flat
+    clipped = clipped[np.repeat(kept, sizes)]
+    offsets = np.concatenate([[0], np.cumsum(sizes[kept])]).astype(face_offsets.dtype)
+    return np.concatenate([vertices, points]), clipped, offsets, faces[kept]
+
+def clip_faces(vertices, face_index, face_offsets, planes):
+    """Части граней по положительную сторону всех плоскостей
+    
+    Вершины классифицируются одним умножением на плоскость, пересекаемые
+    грани разрезаются векторно, без циклов по граням. Возвращает
+    (vertices, face_index, face_offsets, faces): новые вершины (только
+    используемые), грани и номер исходной грани для каждой новой. Грани
+    по разрезу не добавляются: замкнутая сетка становится открытой.
+    """
+    faces = np.arange(len(face_offsets) - 1)
+    for plane in as_planes(planes):
+        vertices, face_index, face_offsets, faces = _clip_by_plane(vertices, face_index, face_offsets, faces, plane)
+    
+    used, face_index = np.unique(face_index, return_inverse=True)
+    return vertices[used], face_index.reshape(-1), face_offsets, faces
+
+def _reduce_corners(function, flags, face_index, face_offsets, faces):
+    """function.reduceat флагов вершин (N, P) по углам граней (всех или faces)"""
+    if faces is None:
+        corners = face_index
+        starts = face_offsets[:-1]
+    else:
+        positions, sizes = face_corners(face_offsets, faces)
+        corners = face_index[positions]
+        starts = np.cumsum(sizes) - sizes
+    if len(corners) == 0:
+        return np.zeros((len(starts), flags.shape[1]), dtype=bool)
+    return function.reduceat(flags[corners], starts, axis=0)
+
+def faces_outside(vertices, face_index, face_offsets, planes, faces=None):
+    """Маска граней (всех или faces), целиком лежащих снаружи хотя бы одной плоскости"""
+    outside = classify(vertices, planes) < 0
+    return _reduce_corners(np.logical_and, outside, face_index, face_offsets, faces).any(axis=1)
+
+def faces_inside(vertices, face_index, face_offsets, planes, faces=None):
+    """Маска граней (всех или faces), целиком лежащих внутри всех плоскостей"""
+    inside = classify(vertices, planes) >= 0
+    return _reduce_corners(np.logical_and, inside, face_index, face_offsets, faces).all(axis=1)
+
+def section_segments(vertices, face_index, face_offsets, plane):
+    """Сечение граней плоскостью: (точки (K, 3), отрезки (S, 2) номеров точек)
+    
+    Точки пересечения общие для соседних граней. Пересечения стороны грани
+    упорядочиваются вдоль линии сечения и берутся парами, поэтому
+    невыпуклая грань даёт несколько отрезков.
+    """
+    plane = as_planes(plane)[0]
+    distance = _distances(vertices, plane)
+    inside = distance >= 0
+    corner_inside = inside[face_index]
+    following = _following(face_offsets, len(face_index))
+    crossing = np.flatnonzero(corner_inside != corner_inside[following])
+    if len(crossing) == 0:
+        return np.zeros((0, 3), dtype=vertices.dtype), np.zeros((0, 2), dtype=np.int64)
+    
+    # Вершина на плоскости считается внутренней; сторона от неё наружу
+    # пересекает плоскость в самой вершине, и точка берётся по вершине,
+    # а не по ребру, чтобы быть общей для всех граней при ней
+    start = face_index[crossing]
+    end = face_index[following[crossing]]
+    on_plane = np.where(distance[start] == 0, start, np.where(distance[end] == 0, end, -1))
+    on_edge = on_plane < 0
+    edge_points, edge_index = _edge_points(vertices, distance, start[on_edge], end[on_edge])
+    vertex_points, vertex_index = np.unique(on_plane[~on_edge], return_inverse=True)
+    points = np.concatenate([vertices[vertex_points], edge_points])
+    point_index = np.empty(len(crossing), dtype=np.int64)
+    point_index[~on_edge] = vertex_index.reshape(-1)
+    point_index[on_edge] = len(vertex_points) + edge_index
+    
+    # Направление линии сечения в каждой грани: нормаль грани (по Ньюэллу) x нормаль плоскости
+    # (только для пересекаемых граней)
+    face = np.searchsorted(face_offsets, crossing, side="right") - 1
+    crossed, face = np.unique(face, return_inverse=True)
+    corners, sizes = face_corners(face_offsets, crossed)
+    sides = np.cross(vertices[face_index[corners]], vertices[face_index[following[corners]]])
+    normals = np.add.reduceat(sides, np.cumsum(sizes) - sizes, axis=0)
+    direction = np.cross(normals[face.reshape(-1)], plane[:3])
+    along = np.einsum("ij,ij->i", points[point_index], direction)
+    order = np.lexsort((along, face))
+    segments = point_index[order].reshape(-1, 2)
+    # Грань, касающаяся плоскости одной вершиной, даёт отрезок нулевой длины
+    return points, segments[segments[:, 0] != segments[:, 1]]
+
+def chain_segments(segments, count):
+    """Сборка отрезков в ломаные: списки номеров точек; у замкнутой ломаной
+    первая точка повторяется в конце"""
+    ends = np.concatenate([segments[:, 0], segments[:, 1]])
+    others = np.concatenate([segments[:, 1], segments[:, 0]])
+    order = np.argsort(ends, kind="stable")
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=count), out=offsets[1:])
+    neighbours = others[order].tolist()
+    offsets = offsets.tolist()
+    degree = np.diff(offsets)
+    
+    # Сначала незамкнутые ломаные (от концов степени 1), затем циклы
+    visited = [False] * count
+    polylines = []
+    for start in np.concatenate([np.flatnonzero(degree == 1), np.flatnonzero(degree > 1)]).tolist():
+        if visited[start]:
+            continue
+        line = [start]
+        visited[start] = True
+        previous, current = -1, start
+        while True:
+            step = [n for n in neighbours[offsets[current]:offsets[current + 1]] if n != previous]
+            if not step:
+                break
+            following = step[0]
+            if following == start:
+                line.append(start)
+                break
+            if visited[following]:
+                break
+            visited[following] = True
+            line.append(following)
+            previous, current = current, following
+        polylines.append(line)
+    return polylines
+
+def perspective_frustum(d, width, height, near, scale=200):
+    """Плоскости пирамиды видимости перспективной проекции (центр в (0, 0, -d)):
+    ближняя плоскость z = near - d и четыре стороны окна (5, 4)"""
+    half_width = width / 2
+    half_height = height / 2
+    return np.array([
+        [0.0, 0.0, 1.0, d - near],
+        [d * scale, 0.0, half_width, half_width * d],
+        [-d * scale, 0.0, half_width, half_width * d],
+        [0.0, d * scale, half_height, half_height * d],
+        [0.0, -d * scale, half_height, half_height * d],
+    ])
\ No newline at end of file
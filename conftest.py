@@ -0,0 +1 @@
+# Корень репозитория в sys.path: тесты импортируют модули верхнего уровня
@@ -0,0 +1,196 @@
+import collections
+import threading
+import time
+import traceback
+import numpy as np
+
+class GeometryFrame:
+    """Подготовленная геометрия кадра многогранника: всё, что нужно для отрисовки
+    
+    Заполняется Visualizer.prepare_polyhedron, рисуется Visualizer.draw_geometry.
+    polyhedron = None - рисовать нечего (нет многогранника или он вне окна);
+    label = None - многогранника нет. Подпись и числа для интерфейса тоже
+    берутся отсюда: цикл отрисовки не читает многогранник, который поток
+    геометрии может менять.
+    """
+    __slots__ = ("key", "serial", "polyhedron", "screen_points", "face_points", "offsets", "order",
+                 "edges", "lines", "vertex_points", "requested", "completed", "label", "vertex_count",
+                 "face_count", "lod_level", "lod_face_count")
+    
+    def __init__(self):
+        self.key = None  # Visualizer.frame_key на момент подготовки
+        self.serial = 0
+        self.label = None  # название многогранника
+        self.vertex_count = 0
+        self.face_count = 0
+        self.lod_level = 0
+        self.lod_face_count = 0
+        self.polyhedron = None
+        self.screen_points = None
+        self.face_points = None
+        self.offsets = None
+        self.order = None
+        self.edges = None  # видимые рёбра (E, 2) для растеризатора
+        self.lines = None  # видимые участки ломаных рёбер для pygame
+        self.vertex_points = None
+        self.requested = None  # время самого раннего изменения, вошедшего в кадр
+        self.completed = None
+    
+    def summary(self):
+        """(название, вершины, грани, уровень детализации, грани уровня) или
+        None без многогранника; кортеж остаётся верным после перезаписи буфера"""
+        if self.label is None:
+            return None
+        return self.label, self.vertex_count, self.face_count, self.lod_level, self.lod_face_count
+
+class GeometryWorker:
+    """Поток геометрии с двойной буферизацией
+    
+    Поток выполняет изменения геометрии (submit) и готовит кадр
+    (visualizer.prepare_polyhedron) в задний буфер, пока цикл отрисовки
+    рисует передний. Готовый буфер становится передним одной заменой номера
+    под блокировкой; буфер, который рисуется (acquire/release), не
+    перезаписывается. Все накопившиеся изменения выполняются вместе и дают
+    один кадр, поэтому задержка от изменения до показа не больше двух
+    подготовок кадра и одного кадра отрисовки; она измеряется для каждого
+    показанного кадра (latency_summary).
+    """
+    def __init__(self, visualizer, on_ready=None, capacity=600):
+        """on_ready() вызывается из потока после каждой замены буферов"""
+        self.visualizer = visualizer
+        self.on_ready = on_ready
+        self._condition = threading.Condition()
+        self._jobs = collections.deque()
+        self._requested = None  # время первого необработанного запроса кадра
+        self._preparing = None  # ключ кадра, который готовится сейчас
+        self._slots = [GeometryFrame(), GeometryFrame()]
+        self._front = None    # номер переднего буфера
+        self._reading = None  # номер буфера, который сейчас рисуется
+        self._serial = 0
+        self._presented = 0
+        self._stopping = False
+        self.latencies = collections.deque(maxlen=capacity)
+        self.prepare_times = collections.deque(maxlen=capacity)
+        self._thread = threading.Thread(target=self._run, name="geometry-worker", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+    
+    def submit(self, change):
+        """Изменение геометрии change() выполнится в потоке перед следующей подготовкой"""
+        with self._condition:
+            self._jobs.append((change, time.perf_counter()))
+            self._condition.notify_all()
+    
+    def request(self):
+        """Подготовка нового кадра (изменилось то, от чего зависит проекция)"""
+        with self._condition:
+            if self._requested is None:
+                self._requested = time.perf_counter()
+            self._condition.notify_all()
+    
+    def _idle(self):
+        return not self._jobs and self._requested is None and self._preparing is None
+    
+    def is_current(self, key):
+        """Будет ли показан кадр для ключа key без нового запроса"""
+        with self._condition:
+            if self._jobs or self._requested is not None:
+                return True
+            front = None if self._front is None else self._slots[self._front].key
+            return key == front or key == self._preparing
+    
+    def wait(self, timeout=None):
+        """Ожидание, пока все изменения и запросы не дадут передний кадр"""
+        with self._condition:
+            return self._condition.wait_for(self._idle, timeout)
+    
+    @property
+    def serial(self):
+        """Номер переднего кадра (0 - ещё не готов)"""
+        with self._condition:
+            return 0 if self._front is None else self._slots[self._front].serial
+    
+    def acquire(self):
+        """Передний кадр для отрисовки (или None); после отрисовки - release()"""
+        with self._condition:
+            self._reading = self._front
+            return None if self._front is None else self._slots[self._front]
+    
+    def release(self):
+        """Конец отрисовки кадра из acquire; первый показ кадра записывает
+        задержку от самого раннего вошедшего в него изменения"""
+        with self._condition:
+            frame = None if self._reading is None else self._slots[self._reading]
+            self._reading = None
+            self._condition.notify_all()
+        if frame is not None and frame.serial > self._presented:
+            self._presented = frame.serial
+            if frame.requested is not None:
+                self.latencies.append(time.perf_counter() - frame.requested)
+    
+    def latency_summary(self):
+        """Задержка от изменения до показа и время подготовки кадра в миллисекундах"""
+        if not self.latencies:
+            return None
+        latency = np.array(self.latencies) * 1e3
+        p50, p95 = np.percentile(latency, [50, 95]).tolist()
+        return {"frames": len(latency),
+                "latency_ms": {"p50": p50, "p95": p95, "max": float(latency.max())},
+                "prepare_ms": float(np.mean(self.prepare_times)) * 1e3}
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopping or not self._idle())
+                if self._stopping:
+                    return
+                jobs = list(self._jobs)
+                self._jobs.clear()
+                times = [submitted for _, submitted in jobs]
+                if self._requested is not None:
+                    times.append(self._requested)
+                self._requested = None
+                self._preparing = ()
+            
+            for change, _ in jobs:
+                try:
+                    change()
+                except Exception:
+                    traceback.print_exc()
+            
+            # Задний буфер - тот, что не передний; если его ещё рисуют
+            # (кадр взят до прошлой замены), ждём конца отрисовки
+            with self._condition:
+                back = 0 if self._front is None else 1 - self._front
+                self._condition.wait_for(lambda: self._stopping or self._reading != back)
+                if self._stopping:
+                    return
+                self._preparing = self.visualizer.frame_key()
+            
+            start = time.perf_counter()
+            frame = self._slots[back]
+            try:
+                self.visualizer.prepare_polyhedron(frame)
+            except Exception:
+                traceback.print_exc()
+                frame.polyhedron = None
+            self.prepare_times.append(time.perf_counter() - start)
+            
+            with self._condition:
+                self._serial += 1
+                frame.serial = self._serial
+                frame.requested = min(times) if times else None
+                frame.completed = time.perf_counter()
+                self._front = back
+                self._preparing = None
+                self._condition.notify_all()
+            if self.on_ready is not None:
+                self.on_ready()
\ No newline at end of file
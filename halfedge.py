@@ -0,0 +1,171 @@
+import numpy as np
+from spatial import face_corners
+
+def _csr(keys, values, count):
+    """Группировка values по keys (0..count-1): смещения (count + 1,) и значения по группам"""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=count), out=offsets[1:])
+    return offsets, values[order]
+
+class HalfEdgeMesh:
+    """Полурёберная структура граней на массивах
+    
+    Полуребро h - это h-й элемент face_index (сторона грани от вершины
+    face_index[h] к следующей вершине той же грани). Все связи - массивы,
+    поэтому каждый запрос - одно обращение по индексу, а с массивом
+    номеров - векторный запрос сразу для многих полурёбер:
+        origin[h]  - начальная вершина     face[h] - грань
+        next[h], prev[h] - соседние полурёбра грани
+        twin[h]    - обратное полуребро соседней грани (-1 на границе
+                     и у неманифолдных рёбер)
+        edge[h]    - номер уникального ребра (строки edges)
+    vertex_half_edge[v] - исходящее полуребро вершины (для граничной
+    вершины - граничное, с него начинается обход веера; -1 у вершин без
+    граней), edge_half_edge[e] - одно из полурёбер ребра,
+    face_half_edge[f] - первое полуребро грани.
+    """
+    def __init__(self, face_index, face_offsets, vertex_count, edges, side_edges):
+        """edges, side_edges - уникальные рёбра и номер ребра каждой стороны
+        (Polyhedron.get_edges, get_side_edges)"""
+        dtype = face_index.dtype
+        count = len(face_index)
+        sizes = np.diff(face_offsets)
+        self.origin = face_index
+        self.face = np.repeat(np.arange(len(sizes), dtype=dtype), sizes)
+        self.next = np.arange(1, count + 1, dtype=dtype)
+        self.next[face_offsets[1:] - 1] = face_offsets[:-1]
+        self.prev = np.arange(-1, count - 1, dtype=dtype)
+        self.prev[face_offsets[:-1]] = face_offsets[1:] - 1
+        self.edge = side_edges
+        self.edges = edges
+        self.face_half_edge = face_offsets[:-1]
+        self.vertex_count = vertex_count
+        self._one_ring = None
+        self._vertex_faces = None
+        
+        # Пары полурёбер одного ребра: у ребра ровно с двумя сторонами
+        # противоположного направления полурёбра - близнецы
+        self.side_counts = np.bincount(side_edges, minlength=len(edges))
+        order = np.argsort(side_edges, kind="stable")
+        first = np.zeros(len(edges), dtype=np.int64)
+        np.cumsum(self.side_counts[:-1], out=first[1:])
+        self.edge_half_edge = order[first].astype(dtype) if count else np.zeros(0, dtype=dtype)
+        paired = np.flatnonzero(self.side_counts == 2)
+        a = order[first[paired]]
+        b = order[first[paired] + 1]
+        opposite = self.origin[a] == self.origin[self.next[b]]
+        self.twin = np.full(count, -1, dtype=dtype)
+        self.twin[a[opposite]] = b[opposite]
+        self.twin[b[opposite]] = a[opposite]
+        self.inconsistent_edges = paired[~opposite]
+        
+        # Исходящее полуребро вершины; граничное выбирается последним
+        self.vertex_half_edge = np.full(vertex_count, -1, dtype=dtype)
+        halves = np.arange(count, dtype=dtype)
+        self.vertex_half_edge[self.origin] = halves
+        boundary = halves[self.twin < 0]
+        self.vertex_half_edge[self.origin[boundary]] = boundary
+    
+    def __len__(self):
+        return len(self.origin)
+    
+    def destination(self, half_edge):
+        """Конечная вершина полуребра (или массива полурёбер)"""
+        return self.origin[self.next[half_edge]]
+    
+    def rotate(self, half_edge):
+        """Следующее исходящее полуребро той же вершины (обход веера; -1 на границе)"""
+        return self.twin[self.prev[half_edge]]
+    
+    def fan(self, vertex):
+        """Исходящие полурёбра вершины по порядку обхода веера"""
+        start = int(self.vertex_half_edge[vertex])
+        if start < 0:
+            return np.zeros(0, dtype=self.origin.dtype)
+        result = [start]
+        half_edge = int(self.rotate(start))
+        while half_edge >= 0 and half_edge != start:
+            result.append(half_edge)
+            half_edge = int(self.rotate(half_edge))
+        return np.array(result, dtype=self.origin.dtype)
+    
+    def edge_faces(self):
+        """Грани по обе стороны каждого ребра (E, 2); -1 - нет грани"""
+        half_edge = self.edge_half_edge
+        twin = self.twin[half_edge]
+        return np.stack([self.face[half_edge], np.where(twin >= 0, self.face[twin], -1)], axis=1)
+    
+    def boundary_half_edges(self):
+        """Полурёбра без близнецов (граница и неманифолдные рёбра)"""
+        return np.flatnonzero(self.twin < 0)
+    
+    def one_ring(self, vertices=None):
+        """Соседи вершин по рёбрам: (смещения, соседи) в формате face_offsets/face_index
+        
+        vertices - номера вершин (по умолчанию все); соседи каждой вершины
+        - соседи[смещения[i]:смещения[i + 1]]
+        """
+        if self._one_ring is None:
+            start, end = self.edges[:, 0], self.edges[:, 1]
+            self._one_ring = _csr(np.concatenate([start, end]), np.concatenate([end, start]), self.vertex_count)
+        return self._select(self._one_ring, vertices)
+    
+    def vertex_faces(self, vertices=None):
+        """Грани при вершинах: (смещения, грани) в том же формате, что one_ring"""
+        if self._vertex_faces is None:
+            self._vertex_faces = _csr(self.origin, self.face, self.vertex_count)
+        return self._select(self._vertex_faces, vertices)
+    
+    def _select(self, table, vertices):
+        offsets, values = table
+        if vertices is None:
+            return offsets, values
+        vertices = np.atleast_1d(vertices)
+        positions, sizes = face_corners(offsets, vertices)
+        return np.concatenate([[0], np.cumsum(sizes)]), values[positions]
+    
+    def fan_counts(self):
+        """Число вееров граней при каждой вершине (у многообразия - 1, у
+        вершины без граней - 0)
+        
+        Веер - цепочка или цикл исходящих полурёбер по rotate. Представитель
+        цепочки - её последнее полуребро, цикла - наименьшее; оба находятся
+        удвоением указателей за log2(наибольшая валентность) шагов.
+        """
+        rotation = self.rotate(np.arange(len(self)))
+        ends = rotation < 0
+        pointer = np.where(ends, np.arange(len(self)), rotation)
+        label = np.arange(len(self))
+        valence = np.bincount(self.origin, minlength=self.vertex_count).max() if len(self) else 0
+        for _ in range(int(valence).bit_length()):
+            label = np.minimum(label, label[pointer])
+            pointer = pointer[pointer]
+        cycle = ~ends[pointer]
+        representative = ends | (cycle & (label == np.arange(len(self))))
+        return np.bincount(self.origin[representative], minlength=self.vertex_count)
+    
+    def validate(self):
+        """Проверка многообразия и замкнутости
+        
+        Возвращает словарь: номера граничных, неманифолдных (больше двух
+        сторон) и несогласованных (две стороны одного направления) рёбер,
+        неманифолдных вершин (больше одного веера), вершин без граней и
+        вырожденных граней, а также manifold и closed
+        """
+        degenerate = np.unique(self.face[self.origin == self.destination(np.arange(len(self)))])
+        sizes = np.bincount(self.face, minlength=len(self.face_half_edge))
+        degenerate = np.union1d(degenerate, np.flatnonzero(sizes < 3))
+        fans = self.fan_counts()
+        report = {
+            "boundary_edges": np.flatnonzero(self.side_counts == 1),
+            "non_manifold_edges": np.flatnonzero(self.side_counts > 2),
+            "inconsistent_edges": self.inconsistent_edges,
+            "non_manifold_vertices": np.flatnonzero(fans > 1),
+            "unreferenced_vertices": np.flatnonzero(fans == 0),
+            "degenerate_faces": degenerate,
+        }
+        report["manifold"] = not any(len(report[name]) for name in (
+            "non_manifold_edges", "inconsistent_edges", "non_manifold_vertices", "degenerate_faces"))
+        report["closed"] = report["manifold"] and len(report["boundary_edges"]) == 0
+        return report
\ No newline at end of file
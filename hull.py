@@ -0,0 +1,607 @@
+from fractions import Fraction
+import numpy as np
+
+# Граница ошибки знака определителя ориентации в числах с плавающей точкой
+# (Шевчук, orient3d: (7 + 56 eps) eps); ближе к нулю знак считается точно
+_ORIENTATION_BOUND = (7.0 + 56.0 * np.finfo(float).eps) * np.finfo(float).eps
+
+# Направления поиска крайних точек для предварительного отсева:
+# 13 осей (все ненулевые векторы из {-1, 0, 1}^3 с точностью до знака)
+_DIRECTIONS = np.array([d for d in np.ndindex(3, 3, 3)
+                        if d > (1, 1, 1)], dtype=float) - 1.0
+
+def _planes(points, triangles, radius=None):
+    """Единичные нормали (T, 3) и смещения (T,) плоскостей треугольников
+    
+    С radius - ещё граница ошибки расстояния до плоскости для точек не
+    дальше radius от начала координат: растёт с вытянутостью
+    треугольника, у вырожденного - бесконечна
+    """
+    a = points[triangles[:, 0]]
+    first, second = points[triangles[:, 1]] - a, points[triangles[:, 2]] - a
+    normals = np.cross(first, second)
+    length = np.linalg.norm(normals, axis=1)
+    normals /= np.where(length > 0, length, 1.0)[:, None]
+    offsets = np.einsum("ij,ij->i", normals, a)
+    if radius is None:
+        return normals, offsets
+    spread = np.sqrt(np.einsum("ij,ij->i", first, first) * np.einsum("ij,ij->i", second, second))
+    ratio = np.divide(spread, length, out=np.full(len(length), np.inf), where=length > 0)
+    return normals, offsets, 16.0 * np.finfo(float).eps * radius * (1.0 + ratio)
+
+def _orientation(a, b, c, d):
+    """Знак (b - a) x (c - a) . (d - a) для строк (K, 3): 1 - точка d снаружи
+    треугольника abc (со стороны нормали), 0 - в его плоскости
+    
+    Знак вычисляется в числах с плавающей точкой с проверкой границы
+    ошибки; неуверенные случаи пересчитываются точно (Fraction), поэтому
+    решения о видимости не противоречат друг другу даже у вырожденных
+    треугольников.
+    """
+    ad, bd, cd = a - d, b - d, c - d
+    bc = bd[:, 0] * cd[:, 1]
+    cb = cd[:, 0] * bd[:, 1]
+    ca = cd[:, 0] * ad[:, 1]
+    ac = ad[:, 0] * cd[:, 1]
+    ab = ad[:, 0] * bd[:, 1]
+    ba = bd[:, 0] * ad[:, 1]
+    det = ad[:, 2] * (bc - cb) + bd[:, 2] * (ca - ac) + cd[:, 2] * (ab - ba)
+    permanent = ((np.abs(bc) + np.abs(cb)) * np.abs(ad[:, 2]) + (np.abs(ca) + np.abs(ac)) * np.abs(bd[:, 2])
+                 + (np.abs(ab) + np.abs(ba)) * np.abs(cd[:, 2]))
+    sign = -np.sign(det).astype(np.int8)
+    for i in np.flatnonzero(np.abs(det) <= _ORIENTATION_BOUND * permanent).tolist():
+        (ax, ay, az), (bx, by, bz), (cx, cy, cz), (dx, dy, dz) = (
+            [Fraction(float(value)) for value in row] for row in (a[i], b[i], c[i], d[i]))
+        ax, ay, az, bx, by, bz, cx, cy, cz = ax - dx, ay - dy, az - dz, bx - dx, by - dy, bz - dz, cx - dx, cy - dy, cz - dz
+        exact = az * (bx * cy - cx * by) + bz * (cx * ay - ax * cy) + cz * (ax * by - bx * ay)
+        sign[i] = -1 if exact > 0 else (1 if exact < 0 else 0)
+    return sign
+
+def _outside(points, triangles, indices):
+    """Строго ли точки indices (K,) снаружи треугольников triangles (K, 3)"""
+    return _orientation(points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]],
+                        points[indices]) > 0
+
+def _sees(points, faces, normals, offsets, errors, face, indices):
+    """Строго ли точки indices (K,) снаружи граней face (K,): по расстоянию
+    до плоскости, а в пределах его ошибки - точным знаком ориентации"""
+    distance = np.einsum("ij,ij->i", normals[face], points[indices]) - offsets[face]
+    outside = distance > errors[face]
+    unsure = np.flatnonzero(np.abs(distance) <= errors[face])
+    outside[unsure] = _outside(points, faces[face[unsure]], indices[unsure])
+    return outside
+
+def _initial_simplex(points, candidates, tolerance):
+    """Четыре точки общего положения из candidates: треугольники тетраэдра,
+    обращённые наружу"""
+    subset = points[candidates]
+    first = candidates[np.argmin(subset[:, 0])]
+    second = candidates[np.argmax(np.linalg.norm(subset - points[first], axis=1))]
+    direction = points[second] - points[first]
+    if np.linalg.norm(direction) <= tolerance:
+        raise ValueError("convex hull needs at least 4 non-coplanar points")
+    
+    offset = subset - points[first]
+    line = np.cross(offset, direction / np.linalg.norm(direction))
+    third = candidates[np.argmax(np.linalg.norm(line, axis=1))]
+    normal = np.cross(direction, points[third] - points[first])
+    if np.linalg.norm(normal) <= tolerance * np.linalg.norm(direction):
+        raise ValueError("convex hull needs at least 4 non-coplanar points")
+    
+    normal /= np.linalg.norm(normal)
+    height = np.abs(offset @ normal)
+    highest = np.argmax(height)
+    fourth = candidates[highest]
+    if height[highest] <= tolerance:
+        raise ValueError("convex hull needs at least 4 non-coplanar points")
+    
+    # Каждая грань ориентируется так, чтобы четвёртая вершина была за ней
+    corners = np.array([first, second, third, fourth])
+    triangles = np.array([corners[[1, 2, 3]], corners[[0, 3, 2]], corners[[0, 1, 3]], corners[[0, 2, 1]]])
+    normals, offsets = _planes(points, triangles)
+    opposite = points[corners]
+    flip = np.einsum("ij,ij->i", normals, opposite) - offsets > 0
+    triangles[flip] = triangles[flip][:, [0, 2, 1]]
+    return triangles
+
+def _ranges(starts, counts):
+    """Подряд номера starts[i] ... starts[i] + counts[i] - 1 для всех i"""
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return shift + np.arange(len(shift))
+
+def _sorted_unique(keys):
+    """Различные целые ключи по возрастанию (сортировкой, без хеширования)"""
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+
+def _segment_argmax(values, counts):
+    """Номер первого наибольшего элемента в каждом из подряд идущих
+    непустых отрезков values длины counts"""
+    starts = np.cumsum(counts) - counts
+    hits = np.flatnonzero(values == np.repeat(np.maximum.reduceat(values, starts), counts))
+    segment = np.repeat(np.arange(len(counts)), counts)[hits]
+    return hits[np.r_[True, segment[1:] != segment[:-1]]]
+
+def _assign(points, indices, groups, group_start, group_count, triangles, normals, offsets, errors, tolerance,
+            chunk=1 << 22):
+    """Распределение точек по граням своих групп
+    
+    Точка indices[i] сравнивается с гранями group_start[g] ...
+    group_start[g] + group_count[g] - 1 своей группы g = groups[i] и
+    достаётся самой далёкой из них, если дальше tolerance снаружи.
+    Расстояние до плоскости узкого треугольника ненадёжно, поэтому выбор в
+    пределах ошибки errors грани проверяется точным знаком ориентации; при
+    несовпадении берётся следующая по расстоянию грань. Пары (точка, грань)
+    считаются частями не больше chunk. Возвращает (точки, грани,
+    расстояния).
+    """
+    results = []
+    sizes = group_count[groups]
+    total = np.cumsum(sizes)
+    bounds = np.unique(np.searchsorted(total, np.arange(chunk, total[-1], chunk))) if len(total) else []
+    for part in np.split(np.arange(len(indices)), bounds):
+        if len(part) == 0:
+            continue
+        counts = sizes[part]
+        owner = np.repeat(part, counts)
+        face = _ranges(group_start[groups[part]], counts)
+        location = np.repeat(points[indices[part]], counts, axis=0)
+        distance = np.einsum("ij,ij->i", normals[face], location) - offsets[face]
+        checked = np.zeros(len(distance), dtype=bool)
+        while True:
+            best = _segment_argmax(distance, counts)
+            check = best[(distance[best] > tolerance) & (distance[best] <= errors[face[best]]) & ~checked[best]]
+            checked[check] = True
+            wrong = check[~_outside(points, triangles[face[check]], indices[owner[check]])]
+            if len(wrong) == 0:
+                break
+            distance[wrong] = -np.inf
+        outside = distance[best] > tolerance
+        best = best[outside]
+        results.append((indices[owner[best]], face[best], distance[best]))
+    if not results:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return tuple(np.concatenate(columns) for columns in zip(*results))
+
+def _twins(triangles, vertex_count):
+    """Для каждой стороны (a, b) треугольников (номер 3 * t + i) - номер
+    обратной стороны (b, a) в замкнутой сетке: после сортировки по ребру
+    обе стороны каждого ребра стоят рядом"""
+    sides = triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2).astype(np.int64)
+    keys = sides.min(axis=1) * vertex_count + sides.max(axis=1)
+    order = np.argsort(keys, kind="stable")
+    twin = np.empty(len(keys), dtype=np.int64)
+    twin[order[0::2]] = order[1::2]
+    twin[order[1::2]] = order[0::2]
+    return twin
+
+def _loops(group, start, end, vertex_count, group_count):
+    """Проверка, что стороны (start -> end) каждой группы образуют один
+    простой цикл
+    
+    Возвращает (order, successor, simple): порядок сторон по (группа,
+    начало), следующую сторону обхода для сторон в этом порядке и маску
+    групп (group_count,) с простым циклом
+    """
+    starts = group * vertex_count + start
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    ends = (group * vertex_count + end)[order]
+    group = group[order]
+    count = len(starts)
+    
+    # У каждой вершины одна исходящая и одна входящая сторона группы: тогда
+    # k-й по величине конец совпадает с k-м началом, и сторона с этим концом
+    # переходит в сторону с этим началом
+    repeated = np.zeros(count, dtype=bool)
+    repeated[1:] = starts[1:] == starts[:-1]
+    repeated[:-1] |= repeated[1:]
+    by_end = np.argsort(ends, kind="stable")
+    matched = ends[by_end] == starts
+    successor = np.arange(count)
+    successor[by_end[matched]] = np.flatnonzero(matched)
+    bad = repeated | ~matched
+    
+    # Число циклов группы - число сторон, наименьших в своём цикле
+    # (удвоение указателей)
+    label = np.arange(count)
+    pointer = successor
+    for _ in range(int(np.bincount(group).max()).bit_length() if count else 0):
+        label = np.minimum(label, label[pointer])
+        pointer = pointer[pointer]
+    cycles = np.bincount(group[label == np.arange(count)], minlength=group_count)
+    simple = cycles == 1
+    simple[group[bad]] = False
+    return order, successor, simple
+
+def _grow(array, capacity):
+    """Копия массива с длиной capacity по первой оси (новые элементы - нули)"""
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+def _visible_regions(points, faces, normals, offsets, errors, neighbours, seeds, eyes, count):
+    """Видимые грани для каждой точки eyes[k] (точный знак): обход в
+    ширину по соседям от грани seeds[k] сразу для всех точек
+    
+    Возвращает пары (номер точки k, грань). Грани, в плоскости которых
+    лежит точка, не видимы: новая грань веера ляжет с ними в одну
+    плоскость, и оболочка остаётся выпуклой
+    """
+    group = np.arange(len(seeds))
+    face = seeds
+    seen = np.sort(group * count + face)
+    groups, regions = [group], [face]
+    while len(face):
+        keys = _sorted_unique(np.repeat(group, 3) * count + neighbours[face].reshape(-1))
+        position = np.minimum(np.searchsorted(seen, keys), len(seen) - 1)
+        keys = keys[seen[position] != keys]
+        seen = np.sort(np.concatenate([seen, keys]), kind="stable")
+        group, face = np.divmod(keys, count)
+        visible = _sees(points, faces, normals, offsets, errors, face, eyes[group])
+        group, face = group[visible], face[visible]
+        groups.append(group)
+        regions.append(face)
+    return np.concatenate(groups), np.concatenate(regions)
+
+def _independent(groups, regions, neighbours, priority, count):
+    """Наибольшее по включению множество точек, видимые области которых не
+    касаются друг друга, жадно по приоритету: маска точек
+    
+    Точки p и q конфликтуют, если область одной пересекается с окрестностью
+    (область и её соседи) другой. Без конфликта веер p не виден из q, и
+    веера можно добавить одновременно - результат тот же, что при
+    добавлении по одной.
+    """
+    region_keys = _sorted_unique(groups * count + regions)
+    keys = _sorted_unique(np.concatenate([region_keys,
+                                          np.repeat(groups, 3) * count + neighbours[regions].reshape(-1)]))
+    in_region = np.zeros(len(keys), dtype=bool)
+    in_region[np.searchsorted(keys, region_keys)] = True
+    touch_group, touch_face = np.divmod(keys, count)
+    dense = np.zeros(count, dtype=np.int64)
+    used = _sorted_unique(touch_face)
+    dense[used] = np.arange(len(used))
+    touch_face = dense[touch_face]
+    count = len(used)
+    undecided = np.ones(len(priority), dtype=bool)
+    accepted = np.zeros(len(priority), dtype=bool)
+    while undecided.any():
+        active = undecided[touch_group]
+        group, face, region = touch_group[active], touch_face[active], in_region[active]
+        rank = priority[group]
+        
+        # Старшие приоритеты по граням: среди областей и среди окрестностей
+        best_region = np.full(count, -1, dtype=np.int64)
+        best_near = np.full(count, -1, dtype=np.int64)
+        np.maximum.at(best_region, face[region], rank[region])
+        np.maximum.at(best_near, face, rank)
+        losing = np.zeros(len(priority), dtype=bool)
+        losing[group[(best_region[face] > rank) | (region & (best_near[face] > rank))]] = True
+        winners = undecided & ~losing
+        accepted |= winners
+        
+        # Точки, конфликтующие с победителями, в этом пакете не добавляются
+        won = winners[group]
+        taken_region = np.zeros(count, dtype=bool)
+        taken_near = np.zeros(count, dtype=bool)
+        taken_region[face[won & region]] = True
+        taken_near[face[won]] = True
+        blocked = np.zeros(len(priority), dtype=bool)
+        blocked[group[taken_region[face] | (region & taken_near[face])]] = True
+        undecided &= ~(winners | blocked)
+    return accepted
+
+def _quickhull(points, candidates, tolerance):
+    """Треугольники (T, 3) выпуклой оболочки точек candidates
+    
+    Инкрементальный алгоритм со списками конфликтов (quickhull): у каждой
+    грани - внешние точки, для которых она ближайшая по направлению.
+    Шаги идут пакетами: каждая грань с непустым списком предлагает свою
+    самую далёкую точку, видимые области всех точек находятся одним
+    обходом, и из них выбираются не касающиеся друг друга. Их видимые
+    грани заменяются веерами треугольников к горизонтам, а точки
+    распределяются по новым граням своего веера. Проходов столько,
+    сколько пакетов, а не вершин оболочки.
+    """
+    triangles = _initial_simplex(points, candidates, tolerance)
+    capacity = 64
+    faces = _grow(triangles, capacity)
+    neighbours = _grow(_twins(triangles, len(points)).reshape(-1, 3) // 3, capacity)
+    normals = np.zeros((capacity, 3))
+    offsets = np.zeros(capacity)
+    errors = np.zeros(capacity)
+    radius = np.linalg.norm(points[candidates], axis=1).max()
+    normals[:4], offsets[:4], errors[:4] = _planes(points, triangles, radius)
+    alive = _grow(np.ones(4, dtype=bool), capacity)
+    count = 4
+    
+    # Списки конфликтов: точки грани лежат подряд в pool с conflict_start;
+    # eye - самая далёкая из них
+    pool = np.zeros(0, dtype=np.int64)
+    pool_distance = np.zeros(0)
+    conflict_start = np.zeros(capacity, dtype=np.int64)
+    conflict_count = np.zeros(capacity, dtype=np.int64)
+    eye = np.zeros(capacity, dtype=np.int64)
+    eye_distance = np.zeros(capacity)
+    
+    def store(indices, face, distance):
+        """Запись новых списков конфликтов граней в конец pool"""
+        nonlocal pool, pool_distance
+        if len(indices) == 0:
+            return
+        order = np.argsort(face, kind="stable")
+        indices, face, distance = indices[order], face[order], distance[order]
+        owners, first, counts = np.unique(face, return_index=True, return_counts=True)
+        conflict_start[owners] = len(pool) + first
+        conflict_count[owners] = counts
+        best = _segment_argmax(distance, counts)
+        eye[owners] = indices[best]
+        eye_distance[owners] = distance[best]
+        pool = np.concatenate([pool, indices])
+        pool_distance = np.concatenate([pool_distance, distance])
+    
+    store(*_assign(points, candidates, np.zeros(len(candidates), dtype=np.int64), np.zeros(1, dtype=np.int64),
+                   np.array([4]), faces, normals, offsets, errors, tolerance))
+    
+    while True:
+        active = np.flatnonzero(conflict_count[:count])
+        if len(active) == 0:
+            break
+        eyes = eye[active]
+        groups, regions = _visible_regions(points, faces, normals, offsets, errors, neighbours, active, eyes,
+                                           count)
+        priority = np.empty(len(active), dtype=np.int64)
+        priority[np.argsort(eye_distance[active], kind="stable")] = np.arange(len(active))
+        accepted = _independent(groups, regions, neighbours, priority, count)
+        chosen = accepted[groups]
+        groups, regions = groups[chosen], regions[chosen]
+        
+        # Горизонт - стороны видимых граней, за которыми грань невидима
+        owner_group = np.full(count, -1, dtype=np.int64)
+        owner_group[regions] = groups
+        outer = neighbours[regions]
+        on_horizon = (owner_group[outer] != groups[:, None]).reshape(-1)
+        owner = np.repeat(regions, 3)[on_horizon]
+        side = np.tile(np.arange(3), len(regions))[on_horizon]
+        group = np.repeat(groups, 3)[on_horizon]
+        outer = outer.reshape(-1)[on_horizon]
+        start = faces[owner, side]
+        end = faces[owner, (side + 1) % 3]
+        
+        # У выпуклой оболочки видимая область - диск; точка, у которой
+        # горизонт распался, не добавляется (защита от порчи связности)
+        order, successor, simple = _loops(group, start, end, len(points), len(active))
+        broken = np.flatnonzero(accepted & ~simple)
+        for k in broken.tolist():
+            face = active[k]
+            first = conflict_start[face]
+            span = pool[first:first + conflict_count[face]]
+            last = first + len(span) - 1
+            position = first + int(np.flatnonzero(span == eyes[k])[0])
+            pool[position], pool_distance[position] = pool[last], pool_distance[last]
+            conflict_count[face] -= 1
+            if conflict_count[face]:
+                best = first + int(np.argmax(pool_distance[first:last]))
+                eye[face], eye_distance[face] = pool[best], pool_distance[best]
+        good = simple[group[order]]
+        successor = (np.cumsum(good) - 1)[successor[good]]
+        order = order[good]
+        keep_region = simple[groups]
+        groups, regions = groups[keep_region], regions[keep_region]
+        owner, group, outer, start, end = owner[order], group[order], outer[order], start[order], end[order]
+        
+        added = len(start)
+        if count + added > capacity:
+            capacity = max(capacity * 2, count + added)
+            faces, neighbours, normals, offsets, errors, alive, conflict_start, conflict_count, eye, eye_distance = (
+                _grow(array, capacity) for array in (faces, neighbours, normals, offsets, errors, alive,
+                                                     conflict_start, conflict_count, eye, eye_distance))
+        
+        # Новые грани - веера (start, end, eye) с тем же обходом сторон;
+        # соседи: внешняя грань за стороной горизонта и две соседние грани
+        # своего веера (следующая и предыдущая по обходу горизонта)
+        new_faces = np.arange(count, count + added)
+        faces[new_faces] = np.column_stack([start, end, eyes[group]])
+        normals[new_faces], offsets[new_faces], errors[new_faces] = _planes(points, faces[new_faces], radius)
+        predecessor = np.empty(added, dtype=np.int64)
+        predecessor[successor] = np.arange(added)
+        neighbours[new_faces, 0] = outer
+        neighbours[new_faces, 1] = new_faces[successor]
+        neighbours[new_faces, 2] = new_faces[predecessor]
+        neighbours[outer, np.argmax(neighbours[outer] == owner[:, None], axis=1)] = new_faces
+        alive[new_faces] = True
+        alive[regions] = False
+        count += added
+        
+        # Точки удалённых граней распределяются по новым граням своего веера
+        counts = conflict_count[regions]
+        orphans = pool[_ranges(conflict_start[regions], counts)]
+        orphan_group = np.repeat(groups, counts)
+        conflict_count[regions] = 0
+        keep = orphans != eyes[orphan_group]
+        group_start = np.zeros(len(active), dtype=np.int64)
+        group_count = np.zeros(len(active), dtype=np.int64)
+        fans, first, sizes = np.unique(group, return_index=True, return_counts=True)
+        group_start[fans] = count - added + first
+        group_count[fans] = sizes
+        store(*_assign(points, orphans[keep], orphan_group[keep], group_start, group_count, faces, normals,
+                       offsets, errors, tolerance))
+        
+        # Пул растёт с каждым пакетом: живые списки время от времени
+        # переписываются подряд
+        live = np.flatnonzero(conflict_count[:count])
+        total = int(conflict_count[live].sum())
+        if len(pool) > 2 * total + (1 << 20):
+            positions = _ranges(conflict_start[live], conflict_count[live])
+            pool, pool_distance = pool[positions], pool_distance[positions]
+            conflict_start[live] = np.cumsum(conflict_count[live]) - conflict_count[live]
+    
+    return faces[:count][alive[:count]]
+
+def _prefilter(points, tolerance):
+    """Отсев внутренних точек (Акл - Туссен): точки строго внутри оболочки
+    крайних точек по 13 осям заведомо не вершины оболочки"""
+    extremes = []
+    for direction in _DIRECTIONS:
+        projection = points @ direction
+        extremes.extend([np.argmin(projection), np.argmax(projection)])
+    extremes = np.unique(extremes)
+    try:
+        triangles = _quickhull(points, extremes, tolerance)
+    except ValueError:
+        return np.arange(len(points))
+    
+    # Плоскость узкого треугольника ненадёжна: отсев по ней мог бы
+    # выбросить вершину оболочки, поэтому в этом случае он не делается
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    longest = np.max([np.linalg.norm(b - a, axis=1), np.linalg.norm(c - b, axis=1),
+                      np.linalg.norm(a - c, axis=1)], axis=0)
+    height = np.linalg.norm(np.cross(b - a, c - a), axis=1) / longest
+    if np.any(height <= 1e-3 * longest):
+        return np.arange(len(points))
+    
+    normals, offsets = _planes(points, triangles)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[extremes] = True
+    for normal, offset in zip(normals, offsets):
+        keep |= points @ normal - offset > -tolerance
+    return np.flatnonzero(keep)
+
+def _components(count, a, b):
+    """Компоненты связности графа с рёбрами (a[i], b[i]): наименьший номер
+    вершины компоненты для каждой вершины (распространение и сжатие путей)"""
+    labels = np.arange(count)
+    while True:
+        smallest = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, smallest)
+        np.minimum.at(updated, b, smallest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def _polygon_boundaries(labels, sides, owner, neighbour, vertex_count):
+    """Стороны границ групп треугольников, упорядоченные по (группа, начало):
+    (номера сторон, группы, начала, концы, следующая сторона обхода,
+    простой ли цикл границы у группы каждой стороны)"""
+    boundary = np.flatnonzero(labels[owner] != labels[neighbour])
+    order, successor, simple = _loops(labels[owner[boundary]], sides[boundary, 0], sides[boundary, 1],
+                                      vertex_count, len(labels))
+    boundary = boundary[order]
+    group = labels[owner[boundary]]
+    return boundary, group, sides[boundary, 0], sides[boundary, 1], successor, simple[group]
+
+def _merge_coplanar(points, triangles, tolerance):
+    """Объединение смежных компланарных треугольников в многоугольники
+    
+    Возвращает face_index и face_offsets многоугольников с тем же обходом;
+    вершины, лежащие на стороне многоугольника, из него убираются
+    """
+    normals, offsets = _planes(points, triangles)
+    sides = triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    twin = _twins(triangles, len(points))
+    
+    # Соседи компланарны, если вершина каждого напротив общей стороны лежит
+    # в плоскости другого (с тем же допуском, что и при построении)
+    owner = np.arange(len(sides)) // 3
+    neighbour = twin // 3
+    opposite = triangles[neighbour, (twin % 3 + 2) % 3]
+    distance = np.abs(np.einsum("ij,ij->i", normals[owner], points[opposite]) - offsets[owner])
+    merge = (distance <= tolerance) & (distance[twin] <= tolerance)
+    if not merge.any():
+        return triangles.reshape(-1), np.arange(0, 3 * len(triangles) + 1, 3)
+    labels = _components(len(triangles), owner[merge], neighbour[merge])
+    
+    # Цепочка почти компланарных треугольников может изгибаться: группа
+    # остаётся, только если все её вершины в пределах допуска от плоскости
+    # её самого большого треугольника. Дальше обрабатываются только
+    # треугольники групп, остальные остаются как есть
+    single = np.arange(len(triangles))
+    grouped = np.flatnonzero(np.bincount(labels, minlength=len(triangles))[labels] > 1)
+    group_labels = labels[grouped]
+    corners = points[triangles[grouped]]
+    area = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+    order = np.lexsort((-area, group_labels))
+    representative = np.zeros(len(triangles), dtype=np.int64)
+    first = np.r_[True, group_labels[order][1:] != group_labels[order][:-1]]
+    representative[group_labels[order][first]] = grouped[order[first]]
+    plane = representative[group_labels]
+    deviation = np.abs(corners @ normals[plane][:, :, None] - offsets[plane][:, None, None]).max(axis=(1, 2))
+    flat = np.ones(len(triangles), dtype=bool)
+    np.logical_and.at(flat, group_labels, deviation <= tolerance)
+    labels = np.where(flat[labels], labels, single)
+    
+    # Стороны между разными группами - границы многоугольников; группа,
+    # граница которой не один простой цикл, остаётся треугольниками
+    in_group = np.repeat(np.bincount(labels, minlength=len(triangles))[labels] > 1, 3)
+    _, group, start, end, successor, simple = _polygon_boundaries(labels, sides[in_group], owner[in_group],
+                                                                  neighbour[in_group], len(points))
+    if not simple.all():
+        broken = np.zeros(len(triangles), dtype=bool)
+        broken[group[~simple]] = True
+        labels = np.where(broken[labels], single, labels)
+        in_group = np.repeat(np.bincount(labels, minlength=len(triangles))[labels] > 1, 3)
+        _, group, start, end, successor, simple = _polygon_boundaries(labels, sides[in_group], owner[in_group],
+                                                                      neighbour[in_group], len(points))
+    
+    # Обход всех многоугольников одновременно: шаг за шагом по следующей
+    # стороне; position - номер стороны в обходе своего многоугольника
+    first = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    sizes = np.diff(np.r_[first, len(group)])
+    position = np.zeros(len(group), dtype=np.int64)
+    current = first
+    for step in range(1, sizes.max() if len(sizes) else 0):
+        current = successor[current]
+        active = step < sizes
+        position[current[active]] = step
+    face_offsets = np.concatenate([[0], np.cumsum(sizes)])
+    face_index = np.empty(len(group), dtype=np.int64)
+    face_index[np.repeat(face_offsets[:-1], sizes) + position] = start
+    
+    # Вершины на стороне многоугольника (соседи с ними на одной прямой) не
+    # нужны, если они на прямой в обоих многоугольниках, где встречаются
+    polygon = np.repeat(np.arange(len(sizes)), sizes)
+    local = np.arange(len(face_index)) - face_offsets[polygon]
+    previous = face_index[face_offsets[polygon] + (local - 1) % sizes[polygon]]
+    following = face_index[face_offsets[polygon] + (local + 1) % sizes[polygon]]
+    corner = points[face_index]
+    bend = np.linalg.norm(np.cross(corner - points[previous], points[following] - corner), axis=1)
+    straight = bend <= tolerance * np.linalg.norm(points[following] - points[previous], axis=1)
+    alone = triangles[~in_group[::3]].reshape(-1)
+    uses = np.bincount(face_index, minlength=len(points)) + np.bincount(alone, minlength=len(points))
+    straight_uses = np.bincount(face_index, weights=straight, minlength=len(points))
+    removable = (uses == 2) & (straight_uses == 2)
+    keep = ~removable[face_index]
+    # Узкий треугольник из точек одной прямой сжимается в отрезок и
+    # исчезает: его соседи по сторонам становятся смежными
+    sizes = np.bincount(polygon[keep], minlength=len(sizes))
+    keep &= sizes[polygon] >= 3
+    sizes = np.concatenate([np.full(len(alone) // 3, 3), sizes[sizes >= 3]])
+    return np.concatenate([alone, face_index[keep]]), np.concatenate([[0], np.cumsum(sizes)])
+
+def convex_hull(points, tolerance=None):
+    """Выпуклая оболочка облака точек (N, 3)
+    
+    Возвращает (vertex_indices, face_index, face_offsets): номера точек-вершин
+    оболочки и грани в формате Polyhedron.from_arrays (индексы по
+    vertex_indices). Грани обходятся против часовой стрелки при взгляде
+    снаружи; компланарные треугольники объединяются в многоугольники.
+    tolerance - расстояние, на котором точки считаются лежащими в плоскости
+    (по умолчанию 1e-10 размера облака).
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("points must have shape (N, 3)")
+    if len(points) < 4:
+        raise ValueError("convex hull needs at least 4 non-coplanar points")
+    if tolerance is None:
+        extent = np.abs(points - points.mean(axis=0)).max()
+        tolerance = 1e-10 * max(extent, np.finfo(float).tiny)
+    
+    candidates = _prefilter(points, tolerance)
+    triangles = _quickhull(points, candidates, tolerance)
+    face_index, face_offsets = _merge_coplanar(points, triangles, tolerance)
+    vertex_indices, face_index = np.unique(face_index, return_inverse=True)
+    return vertex_indices, face_index, face_offsets
\ No newline at end of file
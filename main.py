@@ -1,20 +1,61 @@
-import pygame
+import time
+START = time.perf_counter()  # отсчёт времени до первого кадра
+
+import argparse
 import sys
-from polyhedron import Polyhedron
-from transformations import *
-from visualizer import Visualizer
 
-def main():
+def main(argv=None):
     """Основная функция приложения"""
+    parser = argparse.ArgumentParser(description="3D Polyhedron Visualizer")
+    parser.add_argument("mesh", nargs="?", help="OBJ/STL file to open")
+    parser.add_argument("--self-test", action="store_true",
+                        help="create and transform all polyhedra before starting")
+    parser.add_argument("--frames", type=int, help="exit after this many frames (implies --continuous)")
+    parser.add_argument("--continuous", action="store_true",
+                        help="redraw 60 times a second instead of only when something changes")
+    parser.add_argument("--profile-output", metavar="PATH",
+                        help="write per-frame stage timings to PATH (.json or .csv) on exit")
+    parser.add_argument("--no-profile", action="store_true", help="disable frame timing")
+    parser.add_argument("--float32", action="store_true",
+                        help="store vertices and matrices in single precision (half the memory)")
+    parser.add_argument("--geometry-thread", action="store_true",
+                        help="apply transforms and project in a background thread (double-buffered)")
+    args = parser.parse_args(argv)
+    
+    # pygame и визуализатор импортируются только при запуске окна
+    import pygame
+    from polyhedron import Polyhedron
+    from transformations import set_precision
+    from visualizer import Visualizer
+    
+    if args.float32:
+        set_precision("float32")
+    
     # Инициализация Pygame
     pygame.init()
     
     # Создание визуализатора
     visualizer = Visualizer()
+    visualizer.profiler.enabled = not args.no_profile
+    visualizer.profile_output = args.profile_output
+    if args.continuous or args.frames is not None:
+        visualizer.redraw_mode = "continuous"
     
-    # Создание начального многогранника (тетраэдр)
-    tetrahedron = Polyhedron.create_tetrahedron()
-    visualizer.set_polyhedron(tetrahedron, "Tetrahedron")
+    # Создание начального многогранника (тетраэдр) или загрузка файла OBJ/STL
+    if args.mesh:
+        from mesh_cache import MeshCache
+        # Первый запуск разбирает файл и пишет двоичный кэш, следующие
+        # только отображают его в память
+        start = time.perf_counter()
+        mesh, _ = MeshCache().load_file(args.mesh, normalize=True)
+        print(f"Loaded {args.mesh}: {len(mesh.vertex_array)} vertices, "
+              f"{len(mesh.face_offsets) - 1} faces in {time.perf_counter() - start:.2f} s")
+        visualizer.set_polyhedron(mesh, args.mesh)
+    else:
+        tetrahedron = Polyhedron.create_tetrahedron()
+        visualizer.set_polyhedron(tetrahedron, "Tetrahedron")
+    if args.geometry_thread:
+        visualizer.start_geometry_worker().wait()
     
     print("=" * 60)
     print("3D Polyhedron Visualizer - All Platonic Solids")
@@ -24,19 +65,28 @@ def main():
     print("3 - Octahedron (8 faces)   | 4 - Icosahedron (20 faces)")
     print("5 - Dodecahedron (12 faces)")
     print("P - Perspective | A - Axonometric")
-    print("R - Reset Transformations | ESC - Exit")
+    print("R - Reset Transformations | F - Frame profiler | ESC - Exit")
     print("=" * 60)
     print("All transformations are implemented using matrices!")
     print("=" * 60)
     
-    # Демонстрация работы преобразований
-    demo_all_polyhedra()
+    # Демонстрация работы преобразований (по запросу, окно не ждёт её)
+    if args.self_test:
+        demo_all_polyhedra()
+    
+    # Первый кадр
+    visualizer.draw_frame()
+    pygame.display.flip()
+    print(f"First frame in {(time.perf_counter() - START) * 1e3:.0f} ms")
     
     # Запуск основного цикла
-    visualizer.run()
+    visualizer.run(None if args.frames is None else args.frames - 1)
 
 def demo_all_polyhedra():
     """Демонстрация всех многогранников и преобразований"""
+    from polyhedron import Polyhedron
+    from transformations import rotation_x_matrix, translation_matrix
+    
     print("\n🧪 Testing all polyhedra creation...")
     
     polyhedra = [
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import struct
+import tempfile
+import numpy as np
+from polyhedron import Polyhedron
+from transformations import get_precision
+
+# Формат файла: заголовок HEADER (64 байта), затем выровненные по 64 байтам
+# сырые массивы: вершины (N, 3), face_index (M,), face_offsets (F + 1,).
+# Флаги заголовка задают точность: по умолчанию float64 и int64
+MAGIC = b"PLYHDRN1"
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+FLAG_FLOAT32 = 1  # вершины float32
+FLAG_INT32 = 2    # индексы граней int32
+
+def _dtypes(flags):
+    """Типы вершин и индексов по флагам заголовка"""
+    return ("<f4" if flags & FLAG_FLOAT32 else "<f8"), ("<i4" if flags & FLAG_INT32 else "<i8")
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _layout(vertex_count, index_count, face_count, flags=0):
+    """Смещения массивов в файле и его полный размер"""
+    vertex_size, index_size = (np.dtype(dtype).itemsize for dtype in _dtypes(flags))
+    vertices = HEADER_SIZE
+    face_index = _aligned(vertices + vertex_count * 3 * vertex_size)
+    face_offsets = _aligned(face_index + index_count * index_size)
+    end = face_offsets + (face_count + 1) * index_size
+    return vertices, face_index, face_offsets, end
+
+def save_mesh_binary(path, polyhedron):
+    """Запись мировой геометрии многогранника в двоичный формат кэша (атомарно)
+    
+    Точность вершин и индексов сохраняется такой же, как у многогранника
+    """
+    flags = ((FLAG_FLOAT32 if polyhedron.dtype == np.float32 else 0)
+             | (FLAG_INT32 if polyhedron.face_index.dtype == np.int32 else 0))
+    vertex_dtype, index_dtype = _dtypes(flags)
+    vertices = np.ascontiguousarray(polyhedron.vertex_array, dtype=vertex_dtype)
+    face_index = np.ascontiguousarray(polyhedron.face_index, dtype=index_dtype)
+    face_offsets = np.ascontiguousarray(polyhedron.face_offsets, dtype=index_dtype)
+    face_count = len(face_offsets) - 1
+    layout = _layout(len(vertices), len(face_index), face_count, flags)
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(vertices), len(face_index), face_count)
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for offset, array in zip(layout[:3], (vertices, face_index, face_offsets)):
+                f.seek(offset)
+                f.write(array.tobytes())
+            f.truncate(layout[3])
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+def open_mesh_binary(path, mode="c"):
+    """Открытие файла кэша через np.memmap (без чтения массивов в память)
+    
+    mode="c" - копирование при записи: изменения вершин остаются в памяти
+    процесса, файл (исходная копия) не меняется
+    """
+    with open(path, "rb") as f:
+        magic, version, flags, vertex_count, index_count, face_count = HEADER.unpack(
+            f.read(HEADER_SIZE)[:HEADER.size])
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"'{path}' is not a mesh cache file")
+    
+    vertex_dtype, index_dtype = _dtypes(flags)
+    vertices_at, index_at, offsets_at, _ = _layout(vertex_count, index_count, face_count, flags)
+    vertices = np.memmap(path, dtype=vertex_dtype, mode=mode, offset=vertices_at, shape=(vertex_count, 3))
+    face_index = np.memmap(path, dtype=index_dtype, mode="r", offset=index_at, shape=(index_count,))
+    face_offsets = np.memmap(path, dtype=index_dtype, mode="r", offset=offsets_at, shape=(face_count + 1,))
+    return Polyhedron.from_arrays(vertices, face_index, face_offsets, dtype=vertices.dtype)
+
+def _file_digest(path):
+    """Хеш содержимого файла (blake2b, читается блоками)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def default_cache_dir():
+    return os.environ.get("POLYHEDRON_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "polyhedron-meshes"))
+
+class MeshCache:
+    """Каталог двоичных сеток, адресуемых по описанию источника
+    
+    Повторное открытие сетки любого размера - это отображение файла в
+    память (O(1)), а не повторный разбор, слияние вершин или разбиение.
+    """
+    def __init__(self, directory=None):
+        self.directory = directory or default_cache_dir()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.mesh")
+    
+    def open(self, key):
+        """Исходная копия сетки по ключу (копирование при записи)"""
+        return open_mesh_binary(self.path_for(key))
+    
+    def __contains__(self, key):
+        return os.path.exists(self.path_for(key))
+    
+    def key_for(self, description):
+        """Ключ сетки по текстовому описанию; сетки разной точности
+        (transformations.set_precision) хранятся отдельно"""
+        description = f"{description}:{get_precision().name}"
+        return hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get_or_build(self, description, builder):
+        """Сетка по текстовому описанию; builder() вызывается только при промахе
+        
+        Возвращает (многогранник, ключ); повторно сетку можно открыть по ключу.
+        """
+        key = self.key_for(description)
+        if key not in self:
+            save_mesh_binary(self.path_for(key), builder())
+        return self.open(key), key
+    
+    def load_file(self, path, verify=False, **load_options):
+        """Загрузка OBJ/STL через кэш
+        
+        Ключ - путь, размер и время изменения файла и опции загрузки, поэтому
+        попадание в кэш не читает исходный файл. Хеш содержимого пишется
+        рядом с сеткой при сборке; verify=True сверяет его с файлом и
+        пересобирает сетку, если содержимое изменилось без смены размера и
+        времени.
+        """
+        from mesh_io import load_mesh
+        
+        stat = os.stat(path)
+        description = (f"file:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:"
+                       f"{sorted(load_options.items())}")
+        key = self.key_for(description)
+        digest_path = self.path_for(key) + ".digest"
+        if verify and key in self:
+            stored = None
+            if os.path.exists(digest_path):
+                with open(digest_path) as f:
+                    stored = f.read().strip()
+            if stored != _file_digest(path):
+                os.remove(self.path_for(key))
+        
+        def build():
+            mesh = load_mesh(path, **load_options)[0]
+            with open(digest_path, "w") as f:
+                f.write(_file_digest(path))
+            return mesh
+        return self.get_or_build(description, build)
\ No newline at end of file
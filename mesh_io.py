@@ -0,0 +1,263 @@
+import os
+import re
+import time
+import tracemalloc
+import numpy as np
+from polyhedron import Polyhedron
+
+CHUNK_SIZE = 16 * 1024 * 1024  # Размер блока чтения текстовых файлов (байт)
+
+# Строка без комментария "# ..." в конце
+_OBJ_VERTEX = re.compile(rb"^v[ \t]+([^\r\n#]*)", re.MULTILINE)
+_OBJ_FACE = re.compile(rb"^f[ \t]+([^\r\n#]*)", re.MULTILINE)
+_OBJ_REFERENCE = re.compile(rb"/[^\s]*")  # текстурные и нормальные индексы "v/vt/vn"
+_STL_VERTEX = re.compile(rb"vertex\s+(\S+)\s+(\S+)\s+(\S+)")
+
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+def load_mesh(path, weld_tolerance=1e-6, normalize=False, track_memory=False):
+    """Загрузка OBJ или STL (формат по расширению); возвращает (Polyhedron, отчёт)
+    
+    Отчёт - словарь со временем загрузки и пиковым объёмом памяти
+    normalize: перенести центр в начало координат и вписать в единичную сферу
+    track_memory: считать пиковую память загрузки через tracemalloc (медленнее)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".obj":
+        loader = lambda: _read_obj(path)
+    elif extension == ".stl":
+        loader = lambda: _read_stl(path, weld_tolerance)
+    else:
+        raise ValueError(f"Unsupported mesh format '{extension}'")
+    
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        vertices, face_index, face_offsets, source_format = loader()
+        if normalize:
+            vertices = normalize_vertices(vertices)
+        polyhedron = Polyhedron.from_arrays(vertices, face_index, face_offsets)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+    finally:
+        if track_memory:
+            tracemalloc.stop()
+    
+    report = {
+        "path": path,
+        "format": source_format,
+        "vertices": int(len(polyhedron.vertex_array)),
+        "faces": int(len(face_offsets) - 1),
+        "file_bytes": os.path.getsize(path),
+        "seconds": elapsed,
+        "peak_memory_bytes": peak,
+        "max_rss_bytes": _max_rss_bytes(),
+    }
+    return polyhedron, report
+
+def load_obj(path, normalize=False):
+    """Загрузка Wavefront OBJ (только позиции вершин и грани)"""
+    return load_mesh(path, normalize=normalize)[0]
+
+def load_stl(path, weld_tolerance=1e-6, normalize=False):
+    """Загрузка двоичного или текстового STL со слиянием совпадающих вершин"""
+    return load_mesh(path, weld_tolerance=weld_tolerance, normalize=normalize)[0]
+
+def normalize_vertices(vertices):
+    """Центрирование и масштабирование вершин в единичную сферу"""
+    centered = vertices - (vertices.min(axis=0) + vertices.max(axis=0)) * 0.5
+    radius = np.sqrt((centered ** 2).sum(axis=1).max()) if len(centered) else 0.0
+    return centered / radius if radius > 0 else centered
+
+def _read_chunks(path):
+    """Текстовый файл блоками по CHUNK_SIZE, разрезанными по границам строк"""
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                tail = block
+                continue
+            tail = block[cut:]
+            yield block[:cut]
+        if tail:
+            yield tail + b"\n"
+
+def _parse_numbers(text, dtype):
+    """Числа из текста через пробельные символы; нечисловой токен - ValueError
+    (np.fromstring молча обрывает разбор на первой ошибке)"""
+    return np.array(text.split(), dtype=dtype)
+
+def _read_obj(path):
+    vertex_blocks = []
+    index_blocks = []
+    size_blocks = []
+    vertex_count = 0
+    
+    for chunk in _read_chunks(path):
+        chunk_vertex_count = vertex_count
+        
+        # Вершины: строки "v x y z [w]" разбираются одним преобразованием
+        lines = _OBJ_VERTEX.findall(chunk)
+        if lines:
+            values = _parse_numbers(b" ".join(lines), float)
+            columns = len(lines[0].split())
+            if columns >= 3 and len(values) == columns * len(lines):
+                block = values.reshape(-1, columns)
+                if columns == 4:
+                    block = block[:, :3] / block[:, 3:]
+                block = block[:, :3]
+            else:
+                block = np.array([line.split()[:3] for line in lines], dtype=float)
+            vertex_blocks.append(block)
+            vertex_count += len(block)
+        
+        # Грани: индексы без "/vt/vn"; ноль (недопустимый индекс OBJ) служит
+        # разделителем строк, по нему восстанавливаются размеры граней
+        lines = _OBJ_FACE.findall(chunk)
+        if lines:
+            text = _OBJ_REFERENCE.sub(b"", b" 0 ".join(lines) + b" 0")
+            flat = _parse_numbers(text, np.int64)
+            separators = np.flatnonzero(flat == 0)
+            sizes = np.diff(separators, prepend=-1) - 1
+            indices = flat[flat != 0]
+            if np.any(indices < 0):
+                indices = _resolve_relative_indices(chunk, chunk_vertex_count)
+            else:
+                indices -= 1
+            index_blocks.append(indices)
+            size_blocks.append(sizes)
+    
+    vertices = np.concatenate(vertex_blocks) if vertex_blocks else np.zeros((0, 3))
+    face_index = np.concatenate(index_blocks) if index_blocks else np.zeros(0, dtype=np.int64)
+    sizes = np.concatenate(size_blocks) if size_blocks else np.zeros(0, dtype=np.int64)
+    face_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=face_offsets[1:])
+    return vertices, face_index, face_offsets, "obj"
+
+def _resolve_relative_indices(chunk, vertex_count):
+    """Построчный разбор блока с отрицательными (относительными) индексами OBJ"""
+    indices = []
+    for line in chunk.splitlines():
+        parts = line.split(b"#")[0].split()
+        if not parts:
+            continue
+        if parts[0] == b"v":
+            vertex_count += 1
+        elif parts[0] == b"f":
+            for token in parts[1:]:
+                index = int(token.split(b"/")[0])
+                indices.append(index + vertex_count if index < 0 else index - 1)
+    return np.array(indices, dtype=np.int64)
+
+def _read_stl(path, weld_tolerance):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(84)
+    count = int(np.frombuffer(header[80:84], dtype="<u4")[0]) if len(header) == 84 else -1
+    if count >= 0 and size == 84 + count * STL_RECORD.itemsize:
+        # Двоичный STL читается без копирования через memmap
+        records = np.memmap(path, dtype=STL_RECORD, mode="r", offset=84, shape=(count,))
+        corners = records["vertices"].reshape(-1, 3)
+        source_format = "stl-binary"
+    else:
+        blocks = [_parse_numbers(b" ".join(b" ".join(match) for match in _STL_VERTEX.findall(chunk)),
+                                 float).reshape(-1, 3)
+                  for chunk in _read_chunks(path)]
+        corners = np.concatenate(blocks) if blocks else np.zeros((0, 3))
+        source_format = "stl-ascii"
+    
+    vertices, face_index = weld_vertices(corners, weld_tolerance)
+    face_offsets = np.arange(len(face_index) // 3 + 1, dtype=np.int64) * 3
+    return vertices, face_index, face_offsets, source_format
+
+def weld_vertices(points, tolerance=1e-6, chunk=1 << 22):
+    """Слияние совпадающих точек по хешу квантованных координат
+    
+    Возвращает (уникальные вершины, индекс вершины для каждой точки).
+    Если квантованные координаты помещаются в 21 бит, ключ строится
+    упаковкой без коллизий; иначе используется перемешивающий хеш,
+    коллизии которого проверяются и разрешаются точным сравнением.
+    """
+    count = len(points)
+    if count == 0:
+        return np.zeros((0, 3)), np.zeros(0, dtype=np.int64)
+    
+    # Первый проход: границы для квантования относительно минимума
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+    for start in range(0, count, chunk):
+        block = np.asarray(points[start:start + chunk], dtype=np.float64)
+        low = np.minimum(low, block.min(axis=0))
+        high = np.maximum(high, block.max(axis=0))
+    packed = np.all(np.rint((high - low) / tolerance) < (1 << 21))
+    
+    keys = np.empty(count, dtype=np.int64)
+    quantized = None if packed else np.empty((count, 3), dtype=np.int64)
+    for start in range(0, count, chunk):
+        block = np.asarray(points[start:start + chunk], dtype=np.float64)
+        q = np.rint((block - low) / tolerance).astype(np.int64)
+        if packed:
+            keys[start:start + chunk] = (q[:, 0] << 42) | (q[:, 1] << 21) | q[:, 2]
+        else:
+            quantized[start:start + chunk] = q
+            keys[start:start + chunk] = _hash_rows(q)
+    
+    _, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    first = np.empty(inverse.max() + 1, dtype=np.int64)
+    first[inverse] = np.arange(count)
+    if not packed and np.any(quantized[first][inverse] != quantized):
+        _, first, inverse = np.unique(quantized, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    
+    vertices = np.asarray(points[first], dtype=np.float64)
+    return vertices, inverse.astype(np.int64)
+
+def _hash_rows(q):
+    """Перемешивающий хеш строк целочисленного массива (N, 3) в int64"""
+    with np.errstate(over="ignore"):
+        h = q[:, 0] * np.int64(-7046029254386353131)
+        h = (h ^ q[:, 1]) * np.int64(-4658895280553007687)
+        h = (h ^ q[:, 2]) * np.int64(-7046029254386353131)
+    return h
+
+def save_stl(path, polyhedron):
+    """Запись многогранника в двоичный STL (грани разбиваются на треугольники)"""
+    mesh = polyhedron.triangulate()
+    triangles = mesh.vertex_array[mesh.face_index.reshape(-1, 3)]
+    records = np.zeros(len(triangles), dtype=STL_RECORD)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)[:, None]
+    records["normal"] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    records["vertices"] = triangles
+    with open(path, "wb") as f:
+        f.write(b"binary STL".ljust(80, b" "))
+        f.write(np.uint32(len(records)).tobytes())
+        f.write(records.tobytes())
+
+def save_obj(path, polyhedron):
+    """Запись многогранника в OBJ"""
+    sizes = polyhedron.get_face_sizes()
+    with open(path, "w") as f:
+        np.savetxt(f, polyhedron.vertex_array, fmt="v %.9g %.9g %.9g")
+        if len(sizes) and np.all(sizes == sizes[0]):
+            faces = polyhedron.face_index.reshape(-1, sizes[0]) + 1
+            np.savetxt(f, faces, fmt="f" + " %d" * int(sizes[0]))
+            return
+        indices = (polyhedron.face_index + 1).astype(str)
+        for start, end in zip(polyhedron.face_offsets[:-1], polyhedron.face_offsets[1:]):
+            f.write("f " + " ".join(indices[start:end]) + "\n")
+
+def _max_rss_bytes():
+    """Пиковый размер резидентной памяти процесса (Unix), иначе None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
\ No newline at end of file
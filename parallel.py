@@ -0,0 +1,206 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from transformations import axonometric_projection, perspective_projection, transform_vertex_array
+
+# Массивы меньше порога (вершин) обрабатываются в текущем процессе:
+# для них пересылка заданий дороже самих вычислений
+PARALLEL_THRESHOLD = 500_000
+
+class SharedArray:
+    """Массив NumPy в разделяемой памяти (multiprocessing.shared_memory)"""
+    def __init__(self, shape, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf)
+    
+    @property
+    def spec(self):
+        """Описание для подключения к массиву из процесса-исполнителя"""
+        return self.memory.name, self.array.shape, self.array.dtype.str
+    
+    def close(self):
+        """Освобождение разделяемой памяти"""
+        self.array = None
+        self.memory.unlink()
+        try:
+            self.memory.close()
+        except BufferError:
+            # На блок ещё ссылаются внешние массивы: он остаётся отображённым
+            # до завершения процесса
+            _retained.append(self.memory)
+
+_retained = []
+
+# Подключённые в процессе-исполнителе блоки разделяемой памяти: имя -> SharedMemory
+_attached = {}
+
+def _attach(name, shape, dtype):
+    memory = _attached.get(name)
+    if memory is None:
+        memory = _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+def _process_chunk(vertices_spec, screen_spec, start, stop, matrix, projection):
+    """Задание исполнителя: вершины [start, stop) преобразуются на месте,
+    затем (если задан screen_spec) проецируются в общий экранный массив"""
+    # Блоки, не нужные этому заданию, отключаются (освобождённые движком массивы)
+    for name in [name for name in _attached if name not in (vertices_spec[0], screen_spec and screen_spec[0])]:
+        _attached.pop(name).close()
+    
+    vertices = _attach(*vertices_spec)[start:stop]
+    if matrix is not None:
+        vertices[:] = transform_vertex_array(vertices, matrix)
+    if screen_spec is not None:
+        _project(vertices, projection, _attach(*screen_spec)[start:stop])
+
+def _project(vertices, projection, out):
+    kind, width, height, d = projection
+    if kind == "perspective":
+        perspective_projection(vertices, d, width, height, out=out)
+    else:
+        axonometric_projection(vertices, width, height, out=out)
+
+class ParallelEngine:
+    """Параллельное преобразование и проекция вершин (включается явно)
+    
+    Вершины хранятся в разделяемой памяти и делятся на участки между
+    процессами постоянного пула; каждый исполнитель умножает свой участок
+    на матрицу на месте и пишет проекцию в общий экранный массив, так что
+    между процессами пересылаются только имена блоков и границы участков.
+    Массивы меньше threshold вершин обрабатываются последовательно.
+    
+    Использование:
+        with ParallelEngine() as engine:
+            engine.apply_transform(mesh, matrix)
+            screen = engine.project(mesh.vertex_array, "perspective", 1000, 700)
+    """
+    def __init__(self, processes=None, threshold=PARALLEL_THRESHOLD):
+        self.processes = processes or os.cpu_count() or 1
+        self.threshold = threshold
+        self._pool = None
+        self._shared = {}  # адрес данных -> SharedArray
+        self._meshes = weakref.WeakKeyDictionary()  # Polyhedron -> SharedArray его вершин
+        self._input = None   # буфер для проекции массивов вне разделяемой памяти
+        self._screen = None  # экранные координаты последней проекции
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def share(self, vertex_array):
+        """Копия массива вершин (N, 3) в разделяемой памяти; возвращает SharedArray"""
+        shared = SharedArray(np.shape(vertex_array), np.asarray(vertex_array).dtype)
+        shared.array[:] = vertex_array
+        self._shared[shared.array.ctypes.data] = shared
+        return shared
+    
+    def release(self, shared):
+        """Освобождение массива, созданного share"""
+        self._shared.pop(shared.array.ctypes.data, None)
+        shared.close()
+    
+    def share_polyhedron(self, polyhedron):
+        """Перенос исходных вершин многогранника в разделяемую память
+        
+        При первом переносе накопленная матрица применяется (bake). Копии,
+        сделанные clone() после переноса, видят последующие изменения на месте.
+        """
+        shared = self._meshes.get(polyhedron)
+        if shared is not None and polyhedron.base_vertices is shared.array:
+            return shared
+        if shared is not None:
+            self.release(shared)
+        polyhedron.bake()
+        shared = self._meshes[polyhedron] = self.share(polyhedron.base_vertices)
+        polyhedron._set_base_vertices(shared.array)
+        return shared
+    
+    def apply_transform(self, polyhedron, matrix):
+        """Применение матрицы к вершинам многогранника на месте (параллельно)
+        
+        Замена Polyhedron.apply_transform для больших сеток: вместе с матрицей
+        применяется и накопленная ленивым режимом
+        """
+        shared = self.share_polyhedron(polyhedron)
+        self.transform(shared, np.asarray(matrix, dtype=float) @ polyhedron.matrix)
+        polyhedron._set_base_vertices(shared.array)
+    
+    def transform(self, shared, matrix):
+        """Умножение вершин SharedArray на матрицу 4x4 на месте"""
+        matrix = np.asarray(matrix, dtype=float)
+        if len(shared.array) < self.threshold or self.processes == 1:
+            shared.array[:] = transform_vertex_array(shared.array, matrix)
+            return shared.array
+        self._run(shared, None, matrix, None)
+        return shared.array
+    
+    def project(self, vertex_array, projection, width, height, d=5):
+        """Проекция вершин (N, 3) -> (N, 2): projection - "axonometric" или "perspective"
+        
+        Результат - представление внутреннего буфера, действительное до
+        следующего вызова project
+        """
+        count = len(vertex_array)
+        params = (projection, width, height, d)
+        if count < self.threshold or self.processes == 1:
+            out = np.empty((count, 2), dtype=vertex_array.dtype)
+            _project(vertex_array, params, out)
+            return out
+        
+        shared = self._shared.get(vertex_array.ctypes.data)
+        if shared is None or shared.array.shape != vertex_array.shape or shared.array.dtype != vertex_array.dtype:
+            # Массив вне разделяемой памяти копируется во входной буфер
+            self._input = self._buffer(self._input, vertex_array.shape, vertex_array.dtype)
+            self._input.array[:] = vertex_array
+            shared = self._input
+        self._screen = self._buffer(self._screen, (count, 2), vertex_array.dtype)
+        self._run(shared, self._screen, None, params)
+        return self._screen.array
+    
+    def _buffer(self, buffer, shape, dtype=np.float64):
+        """Переиспользуемый буфер разделяемой памяти нужной формы и типа"""
+        if buffer is not None and buffer.array.shape == shape and buffer.array.dtype == dtype:
+            return buffer
+        if buffer is not None:
+            buffer.close()
+        return SharedArray(shape, dtype)
+    
+    def _run(self, shared, screen, matrix, projection):
+        """Разбиение на участки по числу процессов и ожидание всех заданий"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.processes)
+        bounds = np.linspace(0, len(shared.array), self.processes + 1).astype(int).tolist()
+        screen_spec = None if screen is None else screen.spec
+        futures = [self._pool.submit(_process_chunk, shared.spec, screen_spec, start, stop, matrix, projection)
+                   for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        for future in futures:
+            future.result()
+    
+    def close(self):
+        """Остановка пула и освобождение всей разделяемой памяти
+        
+        Вершины многогранников, перенесённых share_polyhedron, копируются
+        обратно в обычную память
+        """
+        for polyhedron, shared in list(self._meshes.items()):
+            if polyhedron.base_vertices is shared.array:
+                version = polyhedron.version
+                polyhedron._set_base_vertices(shared.array.copy())
+                polyhedron.version = version
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for shared in list(self._shared.values()):
+            shared.close()
+        for buffer in (self._input, self._screen):
+            if buffer is not None:
+                buffer.close()
+        self._shared = {}
+        self._meshes = weakref.WeakKeyDictionary()
+        self._input = self._screen = None
\ No newline at end of file
@@ -1,6 +1,8 @@
 import numpy as np
 
 class Point:
+    __slots__ = ("x", "y", "z")
+    
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -17,14 +19,74 @@ class Point:
         self.z = homogeneous[2] / homogeneous[3]
     
     def transform(self, matrix):
-        """Применение матрицы преобразования 4x4 к точке"""
-        homogeneous = self.to_homogeneous()
-        transformed = matrix @ homogeneous  # Умножение матрицы на вектор
-        self.from_homogeneous(transformed)
+        """Применение матрицы преобразования 4x4 к точке
+        
+        Умножение на вектор (x, y, z, 1) расписано по строкам матрицы:
+        без промежуточного массива однородных координат
+        """
+        (a, b, c, d), (e, f, g, h), (i, j, k, l), (m, n, o, p) = np.asarray(matrix).tolist()
+        x, y, z = self.x, self.y, self.z
+        w = m * x + n * y + o * z + p
+        self.x = (a * x + b * y + c * z + d) / w
+        self.y = (e * x + f * y + g * z + h) / w
+        self.z = (i * x + j * y + k * z + l) / w
     
     def __repr__(self):
         return f"Point({self.x:.2f}, {self.y:.2f}, {self.z:.2f})"
     
     def copy(self):
         """Создание копии точки"""
-        return Point(self.x, self.y, self.z)
\ No newline at end of file
+        return Point(self.x, self.y, self.z)
+
+def _coordinate(axis):
+    """Свойство, читающее/пишущее одну координату строки массива вершин"""
+    def getter(self):
+        return float(self.owner.vertex_array[self.index, axis])
+    
+    def setter(self, value):
+        self.owner._set_vertex_coordinate(self.index, axis, value)
+    
+    return property(getter, setter)
+
+class PointView(Point):
+    """Точка-представление вершины многогранника (без копирования данных)
+    
+    owner: объект с массивом vertex_array (N, 3) и методом
+    _set_vertex_coordinate(index, axis, value)
+    """
+    x = _coordinate(0)
+    y = _coordinate(1)
+    z = _coordinate(2)
+    __slots__ = ("owner", "index")
+    
+    def __init__(self, owner, index):
+        self.owner = owner
+        self.index = index
+
+class PointArrayView:
+    """Ленивая последовательность PointView поверх массива вершин"""
+    def __init__(self, owner):
+        self.owner = owner
+    
+    def __len__(self):
+        return len(self.owner.vertex_array)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PointView(self.owner, i) for i in range(len(self))[index]]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("vertex index out of range")
+        return PointView(self.owner, index)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield PointView(self.owner, i)
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def __repr__(self):
+        return f"PointArrayView({len(self)} points)"
\ No newline at end of file
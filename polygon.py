@@ -1,4 +1,8 @@
+from point import PointView
+
 class Polygon:
+    __slots__ = ("points",)
+    
     def __init__(self, points):
         self.points = points  # Список объектов Point
     
@@ -7,4 +11,37 @@ class Polygon:
     
     def copy(self):
         """Создание копии многоугольника"""
-        return Polygon([p.copy() for p in self.points])
\ No newline at end of file
+        return Polygon([p.copy() for p in self.points])
+
+class PolygonArrayView:
+    """Ленивая последовательность граней-представлений поверх индексов граней
+    
+    owner: многогранник с массивами face_index и face_offsets; точки граней
+    являются PointView и разделяют данные с массивом вершин
+    """
+    def __init__(self, owner):
+        self.owner = owner
+    
+    def __len__(self):
+        return len(self.owner.face_offsets) - 1
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("face index out of range")
+        indices = self.owner.get_face_indices(index)
+        return Polygon([PointView(self.owner, int(i)) for i in indices])
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def __repr__(self):
+        return f"PolygonArrayView({len(self)} faces)"
\ No newline at end of file
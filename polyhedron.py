@@ -1,50 +1,586 @@
+import functools
 import numpy as np
-from point import Point
-from polygon import Polygon
+from clipping import as_planes, chain_segments, clip_faces, section_segments
+from halfedge import HalfEdgeMesh
+from hull import convex_hull
+from point import Point, PointArrayView
+from polygon import PolygonArrayView
+from simplify import simplify_levels
+from spatial import UniformGrid, box_corners, face_bounds, face_corners
+from transformations import get_precision, transform_vertex_array
+
+def _as_vertex_array(vertices, dtype=None):
+    """Приведение вершин (список Point или массив) к массиву (N, 3)
+    
+    dtype: точность результата (по умолчанию - transformations.get_precision())
+    """
+    if isinstance(vertices, np.ndarray):
+        array = vertices
+    else:
+        array = np.array([[v.x, v.y, v.z] for v in vertices], dtype=float).reshape(-1, 3)
+    
+    if array.ndim != 2 or array.shape[1] not in (3, 4):
+        raise ValueError("vertices must have shape (N, 3) or (N, 4)")
+    if array.shape[1] == 4:
+        array = array[:, :3] / array[:, 3:]
+    return np.ascontiguousarray(array, dtype=get_precision() if dtype is None else dtype)
+
+def _index_dtype(*bounds):
+    """int32 для индексов и смещений граней, если все они меньше 2**31"""
+    return np.int32 if max(bounds, default=0) < 2**31 else np.int64
+
+def _as_face_arrays(faces_indices):
+    """Приведение индексов граней к плоскому массиву и смещениям граней"""
+    if isinstance(faces_indices, np.ndarray) and faces_indices.ndim == 2:
+        count, size = faces_indices.shape
+        bound = int(faces_indices.max()) + 1 if faces_indices.size else 0
+        dtype = _index_dtype(count * size, bound)
+        face_index = np.ascontiguousarray(faces_indices, dtype=dtype).reshape(-1)
+        return face_index, np.arange(count + 1, dtype=dtype) * size
+    
+    sizes = [len(face) for face in faces_indices]
+    face_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=face_offsets[1:])
+    face_index = np.fromiter((i for face in faces_indices for i in face),
+                             dtype=np.int64, count=int(face_offsets[-1]))
+    dtype = _index_dtype(int(face_offsets[-1]), int(face_index.max()) + 1 if len(face_index) else 0)
+    return face_index.astype(dtype, copy=False), face_offsets.astype(dtype, copy=False)
+
+def _face_normals(vertex_array, face_edges, face_offsets):
+    """Нормали граней по Ньюэллу: сумма v_i x v_(i+1) по сторонам каждой грани"""
+    if len(face_offsets) < 2:
+        return np.zeros((0, 3))
+    crosses = np.cross(vertex_array[face_edges[:, 0]], vertex_array[face_edges[:, 1]])
+    return np.add.reduceat(crosses, face_offsets[:-1], axis=0)
+
+def _face_centroids(vertex_array, face_index, face_offsets):
+    """Средние точки вершин каждой грани"""
+    if len(face_offsets) < 2:
+        return np.zeros((0, 3))
+    sums = np.add.reduceat(vertex_array[face_index], face_offsets[:-1], axis=0)
+    return sums / np.diff(face_offsets)[:, None]
+
+_IDENTITY = np.eye(4)
+
+# Пирамида детализации: каждый уровень примерно в LOD_RATIO раз меньше
+# граней предыдущего, самый грубый - не меньше LOD_MIN_FACES граней
+LOD_RATIO = 4
+LOD_MIN_FACES = 64
+
+def _read_only(array):
+    """Представление массива, запрещающее запись"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+def _nbytes(value):
+    """Суммарный размер массивов NumPy в значении (кортежи, списки, атрибуты объектов)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return _nbytes(list(vars(value).values()))
+    return 0
+
+def _prototype_factory(build):
+    """Фабрика, строящая сетку один раз: вызовы возвращают её копии при записи"""
+    prototypes = {}
+    
+    @functools.wraps(build)
+    def factory(cls):
+        key = (cls, get_precision())
+        if key not in prototypes:
+            prototype = build(cls)
+            prototype.base_vertices = _read_only(prototype.base_vertices)
+            prototype.face_index = _read_only(prototype.face_index)
+            prototype.face_offsets = _read_only(prototype.face_offsets)
+            prototype.get_edges()  # индекс рёбер общий для всех копий
+            prototypes[key] = prototype
+        return prototypes[key].clone()
+    return factory
+
+def _edge_strips(edges, vertices):
+    """Разбиение рёбер на ломаные (каждое ребро ровно один раз) без цикла
+    Python по рёбрам
+    
+    Вершины упорядочиваются по проекции на общее направление, каждое
+    ребро идёт от младшей вершины к старшей, и в каждой вершине входящие
+    рёбра попарно сцепляются с исходящими. Вдоль цепочки старшинство
+    вершин только растёт, поэтому замкнутых цепочек нет: начало цепочки
+    находится удвоением указателей, а рёбра в ней идут в порядке младших
+    вершин. Порядок вершин влияет лишь на длину ломаных, не на их
+    правильность, так что результат можно хранить вместе со связностью.
+    Возвращает плоскую
+    последовательность вершин всех ломаных и номер ребра между соседними
+    элементами последовательности (-1 на стыке двух ломаных).
+    """
+    edges = np.asarray(edges)
+    count = len(edges)
+    if count == 0:
+        return np.zeros(0, dtype=edges.dtype), np.zeros(0, dtype=edges.dtype)
+    vertex_count = len(vertices)
+    key = np.asarray(vertices, dtype=float)[:, :3] @ np.array([0.6, 0.7, 0.3])
+    rank = np.empty(vertex_count, dtype=np.int64)
+    rank[np.argsort(key, kind="stable")] = np.arange(vertex_count)
+    first, second = edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64)
+    flip = rank[first] > rank[second]
+    low = np.where(flip, second, first)
+    high = np.where(flip, first, second)
+    
+    # k-е входящее в вершину ребро продолжается k-м исходящим
+    incoming = np.argsort(high, kind="stable")
+    outgoing = np.argsort(low, kind="stable")
+    in_count = np.bincount(high, minlength=vertex_count)
+    out_count = np.bincount(low, minlength=vertex_count)
+    in_start = np.cumsum(in_count) - in_count
+    out_start = np.cumsum(out_count) - out_count
+    links = np.minimum(in_count, out_count)
+    linked = np.repeat(np.arange(vertex_count), links)
+    within = np.arange(len(linked)) - np.repeat(np.cumsum(links) - links, links)
+    head = np.arange(count)
+    head[outgoing[out_start[linked] + within]] = incoming[in_start[linked] + within]
+    while True:
+        jump = head[head]
+        if np.array_equal(jump, head):
+            break
+        head = jump
+    order = np.argsort(head * vertex_count + rank[low])
+    
+    # Ломаная: начало первого ребра и концы всех её рёбер; между
+    # ломаными - стык с номером ребра -1
+    start = np.ones(count, dtype=bool)
+    start[1:] = head[order[1:]] != head[order[:-1]]
+    chain = np.cumsum(start) - 1
+    position = np.arange(count) + chain + 1
+    sequence = np.empty(count + chain[-1] + 1, dtype=edges.dtype)
+    sequence[position] = high[order]
+    sequence[position[start] - 1] = low[order[start]]
+    slots = np.full(len(sequence) - 1, -1, dtype=edges.dtype)
+    slots[position - 1] = order
+    return sequence, slots
+
+def _subdivide_triangles(vertices, faces, project_to_sphere):
+    """Один уровень разбиения треугольников (T, 3) на четыре"""
+    count = len(vertices)
+    sides = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]).astype(np.int64)
+    low = sides.min(axis=1)
+    high = sides.max(axis=1)
+    unique_keys, side_edge = np.unique(low * count + high, return_inverse=True)
+    
+    start, end = np.divmod(unique_keys, count)
+    midpoints = (vertices[start] + vertices[end]) * 0.5
+    if project_to_sphere:
+        midpoints /= np.linalg.norm(midpoints, axis=1)[:, None]
+    
+    a, b, c = faces.T
+    ab, bc, ca = side_edge.reshape(3, -1) + count
+    triangles = np.empty((4, len(faces), 3), dtype=np.int64)
+    triangles[0] = np.column_stack([a, ab, ca])
+    triangles[1] = np.column_stack([b, bc, ab])
+    triangles[2] = np.column_stack([c, ca, bc])
+    triangles[3] = np.column_stack([ab, bc, ca])
+    return np.concatenate([vertices, midpoints]), triangles.reshape(-1, 3)
 
 class Polyhedron:
-    def __init__(self, vertices, faces_indices):
+    def __init__(self, vertices, faces_indices, lazy=True, dtype=None):
         """
-        vertices: список объектов Point
-        faces_indices: список списков индексов вершин, образующих грани
+        vertices: список объектов Point или массив (N, 3) / (N, 4)
+        faces_indices: список списков индексов вершин, образующих грани,
+                       или массив (F, k) для граней одинакового размера
+        lazy: накапливать преобразования в одной матрице и вычислять
+              мировые координаты только при обращении к ним
+        dtype: точность вершин, np.float32 или np.float64
+               (по умолчанию - transformations.get_precision())
+        """
+        self._set_faces(*_as_face_arrays(faces_indices))
+        self.lazy = lazy
+        self._set_base_vertices(_as_vertex_array(vertices, dtype))
+    
+    @classmethod
+    def from_arrays(cls, vertex_array, face_index, face_offsets=None, lazy=True, dtype=None):
+        """Создание многогранника из готовых массивов без промежуточных списков
+        
+        face_index: плоский массив индексов (вместе с face_offsets длины F + 1)
+                    либо массив (F, k), если face_offsets не задан
+        Индексы хранятся как int32, если их меньше 2**31 (иначе int64).
+        """
+        if face_offsets is None:
+            return cls(vertex_array, face_index, lazy=lazy, dtype=dtype)
+        index_dtype = _index_dtype(len(vertex_array), len(face_index))
+        poly = cls.__new__(cls)
+        poly._set_faces(np.ascontiguousarray(face_index, dtype=index_dtype),
+                        np.ascontiguousarray(face_offsets, dtype=index_dtype))
+        poly.lazy = lazy
+        poly._set_base_vertices(_as_vertex_array(vertex_array, dtype))
+        return poly
+    
+    @classmethod
+    def from_convex_hull(cls, points, tolerance=None, lazy=True, dtype=None):
+        """Выпуклая оболочка облака точек (N, 3) или списка Point
+        
+        Вершины - крайние точки облака, грани обходятся против часовой
+        стрелки снаружи; компланарные грани объединяются в многоугольники.
+        tolerance - допуск плоскостности (по умолчанию от размера облака)
         """
-        self.vertices = vertices
-        self.faces = []
-        self.center = Point(0, 0, 0)
+        points = _as_vertex_array(points, np.float64)
+        vertex_indices, face_index, face_offsets = convex_hull(points, tolerance)
+        return cls.from_arrays(points[vertex_indices], face_index, face_offsets, lazy=lazy, dtype=dtype)
+    
+    @property
+    def dtype(self):
+        """Точность хранения вершин"""
+        return self.base_vertices.dtype
+    
+    def astype(self, dtype):
+        """Многогранник с вершинами другой точности (связность граней общая)"""
+        poly = self.clone()
+        poly._set_base_vertices(_read_only(_as_vertex_array(self.base_vertices, dtype)))
+        poly.matrix = self.matrix.copy()
+        return poly
+    
+    def clone(self):
+        """Копия при записи: исходные вершины и связность граней общие
         
-        # Создание граней на основе индексов
-        for face_indices in faces_indices:
-            face_points = [self.vertices[i].copy() for i in face_indices]
-            self.faces.append(Polygon(face_points))
+        Общие массивы доступны только для чтения у обоих многогранников;
+        первая запись вершины (_set_vertex_coordinate) или bake() создают
+        собственный массив у того, кто пишет. Вычисленные топология и данные
+        исходной геометрии тоже общие.
+        """
+        if self.base_vertices.flags.writeable:
+            # Собственный массив источника тоже становится общим
+            shared = _read_only(self.base_vertices)
+            entry = self._cache.get("vertex_array")
+            if entry is not None and entry[1] is self.base_vertices:
+                self._cache["vertex_array"] = (entry[0], shared)
+            self.base_vertices = shared
+        poly = self.__class__.__new__(self.__class__)
+        poly.face_index = self.face_index
+        poly.face_offsets = self.face_offsets
+        poly._topology = self._topology
+        poly.lazy = self.lazy
+        poly._set_base_vertices(self.base_vertices)
+        poly._base_data = self._base_data
+        poly.matrix = self.matrix.copy()
+        return poly
+    
+    def _set_faces(self, face_index, face_offsets):
+        """Замена связности граней со сбросом кэша топологии"""
+        self.face_index = face_index
+        self.face_offsets = face_offsets
+        self._topology = {}
+    
+    def _topology_cached(self, name, compute):
+        """Значение, зависящее только от связности граней (не от вершин)"""
+        if name not in self._topology:
+            self._topology[name] = compute()
+        return self._topology[name]
+    
+    def _set_base_vertices(self, base_vertices):
+        """Замена исходной геометрии со сбросом накопленной матрицы"""
+        self.base_vertices = base_vertices
+        self.matrix = np.eye(4)
+        self.version = getattr(self, "version", -1) + 1
+        self._base_data = {}
+        self._cache = {}
+    
+    def _base_cached(self, name, compute):
+        """Значение, зависящее только от исходной геометрии (до матрицы)"""
+        if name not in self._base_data:
+            self._base_data[name] = compute()
+        return self._base_data[name]
+    
+    def _cached(self, name, compute):
+        """Значение, вычисленное для текущей версии геометрии"""
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, compute())
+            self._cache[name] = entry
+        return entry[1]
+    
+    @property
+    def vertex_array(self):
+        """Мировые координаты вершин (N, 3), вычисляются по требованию"""
+        return self._cached("vertex_array", self._materialize)
+    
+    def _materialize(self):
+        """Один проход по сетке: исходные вершины, умноженные на матрицу"""
+        if np.array_equal(self.matrix, _IDENTITY):
+            return self.base_vertices
+        return transform_vertex_array(self.base_vertices, self.matrix)
+    
+    def bake(self):
+        """Перенос накопленной матрицы в исходную геометрию"""
+        world = self.vertex_array
+        if world is self.base_vertices:
+            return
         
-        self.calculate_center()
+        # Мировой массив создан _materialize и принадлежит только нам
+        version = self.version
+        matrix = self.matrix
+        pyramid = self._base_data.get("lod_pyramid") if self.is_affine() else None
+        self._set_base_vertices(world)
+        self.version = version
+        self._cache["vertex_array"] = (version, world)
+        if pyramid is not None:
+            # Уровни детализации не строятся заново: матрица переносится на них
+            self._base_data["lod_pyramid"] = [level.clone() for level in pyramid]
+            for level in self._base_data["lod_pyramid"]:
+                level.apply_transform(matrix)
+    
+    def reset_transform(self):
+        """Возврат к исходной геометрии (сброс накопленной матрицы)"""
+        self.matrix = np.eye(4)
+        self.version += 1
+    
+    @property
+    def vertices(self):
+        """Вершины как последовательность Point-представлений массива"""
+        return PointArrayView(self)
+    
+    @property
+    def faces(self):
+        """Грани как последовательность Polygon-представлений"""
+        return PolygonArrayView(self)
+    
+    @property
+    def center(self):
+        """Геометрический центр (пересчитывается только после изменений)"""
+        return self.calculate_center()
+    
+    def get_face_indices(self, face):
+        """Индексы вершин грани с номером face (представление массива)"""
+        return self.face_index[self.face_offsets[face]:self.face_offsets[face + 1]]
+    
+    def get_face_sizes(self):
+        """Количество вершин в каждой грани"""
+        return np.diff(self.face_offsets)
+    
+    def get_face_edges(self):
+        """Стороны всех граней (M, 2): пары индексов (начало, конец) по порядку граней"""
+        return self._topology_cached("face_edges", self._compute_face_edges)
+    
+    def get_corner_faces(self):
+        """Номер грани для каждого элемента face_index"""
+        return self._topology_cached(
+            "corner_faces",
+            lambda: np.repeat(np.arange(len(self.face_offsets) - 1, dtype=self.face_index.dtype), self.get_face_sizes()))
+    
+    def get_edges(self):
+        """Уникальные рёбра (E, 2): пары индексов вершин (меньший, больший)"""
+        return self._topology_cached("edges", self._compute_edges)[0]
+    
+    def get_side_edges(self):
+        """Номер уникального ребра для каждой стороны грани (строки get_face_edges)"""
+        return self._topology_cached("edges", self._compute_edges)[1]
+    
+    def get_half_edges(self):
+        """Полурёберная структура граней (HalfEdgeMesh): соседство за O(1)"""
+        return self._topology_cached(
+            "half_edges", lambda: HalfEdgeMesh(self.face_index, self.face_offsets, len(self.base_vertices),
+                                               self.get_edges(), self.get_side_edges()))
+    
+    def validate(self):
+        """Проверка многообразия и замкнутости (см. HalfEdgeMesh.validate)"""
+        return self._topology_cached("validation", lambda: self.get_half_edges().validate())
+    
+    def is_manifold(self):
+        """Каждое ребро - не больше двух согласованных граней, у вершины один веер"""
+        return self.validate()["manifold"]
+    
+    def is_closed(self):
+        """Многообразие без границы"""
+        return self.validate()["closed"]
+    
+    def get_edge_strips(self):
+        """Уникальные рёбра, собранные в ломаные (см. _edge_strips)"""
+        return self._topology_cached(
+            "edge_strips", lambda: _edge_strips(self.get_edges(), self.base_vertices))
+    
+    def _index_bound(self):
+        """Число, большее любого индекса вершины в гранях"""
+        return int(self.face_index.max()) + 1 if len(self.face_index) else 0
+    
+    def _compute_edges(self):
+        # Стороны упорядочиваются (меньший, больший) и кодируются целым ключом
+        sides = np.sort(self.get_face_edges(), axis=1).astype(np.int64)
+        count = max(self._index_bound(), 1)
+        keys, side_edge = np.unique(sides[:, 0] * count + sides[:, 1], return_inverse=True)
+        dtype = self.face_index.dtype
+        return np.stack(np.divmod(keys, count), axis=1).astype(dtype), side_edge.reshape(-1).astype(dtype)
+    
+    def _compute_face_edges(self):
+        following = np.arange(1, len(self.face_index) + 1)
+        following[self.face_offsets[1:] - 1] = self.face_offsets[:-1]
+        return np.stack([self.face_index, self.face_index[following]], axis=1)
+    
+    def _set_vertex_coordinate(self, index, axis, value):
+        """Запись одной координаты вершины (используется PointView)"""
+        self.bake()
+        if not self.base_vertices.flags.writeable:
+            # Исходный массив разделяется с другими объектами: копия при записи
+            self.base_vertices = self.base_vertices.copy()
+        self.base_vertices[index, axis] = value
+        self._base_data = {}
+        self.version += 1
     
     def calculate_center(self):
         """Вычисление геометрического центра многогранника"""
-        if not self.vertices:
-            return
+        return self._cached("center", self._compute_center)
+    
+    def _compute_center(self):
+        if len(self.base_vertices) == 0:
+            return Point(0, 0, 0)
         
-        sum_x = sum(p.x for p in self.vertices)
-        sum_y = sum(p.y for p in self.vertices)
-        sum_z = sum(p.z for p in self.vertices)
+        # Центр исходной геометрии считается один раз; для аффинной матрицы
+        # центр мировых вершин равен преобразованному исходному центру
+        base_center = self._base_cached("center", lambda: self.base_vertices.mean(axis=0))
+        if self.is_affine():
+            center = transform_vertex_array(base_center[None, :], self.matrix)[0]
+        else:
+            center = self.vertex_array.mean(axis=0)
+        return Point(*center.tolist())
+    
+    def is_affine(self):
+        """Является ли накопленная матрица аффинной (без деления на w)"""
+        return np.array_equal(self.matrix[3], (0.0, 0.0, 0.0, 1.0))
+    
+    @property
+    def face_normals(self):
+        """Нормали граней (F, 3) по формуле Ньюэлла, длина равна удвоенной площади"""
+        return self._cached("face_normals", self._compute_face_normals)
+    
+    @property
+    def face_centroids(self):
+        """Центры граней (F, 3) - средние их вершин"""
+        return self._cached("face_centroids", self._compute_face_centroids)
+    
+    def _compute_face_normals(self):
+        if not self.is_affine():
+            return _face_normals(self.vertex_array, self.get_face_edges(), self.face_offsets)
         
-        n = len(self.vertices)
-        self.center = Point(sum_x / n, sum_y / n, sum_z / n)
+        # (A x) x (A y) = cof(A) (x x y): нормали исходных граней переводятся
+        # в мировые одной матрицей 3x3, без прохода по вершинам
+        base = self._base_cached(
+            "face_normals",
+            lambda: _face_normals(self.base_vertices, self.get_face_edges(), self.face_offsets))
+        linear = self.matrix[:3, :3]
+        det = np.linalg.det(linear)
+        if det == 0:
+            return _face_normals(self.vertex_array, self.get_face_edges(), self.face_offsets)
+        cofactor = det * np.linalg.inv(linear).T
+        return base @ cofactor.T.astype(base.dtype)
+    
+    def _compute_face_centroids(self):
+        if not self.is_affine():
+            return _face_centroids(self.vertex_array, self.face_index, self.face_offsets)
+        base = self._base_cached(
+            "face_centroids",
+            lambda: _face_centroids(self.base_vertices, self.face_index, self.face_offsets))
+        return transform_vertex_array(base, self.matrix)
+    
+    def get_bounds(self):
+        """Ограничивающий параллелепипед мировых вершин (2, 3): минимум и максимум
+        
+        Для аффинной матрицы это параллелепипед вокруг преобразованных углов
+        исходного (8 точек вместо прохода по вершинам); после поворотов он
+        может быть шире точного
+        """
+        return self._cached("bounds", self._compute_bounds)
+    
+    def _compute_bounds(self):
+        if len(self.base_vertices) == 0:
+            return np.zeros((2, 3))
+        if not self.is_affine():
+            vertices = self.vertex_array
+            return np.stack([vertices.min(axis=0), vertices.max(axis=0)])
+        base = self._base_cached(
+            "bounds", lambda: np.stack([self.base_vertices.min(axis=0), self.base_vertices.max(axis=0)]))
+        if np.array_equal(self.matrix, _IDENTITY):
+            return base
+        corners = transform_vertex_array(box_corners(*base), self.matrix)
+        return np.stack([corners.min(axis=0), corners.max(axis=0)])
+    
+    def face_grid(self):
+        """Равномерная сетка (UniformGrid) над гранями исходной геометрии
+        
+        Строится один раз: apply_transform её не перестраивает, запросы
+        в мировых координатах переводятся в исходные обратной матрицей
+        """
+        return self._base_cached(
+            "face_grid", lambda: UniformGrid(*face_bounds(self.base_vertices, self.face_index, self.face_offsets)))
+    
+    def faces_in_box(self, low, high):
+        """Номера граней, чьи ограничивающие параллелепипеды пересекают мировой [low, high]"""
+        low = np.asarray(low, dtype=float)
+        high = np.asarray(high, dtype=float)
+        affine = self.is_affine() and np.linalg.det(self.matrix[:3, :3]) != 0
+        if affine:
+            corners = transform_vertex_array(box_corners(low, high), np.linalg.inv(self.matrix))
+            faces = self.face_grid().query_box(corners.min(axis=0), corners.max(axis=0))
+        else:
+            faces = np.arange(len(self.face_offsets) - 1)
+        if len(faces) == 0:
+            return faces
+        
+        # Точная проверка кандидатов по мировым вершинам только их граней
+        corner, sizes = face_corners(self.face_offsets, faces)
+        indices = self.face_index[corner]
+        if affine:
+            points = transform_vertex_array(self.base_vertices[indices], self.matrix)
+        else:
+            points = self.vertex_array[indices]
+        starts = np.cumsum(sizes) - sizes
+        face_low = np.minimum.reduceat(points, starts, axis=0)
+        face_high = np.maximum.reduceat(points, starts, axis=0)
+        return faces[np.all((face_low <= high) & (face_high >= low), axis=1)]
+    
+    def _planes_in_base(self, planes):
+        """Плоскости (P, 4) в исходных координатах и вершины, к которым они
+        применяются: для аффинной матрицы - p @ M и исходные вершины,
+        иначе - мировые вершины"""
+        planes = as_planes(planes)
+        if self.is_affine():
+            return planes @ self.matrix, self.base_vertices
+        return planes, self.vertex_array
+    
+    def clip(self, planes):
+        """Часть многогранника по положительную сторону плоскостей
+        
+        planes: (a, b, c, d) или массив (P, 4) в мировых координатах;
+        сохраняется a x + b y + c z + d >= 0. Пересекаемые грани разрезаются
+        (см. clipping.clip_faces), разрез не закрывается гранью. При аффинной
+        матрице отсечение идёт в исходных координатах, матрица сохраняется.
+        """
+        base_planes, vertices = self._planes_in_base(planes)
+        vertices, face_index, face_offsets, _ = clip_faces(vertices, self.face_index, self.face_offsets, base_planes)
+        poly = self.__class__.from_arrays(vertices, face_index, face_offsets, lazy=self.lazy, dtype=self.dtype)
+        if self.is_affine():
+            poly.apply_transform(self.matrix)
+        return poly
+    
+    def section(self, plane):
+        """Сечение плоскостью (a, b, c, d): список ломаных (k, 3) в мировых координатах"""
+        base_planes, vertices = self._planes_in_base(plane)
+        points, segments = section_segments(vertices, self.face_index, self.face_offsets, base_planes[0])
+        if self.is_affine():
+            points = transform_vertex_array(points, self.matrix)
+        return [points[line] for line in chain_segments(segments, len(points))]
     
     def apply_transform(self, matrix):
-        """Применение матрицы преобразования ко всем вершинам"""
-        for vertex in self.vertices:
-            vertex.transform(matrix)
+        """Применение матрицы преобразования ко всем вершинам
         
-        # Обновляем грани (каждая грань содержит копии вершин)
-        for face in self.faces:
-            for point in face.points:
-                point.transform(matrix)
+        В ленивом режиме матрица только домножается к накопленной (одно
+        умножение 4x4), а вершины пересчитываются при следующем чтении
+        """
+        self.matrix = np.asarray(matrix, dtype=float) @ self.matrix
+        self.version += 1
         
-        # Пересчитываем центр
-        self.calculate_center()
+        if not self.lazy:
+            self.bake()
     
     @classmethod
+    @_prototype_factory
     def create_tetrahedron(cls):
         """Создание тетраэдра (4 вершины, 4 треугольные грани)"""
         vertices = [
@@ -65,6 +601,7 @@ class Polyhedron:
         return cls(vertices, faces_indices)
     
     @classmethod
+    @_prototype_factory
     def create_hexahedron(cls):
         """Создание гексаэдра (куба) - 8 вершин, 6 квадратных граней"""
         vertices = []
@@ -73,19 +610,20 @@ class Polyhedron:
                 for z in [-1, 1]:
                     vertices.append(Point(x, y, z))
         
-        # Грани куба
+        # Грани куба (обход против часовой стрелки при взгляде снаружи)
         faces_indices = [
             [0, 1, 3, 2],  # нижняя
-            [4, 5, 7, 6],  # верхняя
-            [0, 1, 5, 4],  # передняя
+            [4, 6, 7, 5],  # верхняя
+            [0, 4, 5, 1],  # передняя
             [2, 3, 7, 6],  # задняя
             [0, 2, 6, 4],  # левая
-            [1, 3, 7, 5]   # правая
+            [1, 5, 7, 3]   # правая
         ]
         
         return cls(vertices, faces_indices)
     
     @classmethod
+    @_prototype_factory
     def create_octahedron(cls):
         """Создание октаэдра (6 вершин, 8 треугольных граней)"""
         vertices = [
@@ -106,6 +644,7 @@ class Polyhedron:
         return cls(vertices, faces_indices)
     
     @classmethod
+    @_prototype_factory
     def create_icosahedron(cls):
         """Создание икосаэдра (12 вершин, 20 треугольных граней)"""
         # Более простой и надежный метод
@@ -128,11 +667,8 @@ class Polyhedron:
         ]
         
         # Нормализация
-        for v in vertices:
-            length = np.sqrt(v.x**2 + v.y**2 + v.z**2)
-            v.x /= length
-            v.y /= length
-            v.z /= length
+        vertices = _as_vertex_array(vertices)
+        vertices /= np.linalg.norm(vertices, axis=1)[:, None]
         
         # Грани икосаэдра
         faces_indices = [
@@ -161,6 +697,7 @@ class Polyhedron:
         return cls(vertices, faces_indices)
     
     @classmethod
+    @_prototype_factory
     def create_dodecahedron(cls):
         """Создание додекаэдра (20 вершин, 12 пятиугольных граней)"""
         # Явное задание координат вершин додекаэдра
@@ -186,42 +723,158 @@ class Polyhedron:
         ]
         
         # Нормализация вершин к единичной сфере
-        for v in vertices:
-            length = np.sqrt(v.x**2 + v.y**2 + v.z**2)
-            v.x /= length
-            v.y /= length
-            v.z /= length
+        vertices = _as_vertex_array(vertices)
+        vertices /= np.linalg.norm(vertices, axis=1)[:, None]
         
         # Грани додекаэдра - 12 пятиугольников
+        # (обход против часовой стрелки при взгляде снаружи)
         faces_indices = [
-            # Верхний пятиугольник
-            [8, 16, 0, 12, 4],
-            # Нижний пятиугольник  
-            [11, 19, 7, 15, 3],
-            # Передние пятиугольники
-            [0, 16, 2, 13, 1],
-            [4, 12, 6, 14, 5],
-            # Задние пятиугольники
-            [8, 10, 2, 17, 9],
-            [18, 6, 14, 7, 19],
-            # Боковые пятиугольники
-            [0, 1, 9, 5, 4],
-            [2, 10, 11, 3, 13],
-            [16, 8, 18, 19, 17],
-            [12, 0, 4, 5, 14],
-            [1, 13, 3, 15, 7],
-            [10, 8, 4, 6, 18]
+            [0, 8, 10, 2, 16],
+            [0, 12, 14, 4, 8],
+            [0, 16, 17, 1, 12],
+            [1, 9, 5, 14, 12],
+            [1, 17, 3, 11, 9],
+            [2, 10, 6, 15, 13],
+            [2, 13, 3, 17, 16],
+            [3, 13, 15, 7, 11],
+            [4, 14, 5, 19, 18],
+            [4, 18, 6, 10, 8],
+            [5, 9, 11, 7, 19],
+            [6, 18, 19, 7, 15]
         ]
         
         return cls(vertices, faces_indices)
     
+    def triangulate(self):
+        """Разбиение граней на треугольники: k-угольник (k > 3) делится на k
+        треугольников вокруг своего центра, треугольники остаются как есть"""
+        sizes = self.get_face_sizes()
+        if np.all(sizes == 3):
+            return Polyhedron.from_arrays(self.vertex_array, self.face_index.reshape(-1, 3), dtype=self.dtype)
+        
+        vertices = self.vertex_array
+        polygon = sizes > 3
+        corner_polygon = polygon[self.get_corner_faces()]
+        face_edges = self.get_face_edges()
+        
+        # Центр каждого многоугольника становится новой вершиной
+        centers = self.face_centroids[polygon]
+        center_index = np.full(len(sizes), -1, dtype=np.int64)
+        center_index[polygon] = len(vertices) + np.arange(len(centers))
+        fan = np.column_stack([center_index[self.get_corner_faces()[corner_polygon]],
+                               face_edges[corner_polygon]])
+        
+        triangles = self.face_index[np.repeat(sizes == 3, sizes)].reshape(-1, 3)
+        return Polyhedron.from_arrays(np.concatenate([vertices, centers]),
+                                      np.concatenate([triangles, fan]), dtype=self.dtype)
+    
+    def subdivide(self, levels=1, project_to_sphere=False):
+        """Разбиение каждого треугольника на 4 (levels раз); новый многогранник
+        
+        Середины рёбер общие для соседних граней: вместо словаря-кэша середин
+        все рёбра уровня кодируются целым ключом и объединяются np.unique,
+        обратный индекс даёт номер середины для каждой стороны каждой грани.
+        project_to_sphere: переносить вершины на единичную сферу (как при
+        нормализации в create_icosahedron / create_dodecahedron)
+        """
+        mesh = self.triangulate()
+        vertices = mesh.vertex_array
+        faces = mesh.face_index.reshape(-1, 3)
+        if project_to_sphere:
+            vertices = vertices / np.linalg.norm(vertices, axis=1)[:, None]
+        
+        for _ in range(levels):
+            vertices, faces = _subdivide_triangles(vertices, faces, project_to_sphere)
+        return Polyhedron.from_arrays(vertices, faces, dtype=self.dtype)
+    
+    @classmethod
+    def create_geodesic_sphere(cls, level, base="icosahedron"):
+        """Геодезическая сфера: Платоново тело base, разбитое level раз на единичной сфере"""
+        factory = getattr(cls, f"create_{base}", None)
+        if factory is None:
+            raise ValueError(f"Unknown base polyhedron '{base}'")
+        return factory().subdivide(level, project_to_sphere=True)
+    
+    def get_lod_pyramid(self):
+        """Упрощённые копии исходной геометрии от подробной к грубой (без самого многогранника)
+        
+        Строится один раз стягиванием рёбер по квадрикам ошибок
+        (simplify.simplify_levels); уровни - треугольные сетки в исходных
+        координатах, общие для копий clone(). bake() переносит матрицу на
+        уровни, не упрощая сетку заново.
+        """
+        return self._base_cached("lod_pyramid", self._build_lod_pyramid)
+    
+    def has_lod_pyramid(self):
+        """Построена ли уже пирамида уровней детализации (без построения)"""
+        return "lod_pyramid" in self._base_data
+    
+    def build_lod_pyramid(self):
+        """Построение пирамиды уровней детализации, например в фоновом потоке
+        
+        Словарь данных исходной геометрии берётся до чтения вершин: если
+        они за время построения заменятся, пирамида останется у прежнего
+        словаря и к новой геометрии не попадёт.
+        """
+        data = self._base_data
+        if "lod_pyramid" not in data:
+            data["lod_pyramid"] = self._build_lod_pyramid()
+    
+    def _build_lod_pyramid(self):
+        base = Polyhedron.from_arrays(self.base_vertices, self.face_index, self.face_offsets,
+                                      dtype=self.dtype).triangulate()
+        targets = []
+        faces = (len(base.face_offsets) - 1) // LOD_RATIO
+        while faces >= LOD_MIN_FACES:
+            targets.append(faces)
+            faces //= LOD_RATIO
+        levels = simplify_levels(base.base_vertices, base.face_index.reshape(-1, 3), targets)
+        return [Polyhedron.from_arrays(vertices, triangles, dtype=self.dtype) for vertices, triangles in levels]
+    
+    def lod_face_counts(self):
+        """Число граней на каждом уровне детализации, начиная с нулевого (самого многогранника)"""
+        return [len(self.face_offsets) - 1] + [len(level.face_offsets) - 1 for level in self.get_lod_pyramid()]
+    
+    def get_lod(self, level):
+        """Уровень детализации level (0 - сам многогранник) с текущей матрицей"""
+        if level == 0:
+            return self
+        return self._cached(f"lod_{level}", lambda: self._lod_view(level))
+    
+    def _lod_view(self, level):
+        mesh = self.get_lod_pyramid()[level - 1].clone()
+        mesh.matrix = self.matrix @ mesh.matrix
+        return mesh
+    
     def get_vertex_list(self):
         """Возвращает список вершин в удобном формате"""
-        return [(v.x, v.y, v.z) for v in self.vertices]
+        return list(map(tuple, self.vertex_array.tolist()))
     
     def get_face_vertex_indices(self):
         """Возвращает индексы вершин для каждой грани"""
-        return [list(range(len(face.points))) for face in self.faces]
+        flat = self.face_index.tolist()
+        offsets = self.face_offsets.tolist()
+        return [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    
+    def memory_usage(self):
+        """Байты массивов многогранника по категориям
+        
+        vertices - исходные и вычисленные мировые вершины, faces - индексы
+        граней, topology - производная связность (рёбра, ломаные),
+        caches - нормали, центры, индексы и прочие данные по вершинам.
+        Массивы, общие с копиями clone() или отображённые из файла,
+        учитываются полностью.
+        """
+        report = {"vertices": self.base_vertices.nbytes}
+        world = self._cache.get("vertex_array")
+        if world is not None and world[1] is not self.base_vertices:
+            report["vertices"] += world[1].nbytes
+        report["faces"] = self.face_index.nbytes + self.face_offsets.nbytes
+        report["topology"] = _nbytes(list(self._topology.values()))
+        report["caches"] = (_nbytes(list(self._base_data.values()))
+                            + _nbytes([value for name, (_, value) in self._cache.items() if name != "vertex_array"]))
+        report["total"] = sum(report.values())
+        return report
     
     def __repr__(self):
         return f"Polyhedron({len(self.vertices)} vertices, {len(self.faces)} faces)"
\ No newline at end of file
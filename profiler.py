@@ -0,0 +1,99 @@
+import csv
+import json
+import time
+import numpy as np
+
+# Этапы кадра в порядке их выполнения в Visualizer.run
+STAGES = ("events", "projection", "faces", "blit", "edges", "ui", "flip", "wait")
+
+class FrameProfiler:
+    """Время этапов каждого кадра в кольцевом буфере последних capacity кадров
+    
+    mark(stage) относит ко времени этапа всё, что прошло с предыдущей
+    отметки. Выключенный профилировщик (enabled = False) ничего не
+    измеряет: каждая отметка - один вызов с проверкой флага.
+    Время кадра - сумма всех этапов, кроме ожидания "wait" (clock.tick
+    или pygame.event.wait).
+    """
+    def __init__(self, capacity=600, enabled=True):
+        self.enabled = enabled
+        self.samples = np.zeros((capacity, len(STAGES)))
+        self.count = 0  # всего записанных кадров
+        self._stage_index = {stage: i for i, stage in enumerate(STAGES)}
+        self._current = np.zeros(len(STAGES))
+        self._last = None
+    
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current[:] = 0.0
+        self._last = time.perf_counter()
+    
+    def mark(self, stage):
+        """Конец этапа stage (время с предыдущей отметки)"""
+        if not self.enabled or self._last is None:
+            return
+        now = time.perf_counter()
+        self._current[self._stage_index[stage]] += now - self._last
+        self._last = now
+    
+    def end_frame(self):
+        if not self.enabled or self._last is None:
+            return
+        self.samples[self.count % len(self.samples)] = self._current
+        self.count += 1
+        self._last = None
+    
+    def discard_frame(self):
+        """Отмена замеров текущего кадра (кадр не был показан)"""
+        self._last = None
+    
+    def frames(self):
+        """Записанные кадры (K, этапы) в порядке записи, в секундах"""
+        if self.count <= len(self.samples):
+            return self.samples[:self.count]
+        return np.roll(self.samples, -(self.count % len(self.samples)), axis=0)
+    
+    def frame_times(self):
+        """Время кадров без ожидания, в секундах"""
+        return self.frames()[:, :-1].sum(axis=1)
+    
+    def summary(self):
+        """Время кадра (среднее, p50, p95, p99) и среднее по этапам, в миллисекундах"""
+        frames = self.frames()
+        if len(frames) == 0:
+            return None
+        times = self.frame_times() * 1e3
+        p50, p95, p99 = np.percentile(times, [50, 95, 99]).tolist()
+        return {
+            "frames": len(frames),
+            "frame_ms": {"mean": float(times.mean()), "p50": p50, "p95": p95, "p99": p99,
+                         "max": float(times.max())},
+            "stages_ms": dict(zip(STAGES, (frames.mean(axis=0) * 1e3).tolist())),
+        }
+    
+    def export(self, path):
+        """Сохранение кадров и сводки: CSV (по кадру на строку) или JSON по расширению"""
+        frames = self.frames() * 1e3
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame", "frame_ms", *(f"{stage}_ms" for stage in STAGES)])
+                first = self.count - len(frames)
+                for i, row in enumerate(frames.tolist()):
+                    writer.writerow([first + i, sum(row[:-1]), *row])
+            return
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "stages": list(STAGES), "frames_ms": frames.tolist()},
+                      f, indent=2)
+    
+    def overlay_lines(self):
+        """Строки для отображения поверх кадра"""
+        summary = self.summary()
+        if summary is None:
+            return ["Profiler: no frames"]
+        frame = summary["frame_ms"]
+        lines = [f"Frame {frame['mean']:.2f} ms  p50 {frame['p50']:.2f}  "
+                 f"p95 {frame['p95']:.2f}  p99 {frame['p99']:.2f}"]
+        lines += [f"{stage:>10s} {ms:7.3f} ms" for stage, ms in summary["stages_ms"].items()]
+        return lines
\ No newline at end of file
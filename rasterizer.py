@@ -0,0 +1,218 @@
+import struct
+import zlib
+import numpy as np
+
+class Rasterizer:
+    """Программный растеризатор в NumPy-буфер RGBA (без окна и pygame.display)
+    
+    Повторяет правила отрисовки Visualizer: грани рисуются на отдельный
+    прозрачный слой (каждая следующая грань перекрывает предыдущие), слой
+    смешивается с кадром по альфа-каналу, затем поверх рисуются рёбра и вершины.
+    """
+    def __init__(self, width, height, bg_color=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.bg_color = bg_color
+        self.framebuffer = np.zeros((height, width, 4), dtype=np.uint8)
+        self.face_layer = np.zeros((height, width, 4), dtype=np.uint8)
+        self.layer_bounds = None  # (x0, y0, x1, y1) закрашенной области слоя
+        self.clear()
+    
+    def clear(self, color=None):
+        """Заливка кадра цветом фона"""
+        color = self.bg_color if color is None else color
+        pixel = np.array([*color[:3], 255], dtype=np.uint8).view(np.uint32)[0]
+        self.framebuffer.view(np.uint32).fill(pixel)
+    
+    def clear_face_layer(self):
+        """Очистка слоя граней (только ранее закрашенной области)"""
+        if self.layer_bounds is not None:
+            x0, y0, x1, y1 = self.layer_bounds
+            self.face_layer[y0:y1 + 1, x0:x1 + 1] = 0
+            self.layer_bounds = None
+    
+    def fill_polygon(self, points, color, target=None):
+        """Заливка многоугольника (правило чётности пересечений)"""
+        target = self.face_layer if target is None else target
+        points = np.asarray(points, dtype=float)
+        if len(points) < 3:
+            return
+        
+        x0 = max(int(np.floor(points[:, 0].min())), 0)
+        x1 = min(int(np.ceil(points[:, 0].max())), self.width - 1)
+        y0 = max(int(np.floor(points[:, 1].min())), 0)
+        y1 = min(int(np.ceil(points[:, 1].max())), self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return
+        
+        # Центры пикселей ограничивающего прямоугольника
+        px = np.arange(x0, x1 + 1) + 0.5
+        py = (np.arange(y0, y1 + 1) + 0.5)[:, None]
+        inside = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=bool)
+        
+        for (ax, ay), (bx, by) in zip(points, np.roll(points, -1, axis=0)):
+            if ay == by:
+                continue
+            crosses = (ay > py) != (by > py)
+            x_cross = ax + (py - ay) * (bx - ax) / (by - ay)
+            inside ^= crosses & (px < x_cross)
+        
+        target[y0:y1 + 1, x0:x1 + 1][inside] = color
+        if target is self.face_layer:
+            bounds = self.layer_bounds or (x0, y0, x1, y1)
+            self.layer_bounds = (min(bounds[0], x0), min(bounds[1], y0),
+                                 max(bounds[2], x1), max(bounds[3], y1))
+    
+    def fill_polygons(self, corners, offsets, faces, colors, target=None, chunk=1 << 22):
+        """Заливка многоугольников faces одним векторным проходом по строкам
+        развёртки (то же правило чётности и те же пиксели, что у fill_polygon)
+        
+        corners - вершины всех многоугольников подряд (K, 2), offsets - их
+        начала (F + 1,), faces - номера рисуемых многоугольников по порядку,
+        colors - их цвета (len(faces), 4). Каждый следующий многоугольник
+        перекрывает предыдущие, как при вызовах fill_polygon по очереди.
+        Пиксели обрабатываются частями не больше chunk.
+        """
+        target = self.face_layer if target is None else target
+        corners = np.asarray(corners, dtype=float).reshape(-1, 2)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        faces = np.asarray(faces, dtype=np.int64)
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, target.shape[2])
+        sizes = offsets[faces + 1] - offsets[faces]
+        drawn = sizes >= 3
+        faces, colors, sizes = faces[drawn], colors[drawn], sizes[drawn]
+        if len(faces) == 0:
+            return
+        
+        # Стороны многоугольников (номер в порядке рисования, начало a, конец b)
+        rank = np.repeat(np.arange(len(faces)), sizes)
+        starts = np.cumsum(sizes) - sizes
+        local = np.arange(len(rank)) - starts[rank]
+        a = corners[offsets[faces][rank] + local]
+        b = corners[offsets[faces][rank] + (local + 1) % sizes[rank]]
+        
+        # Сторона пересекает строки, центр которых y + 0.5 лежит в
+        # [min(ay, by), max(ay, by)); горизонтальные стороны - ни одну
+        low = np.minimum(a[:, 1], b[:, 1])
+        high = np.maximum(a[:, 1], b[:, 1])
+        first_row = np.maximum(np.ceil(low - 0.5), 0).astype(np.int64)
+        rows = np.maximum(np.minimum(np.ceil(high - 0.5), self.height).astype(np.int64) - first_row, 0)
+        side = np.repeat(np.arange(len(rank)), rows)
+        y = np.repeat(first_row - (np.cumsum(rows) - rows), rows) + np.arange(len(side))
+        (ax, ay), (bx, by) = a[side].T, b[side].T
+        x = ax + (y + 0.5 - ay) * (bx - ax) / (by - ay)
+        
+        # В строке многоугольника пересечения по возрастанию x парами дают
+        # отрезки [x0, x1); центр пикселя x + 0.5 внутри отрезка
+        order = np.lexsort((x, y, rank[side]))
+        x, y, span_rank = x[order], y[order], rank[side][order]
+        left = np.maximum(np.ceil(x[0::2] - 0.5), 0).astype(np.int64)
+        right = np.minimum(np.ceil(x[1::2] - 0.5), self.width).astype(np.int64)
+        lengths = np.maximum(right - left, 0)
+        y, span_rank = y[0::2], span_rank[0::2]
+        filled = lengths > 0
+        if not filled.any():
+            return
+        left, right, lengths, y, span_rank = (column[filled] for column in (left, right, lengths, y, span_rank))
+        
+        # Верхний (последний по порядку) многоугольник каждого пикселя
+        top = np.full(self.height * self.width, -1, dtype=np.int64)
+        total = np.cumsum(lengths)
+        bounds = np.searchsorted(total, np.arange(chunk, total[-1], chunk))
+        for part in np.split(np.arange(len(lengths)), bounds):
+            if len(part) == 0:
+                continue
+            counts = lengths[part]
+            pixel = (np.repeat(y[part] * self.width + left[part] - (np.cumsum(counts) - counts), counts)
+                     + np.arange(counts.sum()))
+            np.maximum.at(top, pixel, np.repeat(span_rank[part], counts))
+        
+        x0, x1 = int(left.min()), int(right.max()) - 1
+        y0, y1 = int(y.min()), int(y.max())
+        region = top.reshape(self.height, self.width)[y0:y1 + 1, x0:x1 + 1]
+        covered = region >= 0
+        target[y0:y1 + 1, x0:x1 + 1][covered] = colors[region[covered]]
+        if target is self.face_layer:
+            bounds = self.layer_bounds or (x0, y0, x1, y1)
+            self.layer_bounds = (min(bounds[0], x0), min(bounds[1], y0),
+                                 max(bounds[2], x1), max(bounds[3], y1))
+    
+    def composite_face_layer(self):
+        """Смешивание слоя граней с кадром по альфа-каналу"""
+        if self.layer_bounds is None:
+            return
+        x0, y0, x1, y1 = self.layer_bounds
+        self.blend(self.face_layer[y0:y1 + 1, x0:x1 + 1], x0, y0)
+    
+    def blend(self, layer, x=0, y=0):
+        """Наложение RGBA-слоя на кадр в позиции (x, y): src * a + dst * (1 - a)"""
+        height, width = layer.shape[:2]
+        region = self.framebuffer[y:y + height, x:x + width]
+        mask = layer[..., 3] > 0
+        if not mask.any():
+            return
+        src = layer[mask].astype(np.uint16)
+        dst = region[mask, :3].astype(np.uint16)
+        a = src[:, 3:4]
+        region[mask, :3] = ((src[:, :3] * a + dst * (255 - a) + 127) // 255).astype(np.uint8)
+    
+    def draw_segments(self, starts, ends, color, width=1):
+        """Отрисовка отрезков (M, 2) -> (M, 2) одним векторным проходом"""
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        if len(starts) == 0:
+            return
+        
+        # Каждый отрезок дискретизируется с шагом не больше пикселя
+        lengths = np.ceil(np.abs(ends - starts).max(axis=1)).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        t = (np.arange(lengths.sum()) - first) / np.maximum(lengths[segment] - 1, 1)
+        samples = starts[segment] + (ends - starts)[segment] * t[:, None]
+        self._plot(np.rint(samples).astype(np.int64), color, _square_offsets(width))
+    
+    def draw_circles(self, centers, radius, color):
+        """Отрисовка закрашенных кругов одинакового радиуса"""
+        centers = np.rint(np.asarray(centers, dtype=float).reshape(-1, 2)).astype(np.int64)
+        self._plot(centers, color, _disk_offsets(radius))
+    
+    def _plot(self, pixels, color, offsets):
+        """Закраска пикселей, смещённых на offsets от каждой точки pixels"""
+        stamped = (pixels[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+        visible = ((stamped[:, 0] >= 0) & (stamped[:, 0] < self.width)
+                   & (stamped[:, 1] >= 0) & (stamped[:, 1] < self.height))
+        stamped = stamped[visible]
+        self.framebuffer[stamped[:, 1], stamped[:, 0], :3] = color[:3]
+    
+    def to_array(self):
+        """Копия кадра в виде массива (H, W, 4) uint8"""
+        return self.framebuffer.copy()
+    
+    def to_png_bytes(self):
+        """Кодирование кадра в PNG (только стандартная библиотека)"""
+        rows = np.zeros((self.height, self.width * 4 + 1), dtype=np.uint8)
+        rows[:, 1:] = self.framebuffer.reshape(self.height, -1)
+        
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+        
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) + chunk(b"IEND", b""))
+    
+    def save_png(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_png_bytes())
+
+def _square_offsets(width):
+    """Смещения пикселей квадратной кисти толщины width"""
+    low = -(width // 2)
+    steps = np.arange(low, low + max(width, 1))
+    return np.stack(np.meshgrid(steps, steps), axis=-1).reshape(-1, 2)
+
+def _disk_offsets(radius):
+    """Смещения пикселей круга радиуса radius"""
+    steps = np.arange(-radius, radius + 1)
+    grid = np.stack(np.meshgrid(steps, steps), axis=-1).reshape(-1, 2)
+    return grid[(grid ** 2).sum(axis=1) <= radius * radius]
\ No newline at end of file
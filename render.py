@@ -0,0 +1,198 @@
+"""Пакетная отрисовка анимации многогранника в последовательность PNG или сырые кадры
+
+Запуск:
+    python render.py model.stl --turntable 120 --output frames
+    python render.py --solid icosahedron --turntable 90 --format raw --output frames.rgba
+
+Кадры рисуются без окна (Visualizer с backend="headless") в пуле процессов;
+каждый исполнитель берёт очередной диапазон кадров, а записывающий процесс
+сохраняет кадры строго по порядку. Одновременно в работе не больше window
+кадров, поэтому память не растёт с длиной анимации.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # stdout может быть потоком кадров
+
+import argparse
+import multiprocessing
+import queue
+import sys
+import time
+import numpy as np
+from polyhedron import Polyhedron
+from transformations import rotation_x_matrix, rotation_y_matrix, rotation_z_matrix
+
+_TURNTABLE_AXES = {"x": rotation_x_matrix, "y": rotation_y_matrix, "z": rotation_z_matrix}
+
+def turntable(frame_count, axis="y", degrees=360.0):
+    """Матрицы (frame_count, 4, 4) полного оборота вокруг оси без повтора первого кадра"""
+    return _TURNTABLE_AXES[axis](np.linspace(0.0, degrees, frame_count, endpoint=False))
+
+class _FrameRenderer:
+    """Отрисовка кадров анимации в одном процессе"""
+    def __init__(self, mesh_arrays, matrices, projection, width, height, image_format):
+        from visualizer import Visualizer
+        
+        self.mesh = Polyhedron.from_arrays(*mesh_arrays)
+        self.matrices = matrices
+        self.image_format = image_format
+        self.visualizer = Visualizer(width, height, backend="headless")
+        self.visualizer.projection_type = projection
+        # Кадры рисуются в полной детализации: пирамида, собираемая в фоне,
+        # делала бы кадры зависимыми от времени её готовности
+        self.visualizer.lod_enabled = False
+        self.visualizer.set_polyhedron(self.mesh, "Animation")
+    
+    def render(self, frame):
+        """Байты кадра frame: PNG-файл или сырой RGBA"""
+        self.mesh.reset_transform()
+        self.mesh.apply_transform(self.matrices[frame])
+        self.visualizer.draw_frame()
+        if self.image_format == "png":
+            return self.visualizer.rasterizer.to_png_bytes()
+        return self.visualizer.rasterizer.framebuffer.tobytes()
+
+def _worker(renderer_args, tasks, results, written, progress, window):
+    """Исполнитель: берёт диапазоны кадров из tasks, готовые кадры кладёт в results"""
+    renderer = _FrameRenderer(*renderer_args)
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        for frame in range(*task):
+            # Кадр рисуется, только когда он попадает в окно после записанных;
+            # самый ранний незаписанный кадр всегда в окне, поэтому взаимной
+            # блокировки нет
+            with progress:
+                progress.wait_for(lambda: frame < written.value + window)
+            results.put((frame, renderer.render(frame)))
+
+class _FrameWriter:
+    """Запись кадров по порядку: PNG-файлы в каталог или сырой поток в один файл"""
+    def __init__(self, output, image_format):
+        self.output = output
+        self.image_format = image_format
+        self.stream = None
+        if image_format == "png":
+            os.makedirs(output, exist_ok=True)
+        else:
+            self.stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+    
+    def write(self, frame, data):
+        if self.stream is None:
+            with open(os.path.join(self.output, f"frame_{frame:05d}.png"), "wb") as f:
+                f.write(data)
+        else:
+            self.stream.write(data)
+    
+    def close(self):
+        if self.stream is not None and self.stream is not sys.stdout.buffer:
+            self.stream.close()
+
+def render_animation(polyhedron, matrices, output, projection="perspective", width=640, height=480,
+                     image_format="png", processes=None, chunk=8, window=16):
+    """Отрисовка анимации: кадр i - polyhedron, преобразованный матрицей matrices[i]
+    
+    output: каталог для PNG (frame_00000.png, ...) или файл для сырых кадров
+            RGBA (image_format="raw"; "-" - стандартный вывод), которые
+            можно передать, например, ffmpeg -f rawvideo -pix_fmt rgba
+    processes: число процессов-исполнителей (1 - в текущем процессе)
+    chunk: размер диапазона кадров, который исполнитель берёт за раз
+    window: сколько кадров одновременно могут быть нарисованы, но не записаны
+    Возвращает отчёт со временем отрисовки.
+    """
+    if image_format not in ("png", "raw"):
+        raise ValueError("image_format must be 'png' or 'raw'")
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    frame_count = len(matrices)
+    processes = max(1, min(processes or os.cpu_count() or 1, frame_count))
+    mesh_arrays = (polyhedron.vertex_array, polyhedron.face_index, polyhedron.face_offsets)
+    renderer_args = (mesh_arrays, matrices, projection, width, height, image_format)
+    writer = _FrameWriter(output, image_format)
+    start = time.perf_counter()
+    
+    try:
+        if processes == 1:
+            renderer = _FrameRenderer(*renderer_args)
+            for frame in range(frame_count):
+                writer.write(frame, renderer.render(frame))
+        else:
+            _render_parallel(renderer_args, frame_count, writer, processes, chunk, window)
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    return {"frames": frame_count, "processes": processes, "seconds": elapsed,
+            "fps": frame_count / elapsed if elapsed > 0 else None}
+
+def _render_parallel(renderer_args, frame_count, writer, processes, chunk, window):
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    written = multiprocessing.Value("q", 0, lock=False)
+    progress = multiprocessing.Condition()
+    for first in range(0, frame_count, chunk):
+        tasks.put((first, min(first + chunk, frame_count)))
+    for _ in range(processes):
+        tasks.put(None)
+    
+    worker_args = (renderer_args, tasks, results, written, progress, window)
+    workers = [multiprocessing.Process(target=_worker, args=worker_args, daemon=True)
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    
+    # Кадры приходят в произвольном порядке; до записи ждут в pending
+    # (не больше window штук - исполнители не забегают дальше окна)
+    pending = {}
+    try:
+        for frame in range(frame_count):
+            while frame not in pending:
+                try:
+                    index, data = results.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        raise RuntimeError("render workers exited before finishing")
+                    continue
+                pending[index] = data
+            writer.write(frame, pending.pop(frame))
+            with progress:
+                written.value = frame + 1
+                progress.notify_all()
+    finally:
+        for worker in workers:
+            if worker.is_alive() and written.value < frame_count:
+                worker.terminate()
+            worker.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a polyhedron animation headlessly")
+    parser.add_argument("mesh", nargs="?", help="OBJ/STL file (default: --solid)")
+    parser.add_argument("--solid", default="dodecahedron",
+                        choices=["tetrahedron", "hexahedron", "octahedron", "icosahedron", "dodecahedron"])
+    parser.add_argument("--turntable", type=int, default=120, metavar="FRAMES",
+                        help="frames in one full turn")
+    parser.add_argument("--axis", default="y", choices=sorted(_TURNTABLE_AXES))
+    parser.add_argument("--tilt", type=float, default=20.0, help="rotation about X before the turn (degrees)")
+    parser.add_argument("--projection", default="perspective", choices=["perspective", "axonometric"])
+    parser.add_argument("--size", default="640x480", help="frame size WIDTHxHEIGHT")
+    parser.add_argument("--format", default="png", choices=["png", "raw"])
+    parser.add_argument("--output", default="frames", help="PNG directory or raw file ('-' for stdout)")
+    parser.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    
+    if args.mesh:
+        from mesh_io import load_mesh
+        polyhedron = load_mesh(args.mesh, normalize=True)[0]
+    else:
+        polyhedron = getattr(Polyhedron, f"create_{args.solid}")()
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    matrices = rotation_x_matrix(args.tilt) @ turntable(args.turntable, args.axis)
+    
+    report = render_animation(polyhedron, matrices, args.output, args.projection, width, height,
+                              args.format, args.processes)
+    print(f"Rendered {report['frames']} frames with {report['processes']} processes "
+          f"in {report['seconds']:.2f} s ({report['fps']:.1f} fps)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
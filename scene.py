@@ -0,0 +1,96 @@
+import numpy as np
+from polyhedron import Polyhedron
+from transformations import rotation_x_matrix, rotation_y_matrix, scaling_matrix, translation_matrix
+
+PLATONIC_FACTORIES = {
+    "Tetrahedron": Polyhedron.create_tetrahedron,
+    "Hexahedron": Polyhedron.create_hexahedron,
+    "Octahedron": Polyhedron.create_octahedron,
+    "Icosahedron": Polyhedron.create_icosahedron,
+    "Dodecahedron": Polyhedron.create_dodecahedron,
+}
+
+class Scene:
+    """Сцена из множества экземпляров многогранников
+    
+    Каждая сетка хранится один раз, у каждого экземпляра своя матрица 4x4.
+    Все экземпляры одной сетки преобразуются одним пакетным умножением.
+    """
+    def __init__(self):
+        self.meshes = {}      # имя -> Polyhedron (общая сетка)
+        self.transforms = {}  # имя -> стопка матриц экземпляров (K, 4, 4)
+        self.version = 0
+    
+    def add_mesh(self, name, polyhedron):
+        """Регистрация сетки (без экземпляров)"""
+        self.meshes[name] = polyhedron
+        self.transforms.setdefault(name, np.empty((0, 4, 4)))
+        self.version += 1
+    
+    def add_instances(self, name, matrices):
+        """Добавление экземпляров сетки name; возвращает их номера"""
+        if name not in self.meshes:
+            if name not in PLATONIC_FACTORIES:
+                raise KeyError(f"Unknown mesh '{name}'")
+            self.add_mesh(name, PLATONIC_FACTORIES[name]())
+        
+        matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+        start = len(self.transforms[name])
+        self.transforms[name] = np.concatenate([self.transforms[name], matrices])
+        self.version += 1
+        return np.arange(start, start + len(matrices))
+    
+    def set_transforms(self, name, matrices):
+        """Замена матриц всех экземпляров сетки name"""
+        self.transforms[name] = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+        self.version += 1
+    
+    def apply_transform(self, matrix, name=None):
+        """Применение матрицы (или стопки по экземплярам) ко всем экземплярам"""
+        names = self.meshes if name is None else [name]
+        for mesh_name in names:
+            self.transforms[mesh_name] = np.asarray(matrix, dtype=float) @ self.transforms[mesh_name]
+        self.version += 1
+    
+    def instance_count(self):
+        return sum(len(matrices) for matrices in self.transforms.values())
+    
+    def face_count(self):
+        return sum(len(self.transforms[name]) * (len(mesh.face_offsets) - 1)
+                   for name, mesh in self.meshes.items())
+    
+    def world_vertices(self, name, instances=None):
+        """Мировые координаты экземпляров сетки (по умолчанию всех): (K, N, 3) за одно умножение"""
+        matrices = self.transforms[name]
+        if instances is not None:
+            matrices = matrices[instances]
+        vertices = self.meshes[name].vertex_array
+        return vertices @ np.swapaxes(matrices[:, :3, :3], 1, 2) + matrices[:, None, :3, 3]
+    
+    def __iter__(self):
+        """Пары (имя, сетка) для сеток, у которых есть экземпляры"""
+        for name, mesh in self.meshes.items():
+            if len(self.transforms[name]):
+                yield name, mesh
+    
+    def __repr__(self):
+        return f"Scene({len(self.meshes)} meshes, {self.instance_count()} instances)"
+    
+    @classmethod
+    def create_platonic_swarm(cls, count=1000, extent=3.0, size=0.15, seed=None):
+        """Сцена из count случайно расположенных Платоновых тел"""
+        rng = np.random.default_rng(seed)
+        scene = cls()
+        kinds = rng.integers(len(PLATONIC_FACTORIES), size=count)
+        
+        # Матрицы всех экземпляров строятся пакетно
+        position = rng.uniform(-extent, extent, size=(count, 3))
+        scale = size * rng.uniform(0.5, 1.5, size=count)
+        matrices = (translation_matrix(position[:, 0], position[:, 1], position[:, 2])
+                    @ rotation_y_matrix(rng.uniform(0, 360, size=count))
+                    @ rotation_x_matrix(rng.uniform(0, 360, size=count))
+                    @ scaling_matrix(scale, scale, scale))
+        
+        for kind, name in enumerate(PLATONIC_FACTORIES):
+            scene.add_instances(name, matrices[kinds == kind])
+        return scene
\ No newline at end of file
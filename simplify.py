@@ -0,0 +1,245 @@
+import numpy as np
+
+# Вес квадрик граничных рёбер: граница открытой сетки сохраняется
+BOUNDARY_WEIGHT = 100.0
+
+def _scatter_add(index, values, count):
+    """Сумма строк values (M, ...) по номерам index в массив (count, ...)"""
+    flat = values.reshape(len(values), -1)
+    result = np.empty((count, flat.shape[1]))
+    for column in range(flat.shape[1]):
+        result[:, column] = np.bincount(index, weights=flat[:, column], minlength=count)
+    return result.reshape((count,) + values.shape[1:])
+
+def _plane_quadrics(normals, points, weights):
+    """Квадрики плоскостей (K, 4, 4): n - единичные нормали, points - точки плоскостей"""
+    planes = np.column_stack([normals, -np.einsum("ij,ij->i", normals, points)])
+    return weights[:, None, None] * planes[:, :, None] * planes[:, None, :]
+
+def _vertex_quadrics(vertices, triangles):
+    """Квадрики вершин: сумма плоскостей смежных треугольников (с весом площади)
+    и перпендикулярных плоскостей граничных рёбер"""
+    a, b, c = (vertices[triangles[:, i]] for i in range(3))
+    normal = np.cross(b - a, c - a)
+    area = np.linalg.norm(normal, axis=1)
+    unit = normal / np.where(area > 0, area, 1.0)[:, None]
+    quadrics = _scatter_add(triangles.reshape(-1), np.repeat(_plane_quadrics(unit, a, area * 0.5), 3, axis=0),
+                            len(vertices))
+    
+    # Стороны, принадлежащие одному треугольнику, - граница сетки
+    sides = triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    low = sides.min(axis=1).astype(np.int64)
+    keys = low * len(vertices) + sides.max(axis=1)
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    boundary = np.flatnonzero(counts[inverse] == 1)
+    if len(boundary):
+        start = vertices[sides[boundary, 0]]
+        direction = vertices[sides[boundary, 1]] - start
+        perpendicular = np.cross(direction, unit[boundary // 3])
+        length = np.linalg.norm(perpendicular, axis=1)
+        perpendicular /= np.where(length > 0, length, 1.0)[:, None]
+        weight = BOUNDARY_WEIGHT * np.einsum("ij,ij->i", direction, direction)
+        boundary_quadrics = _plane_quadrics(perpendicular, start, weight)
+        quadrics += _scatter_add(sides[boundary].reshape(-1), np.repeat(boundary_quadrics, 2, axis=0),
+                                 len(vertices))
+    return quadrics
+
+def _unique_edges(triangles, vertex_count):
+    """Уникальные рёбра (E, 2), их целые ключи и число треугольников при каждом"""
+    sides = np.sort(triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1).astype(np.int64)
+    keys, counts = np.unique(sides[:, 0] * vertex_count + sides[:, 1], return_counts=True)
+    return np.stack(np.divmod(keys, vertex_count), axis=1), keys, counts
+
+def _error(quadrics, points):
+    """Ошибка v^T Q v для точек (E, 3) и квадрик (E, 4, 4)"""
+    homogeneous = np.column_stack([points, np.ones(len(points))])
+    return (np.matmul(quadrics, homogeneous[:, :, None])[:, :, 0] * homogeneous).sum(axis=1)
+
+def _collapse_targets(vertices, quadrics, edges):
+    """Лучшая точка стягивания каждого ребра и её ошибка
+    
+    Кандидаты: минимум квадрики (если система невырождена), концы и середина
+    """
+    q = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    start = vertices[edges[:, 0]]
+    end = vertices[edges[:, 1]]
+    candidates = [start, end, (start + end) * 0.5]
+    
+    system = q[:, :3, :3]
+    det = np.linalg.det(system)
+    scale = np.abs(np.einsum("eii->e", system)) ** 3
+    solvable = np.abs(det) > 1e-9 * np.maximum(scale, 1e-300)
+    if solvable.any():
+        optimum = candidates[2].copy()
+        optimum[solvable] = np.linalg.solve(system[solvable], -q[solvable, :3, 3:4])[:, :, 0]
+        # Минимум далеко от ребра (почти плоская область) не используется
+        span = np.linalg.norm(end - start, axis=1)
+        far = np.linalg.norm(optimum - candidates[2], axis=1) > 2.0 * span
+        optimum[far] = candidates[2][far]
+        candidates.append(optimum)
+    
+    errors = np.stack([_error(q, point) for point in candidates])
+    best = np.argmin(errors, axis=0)
+    positions = np.stack(candidates)[best, np.arange(len(edges))]
+    return positions, errors[best, np.arange(len(edges))]
+
+def _link_condition(edges, selected, boundary_edge, vertex_count):
+    """Стягивание не нарушает многообразие: у концов ребра ровно 2 общих
+    соседа (1 для граничного ребра)"""
+    ends = np.concatenate([edges, edges[:, ::-1]])
+    order = np.argsort(ends[:, 0], kind="stable")
+    neighbours = ends[order, 1]
+    first = np.searchsorted(ends[order, 0], np.arange(vertex_count + 1))
+    
+    chosen = np.flatnonzero(selected)
+    pairs = []
+    for side in (0, 1):
+        vertex = edges[chosen, side]
+        degree = first[vertex + 1] - first[vertex]
+        owner = np.repeat(np.arange(len(chosen)), degree)
+        offset = np.arange(degree.sum()) - np.repeat(np.cumsum(degree) - degree, degree)
+        pairs.append(owner.astype(np.int64) * vertex_count + neighbours[first[vertex][owner] + offset])
+    common = np.intersect1d(np.unique(pairs[0]), np.unique(pairs[1]), assume_unique=True)
+    shared = np.bincount(common // vertex_count, minlength=len(chosen))
+    allowed = np.where(boundary_edge[chosen], 1, 2)
+    valid = selected.copy()
+    valid[chosen] = shared == allowed
+    return valid
+
+def _independent_edges(edges, rank, available, triangles, count, rounds=4):
+    """Рёбра, никакие два из которых не касаются одного треугольника
+    
+    За раунд выбираются рёбра, дешевле всех доступных рёбер обоих концов;
+    из выбранных рёбер, касающихся общего треугольника, остаётся самое
+    дешёвое. Рёбра у треугольников выбранных становятся недоступны.
+    """
+    unused = len(edges)
+    selected = np.zeros(len(edges), dtype=bool)
+    for _ in range(rounds):
+        ranks = np.where(available, rank, unused)
+        best = np.full(count, unused, dtype=np.int64)
+        np.minimum.at(best, edges[:, 0], ranks)
+        np.minimum.at(best, edges[:, 1], ranks)
+        new = available & (best[edges[:, 0]] == rank) & (best[edges[:, 1]] == rank)
+        if not new.any():
+            break
+        
+        # Самое дешёвое выбранное ребро у каждого треугольника и каждой вершины
+        vertex_rank = np.full(count, unused, dtype=np.int64)
+        vertex_rank[edges[new, 0]] = rank[new]
+        vertex_rank[edges[new, 1]] = rank[new]
+        triangle_rank = vertex_rank[triangles].min(axis=1)
+        nearest = np.full(count, unused, dtype=np.int64)
+        np.minimum.at(nearest, triangles.reshape(-1), np.repeat(triangle_rank, 3))
+        new &= (nearest[edges[:, 0]] == rank) & (nearest[edges[:, 1]] == rank)
+        selected |= new
+        
+        # Вершины треугольников, касающихся выбранных рёбер, заняты
+        touched = np.zeros(count, dtype=bool)
+        touched[edges[new].reshape(-1)] = True
+        taken = np.zeros(count, dtype=bool)
+        taken[triangles[touched[triangles].any(axis=1)].reshape(-1)] = True
+        available &= ~(taken[edges[:, 0]] | taken[edges[:, 1]])
+    return selected
+
+def _edge_costs(vertices, quadrics, edges, keys, previous):
+    """Точки и ошибки стягивания рёбер; previous - результат прошлого прохода
+    
+    previous = (ключи, точки, ошибки, изменённые вершины): пересчитываются
+    только новые рёбра и рёбра при вершинах, изменённых прошлым проходом
+    """
+    if previous is None:
+        positions, errors = _collapse_targets(vertices, quadrics, edges)
+        return positions, errors
+    
+    old_keys, old_positions, old_errors, dirty = previous
+    index = np.minimum(np.searchsorted(old_keys, keys), len(old_keys) - 1)
+    stale = (old_keys[index] != keys) | dirty[edges[:, 0]] | dirty[edges[:, 1]]
+    positions = old_positions[index]
+    errors = old_errors[index]
+    if stale.any():
+        positions[stale], errors[stale] = _collapse_targets(vertices, quadrics, edges[stale])
+    return positions, errors
+
+def _collapse_pass(vertices, triangles, quadrics, budget, previous=None):
+    """Один проход: стягивание независимого набора самых дешёвых рёбер
+    
+    Выбираются рёбра из budget самых дешёвых, не имеющие общих
+    треугольников (_independent_edges). Стягивания, переворачивающие
+    треугольники или нарушающие многообразие, отменяются.
+    Номера вершин не меняются (слитые вершины просто не используются).
+    Возвращает новые вершины, треугольники, число стягиваний и стоимости
+    рёбер для следующего прохода; квадрики обновляются на месте.
+    """
+    count = len(vertices)
+    edges, keys, face_counts = _unique_edges(triangles, count)
+    positions, errors = _edge_costs(vertices, quadrics, edges, keys, previous)
+    
+    rank = np.empty(len(edges), dtype=np.int64)
+    rank[np.argsort(errors, kind="stable")] = np.arange(len(edges))
+    selected = _independent_edges(edges, rank, (rank < budget) & (face_counts <= 2), triangles, count)
+    selected = _link_condition(edges, selected, face_counts == 1, count)
+    old_normal = np.cross(vertices[triangles[:, 1]] - vertices[triangles[:, 0]],
+                          vertices[triangles[:, 2]] - vertices[triangles[:, 0]])
+    # Треугольники нулевой площади (например, из STL или после отсечения)
+    # не имеют направления: их переворот не проверяется
+    oriented = np.any(old_normal != 0, axis=1)
+    
+    while True:
+        # Вершина edges[:, 1] сливается с edges[:, 0], которая переносится в новую точку
+        chosen = np.flatnonzero(selected)
+        target = np.arange(count)
+        target[edges[chosen, 1]] = edges[chosen, 0]
+        moved = vertices.copy()
+        moved[edges[chosen, 0]] = positions[chosen]
+        
+        new_triangles = target[triangles]
+        a, b, c = (new_triangles[:, i] for i in range(3))
+        alive = (a != b) & (b != c) & (c != a)
+        new_normal = np.cross(moved[b] - moved[a], moved[c] - moved[a])
+        flipped = alive & oriented & (np.einsum("ij,ij->i", old_normal, new_normal) <= 0)
+        if not flipped.any() or len(chosen) == 0:
+            break
+        
+        # Стягивания, затрагивающие перевёрнутые треугольники, отменяются
+        # (перевернуться может только треугольник со сдвинутой вершиной,
+        # поэтому каждый раз стягиваний становится меньше)
+        blocked = np.zeros(count, dtype=bool)
+        blocked[triangles[flipped].reshape(-1)] = True
+        selected &= ~(blocked[edges[:, 0]] | blocked[edges[:, 1]])
+    
+    quadrics[edges[chosen, 0]] += quadrics[edges[chosen, 1]]
+    dirty = np.zeros(count, dtype=bool)
+    dirty[edges[chosen, 0]] = True
+    return moved, new_triangles[alive], len(chosen), (keys, positions, errors, dirty)
+
+def _compact(vertices, triangles, quadrics):
+    """Удаление вершин, не входящих ни в один треугольник"""
+    used = np.zeros(len(vertices), dtype=bool)
+    used[triangles.reshape(-1)] = True
+    index = np.cumsum(used) - 1
+    return vertices[used], index[triangles], quadrics[used]
+
+def simplify_levels(vertices, triangles, targets):
+    """Последовательное упрощение треугольной сетки стягиванием рёбер (квадрики ошибок)
+    
+    targets: убывающие числа треугольников; для каждого возвращается пара
+    (вершины, треугольники) первого состояния, где треугольников не больше
+    цели (или последнего, если упростить дальше нельзя)
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    quadrics = _vertex_quadrics(vertices, triangles)
+    levels = []
+    for target in targets:
+        costs = None
+        while len(triangles) > target:
+            # Каждое стягивание убирает около двух треугольников; нижняя граница
+            # бюджета не даёт проходам измельчаться у самой цели
+            budget = max((len(triangles) - target) // 2, len(triangles) // 32, 1)
+            vertices, triangles, collapsed, costs = _collapse_pass(vertices, triangles, quadrics, budget, costs)
+            if collapsed == 0:
+                break
+        vertices, triangles, quadrics = _compact(vertices, triangles, quadrics)
+        levels.append((vertices, triangles))
+    return levels
\ No newline at end of file
@@ -0,0 +1,104 @@
+import numpy as np
+
+class UniformGrid:
+    """Равномерная сетка над ограничивающими прямоугольниками объектов (2D или 3D)
+    
+    Каждый объект заносится во все ячейки, которые пересекает его
+    прямоугольник; содержимое ячеек хранится плоско (как face_index):
+    items[starts[c]:starts[c + 1]] - объекты ячейки c.
+    """
+    def __init__(self, low, high, items_per_cell=4, max_cells=1 << 22):
+        """low, high: (M, d) - углы прямоугольников объектов"""
+        low = np.asarray(low, dtype=float)
+        high = np.asarray(high, dtype=float)
+        count, dimensions = low.shape
+        self.low = low.min(axis=0) if count else np.zeros(dimensions)
+        extent = (high.max(axis=0) - self.low) if count else np.zeros(dimensions)
+        
+        # Число ячеек по осям пропорционально размерам, в среднем
+        # items_per_cell объектов на ячейку
+        cells = min(max(count / items_per_cell, 1.0), max_cells)
+        positive = extent > 0
+        volume = np.prod(extent[positive]) if positive.any() else 1.0
+        side = (volume / cells) ** (1.0 / max(positive.sum(), 1))
+        self.shape = np.where(positive, np.clip(np.ceil(extent / side), 1, None), 1).astype(np.int64)
+        self.cell_size = np.where(positive, extent / self.shape, 1.0)
+        self.strides = np.cumprod(np.concatenate([self.shape[1:], [1]])[::-1])[::-1]
+        
+        first = self._cells(low)
+        last = self._cells(high)
+        spans = last - first + 1
+        counts = np.prod(spans, axis=1)
+        
+        # Пары (объект, ячейка) для всех ячеек, накрытых каждым объектом
+        item = np.repeat(np.arange(count), counts)
+        local = np.arange(len(item)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell = np.zeros(len(item), dtype=np.int64)
+        for axis in range(dimensions - 1, -1, -1):
+            span = spans[item, axis]
+            cell += (first[item, axis] + local % span) * self.strides[axis]
+            local //= span
+        
+        # Сортировка пар по ячейке; границы ячеек - по числу пар в каждой
+        self.items = item[np.argsort(cell)]
+        self.starts = np.zeros(np.prod(self.shape) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell, minlength=len(self.starts) - 1), out=self.starts[1:])
+    
+    def _cells(self, points):
+        """Координаты ячеек (M, d) для точек, прижатые к границам сетки"""
+        cells = np.floor((points - self.low) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.shape - 1)
+    
+    def query_box(self, low, high):
+        """Объекты, чьи прямоугольники могут пересекать прямоугольник [low, high]"""
+        low = np.asarray(low, dtype=float)
+        high = np.asarray(high, dtype=float)
+        grid_high = self.low + self.cell_size * self.shape
+        if np.any(high < self.low) or np.any(low > grid_high):
+            return np.zeros(0, dtype=np.int64)
+        
+        first, last = self._cells(np.stack([low, high]))
+        ranges = np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(first, last)], indexing="ij")
+        cells = sum(r.reshape(-1) * stride for r, stride in zip(ranges, self.strides))
+        parts = [self.items[self.starts[c]:self.starts[c + 1]] for c in cells.tolist()]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+    
+    def query_point(self, point):
+        """Объекты, чьи прямоугольники могут содержать точку"""
+        return self.query_box(point, point)
+
+def face_bounds(points, face_index, face_offsets):
+    """Ограничивающие прямоугольники граней: (F, d) минимумы и максимумы"""
+    corners = points[face_index]
+    starts = face_offsets[:-1]
+    return np.minimum.reduceat(corners, starts, axis=0), np.maximum.reduceat(corners, starts, axis=0)
+
+def box_corners(low, high):
+    """Восемь вершин параллелепипеда [low, high] (8, 3)"""
+    select = np.array([[i >> 2 & 1, i >> 1 & 1, i & 1] for i in range(8)], dtype=bool)
+    return np.where(select, high, low)
+
+def face_corners(face_offsets, faces):
+    """Позиции в face_index всех вершин граней faces подряд и размеры граней"""
+    sizes = face_offsets[faces + 1] - face_offsets[faces]
+    starts = np.repeat(face_offsets[faces] - (np.cumsum(sizes) - sizes), sizes)
+    return starts + np.arange(int(sizes.sum())), sizes
+
+def points_in_polygons(point, points, face_index, face_offsets, faces):
+    """Маска граней faces, содержащих 2D-точку (правило чётности пересечений)"""
+    if len(faces) == 0:
+        return np.zeros(0, dtype=bool)
+    corner, sizes = face_corners(face_offsets, faces)
+    starts = np.repeat(face_offsets[faces], sizes)
+    following = starts + (corner - starts + 1) % np.repeat(sizes, sizes)
+    
+    a = points[face_index[corner]]
+    b = points[face_index[following]]
+    x, y = point
+    crosses = (a[:, 1] > y) != (b[:, 1] > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    hits = crosses & (x < x_cross)
+    return np.add.reduceat(hits.astype(np.int64), np.cumsum(sizes) - sizes) % 2 == 1
\ No newline at end of file
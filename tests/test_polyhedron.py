@@ -0,0 +1,26 @@
+import numpy as np
+
+from polyhedron import Polyhedron
+
+
+def test_clone_write_to_source_does_not_change_clone():
+    source = Polyhedron.create_geodesic_sphere(1)
+    clone = source.clone()
+    original = clone.vertex_array[0].copy()
+    center = clone.center.to_homogeneous()
+    
+    source.vertices[0].x = 9
+    
+    assert source.vertex_array[0, 0] == 9
+    assert np.array_equal(clone.vertex_array[0], original)
+    assert np.array_equal(clone.center.to_homogeneous(), center)
+
+
+def test_clone_write_to_clone_does_not_change_source():
+    source = Polyhedron(np.eye(3), [[0, 1, 2]], lazy=False)
+    clone = source.clone()
+    
+    clone.vertices[1].y = 5
+    
+    assert clone.vertex_array[1, 1] == 5
+    assert source.vertex_array[1, 1] == 1
\ No newline at end of file
@@ -0,0 +1,28 @@
+import numpy as np
+
+from scene import Scene
+from transformations import scaling_matrix, translation_matrix
+from visualizer import Visualizer
+
+
+def test_scene_instance_around_camera_is_near_clipped():
+    visualizer = Visualizer(200, 150, backend="headless")
+    visualizer.projection_type = "perspective"
+    scene = Scene()
+    # Наблюдатель (z = -perspective_d) внутри параллелепипеда первого экземпляра
+    around = translation_matrix(0, 0, -visualizer.perspective_d) @ scaling_matrix(4, 4, 4)
+    scene.add_instances("Hexahedron", [around, translation_matrix(0, 0, 2)])
+    visualizer.set_scene(scene)
+    
+    projected = []
+    project_vertices = visualizer.project_vertices
+    def record(vertices):
+        projected.append(np.array(vertices))
+        return project_vertices(vertices)
+    visualizer.project_vertices = record
+    visualizer.draw_scene()
+    
+    depth = np.concatenate(projected)[:, 2] + visualizer.perspective_d
+    assert len(projected) == 2
+    assert depth.min() >= visualizer.near_distance - 1e-9
+    assert np.isfinite(np.concatenate([project_vertices(p) for p in projected])).all()
\ No newline at end of file
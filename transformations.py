@@ -1,84 +1,362 @@
 import numpy as np
 
+# Точность вещественных данных по умолчанию: матрицы этого модуля
+# и вершины новых многогранников
+_precision = np.dtype(np.float64)
+
+def set_precision(dtype):
+    """Выбор точности по умолчанию: np.float32 (вдвое меньше памяти) или np.float64"""
+    global _precision
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("precision must be float32 or float64")
+    _precision = dtype
+
+def get_precision():
+    return _precision
+
+def transform_vertex_array(vertex_array, matrix):
+    """Применение матрицы 4x4 к массиву вершин (N, 3) одним умножением
+    
+    Результат имеет точность массива вершин (float32 остаётся float32)
+    """
+    matrix = np.asarray(matrix, dtype=np.result_type(vertex_array, np.float32))
+    result = vertex_array @ matrix[:3, :3].T + matrix[:3, 3]
+    
+    # Деление на w нужно только для проективных матриц
+    if np.any(matrix[3] != (0.0, 0.0, 0.0, 1.0)):
+        w = vertex_array @ matrix[3, :3] + matrix[3, 3]
+        result /= w[:, None]
+    return result
+
+def _screen_buffer(vertex_array, out):
+    """Массив экранных координат (N, 2) с точностью вершин, если out не задан"""
+    if out is not None:
+        return out
+    return np.empty((len(vertex_array), 2), dtype=np.result_type(vertex_array, np.float32))
+
+def axonometric_projection(vertex_array, width, height, scale=100, out=None):
+    """Аксонометрическая проекция массива вершин (N, 3) в экранные координаты (N, 2)"""
+    x, y, z = vertex_array[:, 0], vertex_array[:, 1], vertex_array[:, 2]
+    screen = _screen_buffer(vertex_array, out)
+    screen[:, 0] = (x - z) * scale + width // 2
+    screen[:, 1] = -(y + (x + z) * 0.5) * scale + height // 2
+    return screen
+
+def perspective_projection(vertex_array, d, width, height, scale=200, out=None):
+    """Перспективная проекция (центр в (0, 0, -d)) массива вершин (N, 3) -> (N, 2)"""
+    depth = vertex_array[:, 2] + d
+    degenerate = depth == 0  # Избегаем деления на ноль
+    factor = d / np.where(degenerate, 1.0, depth)
+    
+    screen = _screen_buffer(vertex_array, out)
+    screen[:, 0] = vertex_array[:, 0] * factor * scale + width // 2
+    screen[:, 1] = -vertex_array[:, 1] * factor * scale + height // 2
+    screen[degenerate] = (width // 2, height // 2)
+    return screen
+
+def _matrix_stack(*args):
+    """Приведение аргументов к общей форме и заготовка единичных матриц
+    
+    Скалярные аргументы дают одну матрицу 4x4, массивы формы S - стопку S x 4 x 4
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+    shape = arrays[0].shape
+    matrices = np.zeros(shape + (4, 4), dtype=_precision)
+    matrices[..., [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    return matrices, arrays
+
 def translation_matrix(dx, dy, dz):
     """Матрица смещения"""
-    return np.array([
-        [1, 0, 0, dx],
-        [0, 1, 0, dy],
-        [0, 0, 1, dz],
-        [0, 0, 0, 1]
-    ], dtype=float)
+    matrices, (dx, dy, dz) = _matrix_stack(dx, dy, dz)
+    matrices[..., 0, 3] = dx
+    matrices[..., 1, 3] = dy
+    matrices[..., 2, 3] = dz
+    return matrices
 
 def scaling_matrix(sx, sy, sz):
     """Матрица масштабирования"""
-    return np.array([
-        [sx, 0, 0, 0],
-        [0, sy, 0, 0],
-        [0, 0, sz, 0],
-        [0, 0, 0, 1]
-    ], dtype=float)
+    matrices, (sx, sy, sz) = _matrix_stack(sx, sy, sz)
+    matrices[..., 0, 0] = sx
+    matrices[..., 1, 1] = sy
+    matrices[..., 2, 2] = sz
+    return matrices
 
-def rotation_x_matrix(angle_degrees):
-    """Матрица поворота вокруг оси X (угол в градусах)"""
-    angle = np.radians(angle_degrees)
+def _rotation_matrix(angle_degrees, i, j):
+    """Матрица поворота в плоскости осей i, j (угол в градусах)"""
+    matrices, (angle,) = _matrix_stack(np.radians(angle_degrees))
     cos_a = np.cos(angle)
     sin_a = np.sin(angle)
     
-    return np.array([
-        [1, 0, 0, 0],
-        [0, cos_a, -sin_a, 0],
-        [0, sin_a, cos_a, 0],
-        [0, 0, 0, 1]
-    ], dtype=float)
+    matrices[..., i, i] = cos_a
+    matrices[..., i, j] = -sin_a
+    matrices[..., j, i] = sin_a
+    matrices[..., j, j] = cos_a
+    return matrices
+
+def rotation_x_matrix(angle_degrees):
+    """Матрица поворота вокруг оси X (угол в градусах)"""
+    return _rotation_matrix(angle_degrees, 1, 2)
 
 def rotation_y_matrix(angle_degrees):
     """Матрица поворота вокруг оси Y (угол в градусах)"""
-    angle = np.radians(angle_degrees)
-    cos_a = np.cos(angle)
-    sin_a = np.sin(angle)
-    
-    return np.array([
-        [cos_a, 0, sin_a, 0],
-        [0, 1, 0, 0],
-        [-sin_a, 0, cos_a, 0],
-        [0, 0, 0, 1]
-    ], dtype=float)
+    return _rotation_matrix(angle_degrees, 2, 0)
 
 def rotation_z_matrix(angle_degrees):
     """Матрица поворота вокруг оси Z (угол в градусах)"""
-    angle = np.radians(angle_degrees)
-    cos_a = np.cos(angle)
-    sin_a = np.sin(angle)
-    
-    return np.array([
-        [cos_a, -sin_a, 0, 0],
-        [sin_a, cos_a, 0, 0],
-        [0, 0, 1, 0],
-        [0, 0, 0, 1]
-    ], dtype=float)
+    return _rotation_matrix(angle_degrees, 0, 1)
+
+_REFLECTION_AXES = {'XY': 2, 'XZ': 1, 'YZ': 0}
 
 def reflection_matrix(plane):
-    """Матрица отражения относительно координатной плоскости"""
-    if plane == 'XY':
-        return np.array([
-            [1, 0, 0, 0],
-            [0, 1, 0, 0],
-            [0, 0, -1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-    elif plane == 'XZ':
-        return np.array([
-            [1, 0, 0, 0],
-            [0, -1, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-    elif plane == 'YZ':
-        return np.array([
-            [-1, 0, 0, 0],
-            [0, 1, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-    else:
-        raise ValueError("Plane must be 'XY', 'XZ', or 'YZ'")
\ No newline at end of file
+    """Матрица отражения относительно координатной плоскости
+    
+    plane: 'XY', 'XZ', 'YZ' или последовательность таких строк
+    """
+    planes = np.asarray(plane)
+    axes = np.empty(planes.shape, dtype=int)
+    for index, name in np.ndenumerate(planes):
+        if name not in _REFLECTION_AXES:
+            raise ValueError("Plane must be 'XY', 'XZ', or 'YZ'")
+        axes[index] = _REFLECTION_AXES[name]
+    
+    matrices, _ = _matrix_stack(np.zeros(planes.shape))
+    flat = matrices.reshape(-1, 4, 4)
+    flat[np.arange(len(flat)), axes.reshape(-1), axes.reshape(-1)] = -1.0
+    return matrices
+
+def interpolate_keyframes(keyframes, frame_count):
+    """Матрицы всех кадров анимации (frame_count, 4, 4) по ключевым кадрам
+    
+    keyframes: последовательность пар (номер кадра, матрица 4x4)
+    Между ключами перенос и растяжение интерполируются линейно, поворот -
+    сферически (slerp кватернионов); проективные ключи - поэлементно.
+    До первого и после последнего ключа матрица не меняется.
+    """
+    keyframes = sorted(((frame, np.asarray(matrix, dtype=float)) for frame, matrix in keyframes),
+                       key=lambda key: key[0])
+    if not keyframes:
+        raise ValueError("at least one keyframe is required")
+    frames = np.arange(frame_count)
+    result = np.empty((frame_count, 4, 4))
+    result[frames <= keyframes[0][0]] = keyframes[0][1]
+    result[frames >= keyframes[-1][0]] = keyframes[-1][1]
+    
+    for (start, first), (end, second) in zip(keyframes[:-1], keyframes[1:]):
+        inside = (frames >= start) & (frames < end)
+        if end > start and inside.any():
+            result[inside] = _interpolate_pair(first, second, (frames[inside] - start) / (end - start))
+    return result
+
+def _interpolate_pair(first, second, t):
+    """Матрицы между first (t = 0) и second (t = 1) для массива t"""
+    t = t[:, None, None]
+    if _classify(first) == "projective" or _classify(second) == "projective":
+        return first + (second - first) * t
+    
+    # A = R P: поворот R и симметричное растяжение P интерполируются раздельно
+    (r0, p0), (r1, p1) = _polar(first[:3, :3]), _polar(second[:3, :3])
+    matrices = np.zeros((len(t), 4, 4))
+    matrices[:, :3, :3] = _quaternion_matrix(_slerp(_quaternion(r0), _quaternion(r1), t[:, 0, 0])) @ (p0 + (p1 - p0) * t)
+    matrices[:, :3, 3] = first[:3, 3] + (second[:3, 3] - first[:3, 3]) * t[:, 0]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+def _polar(linear):
+    """Полярное разложение A = R P (R - поворот, P - симметричная матрица)"""
+    u, s, vt = np.linalg.svd(linear)
+    if np.linalg.det(u @ vt) < 0:
+        # Отражение переносится в растяжение, чтобы R оставался поворотом
+        u[:, -1] = -u[:, -1]
+        s[-1] = -s[-1]
+    return u @ vt, (vt.T * s) @ vt
+
+def _quaternion(r):
+    """Единичный кватернион (x, y, z, w) матрицы поворота (метод Бар-Ицхака)"""
+    k = np.array([
+        [r[0, 0] - r[1, 1] - r[2, 2], r[1, 0] + r[0, 1], r[2, 0] + r[0, 2], r[2, 1] - r[1, 2]],
+        [r[1, 0] + r[0, 1], r[1, 1] - r[0, 0] - r[2, 2], r[2, 1] + r[1, 2], r[0, 2] - r[2, 0]],
+        [r[2, 0] + r[0, 2], r[2, 1] + r[1, 2], r[2, 2] - r[0, 0] - r[1, 1], r[1, 0] - r[0, 1]],
+        [r[2, 1] - r[1, 2], r[0, 2] - r[2, 0], r[1, 0] - r[0, 1], r[0, 0] + r[1, 1] + r[2, 2]],
+    ]) / 3.0
+    values, vectors = np.linalg.eigh(k)
+    return vectors[:, np.argmax(values)]
+
+def _slerp(q0, q1, t):
+    """Сферическая интерполяция кватернионов для массива t -> (T, 4)"""
+    dot = q0 @ q1
+    if dot < 0:
+        q1, dot = -q1, -dot
+    if dot > 0.9995:
+        q = q0 + (q1 - q0) * t[:, None]
+        return q / np.linalg.norm(q, axis=1)[:, None]
+    theta = np.arccos(dot)
+    return (np.sin((1 - t) * theta)[:, None] * q0 + np.sin(t * theta)[:, None] * q1) / np.sin(theta)
+
+def _quaternion_matrix(q):
+    """Матрицы поворота (T, 3, 3) единичных кватернионов (T, 4)"""
+    x, y, z, w = q.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=-1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=-1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+class Transform:
+    """Преобразование 4x4 (или стопка K x 4 x 4) с информацией о своём виде
+    
+    Вид ("identity", "translation", "rotation", "scaling", "reflection",
+    "rigid", "affine", "projective") позволяет строить обратное
+    преобразование аналитически, без общего обращения матрицы.
+    """
+    RIGID_KINDS = ("identity", "translation", "rotation", "reflection", "rigid")
+    
+    def __init__(self, matrix, kind=None):
+        self.matrix = np.asarray(matrix, dtype=float)
+        if self.matrix.shape[-2:] != (4, 4):
+            raise ValueError("Transform matrix must have shape (..., 4, 4)")
+        self.kind = kind if kind is not None else _classify(self.matrix)
+    
+    @classmethod
+    def identity(cls):
+        return cls(np.eye(4), "identity")
+    
+    @classmethod
+    def translation(cls, dx, dy, dz):
+        return cls(translation_matrix(dx, dy, dz), "translation")
+    
+    @classmethod
+    def scaling(cls, sx, sy, sz):
+        return cls(scaling_matrix(sx, sy, sz), "scaling")
+    
+    @classmethod
+    def rotation_x(cls, angle_degrees):
+        return cls(rotation_x_matrix(angle_degrees), "rotation")
+    
+    @classmethod
+    def rotation_y(cls, angle_degrees):
+        return cls(rotation_y_matrix(angle_degrees), "rotation")
+    
+    @classmethod
+    def rotation_z(cls, angle_degrees):
+        return cls(rotation_z_matrix(angle_degrees), "rotation")
+    
+    @classmethod
+    def reflection(cls, plane):
+        return cls(reflection_matrix(plane), "reflection")
+    
+    def __array__(self, dtype=None, copy=None):
+        return self.matrix if dtype is None else self.matrix.astype(dtype)
+    
+    def __len__(self):
+        return 1 if self.matrix.ndim == 2 else len(self.matrix)
+    
+    def __getitem__(self, index):
+        """Отдельное преобразование из стопки"""
+        return Transform(self.matrix.reshape(-1, 4, 4)[index], self.kind)
+    
+    def __matmul__(self, other):
+        """Композиция: (self @ other) применяет сначала other, затем self"""
+        if isinstance(other, Transform):
+            return Transform(self.matrix @ other.matrix,
+                             _compose_kind(self.kind, other.kind))
+        other = np.asarray(other, dtype=float)
+        if other.shape[-2:] == (4, 4):
+            return Transform(self.matrix @ other)
+        return NotImplemented
+    
+    def __rmatmul__(self, other):
+        other = np.asarray(other, dtype=float)
+        if other.shape[-2:] == (4, 4):
+            return Transform(other @ self.matrix)
+        return NotImplemented
+    
+    def then(self, other):
+        """Композиция в порядке применения: сначала self, затем other"""
+        return (other if isinstance(other, Transform) else Transform(other)) @ self
+    
+    def inverse(self):
+        """Обратное преобразование (аналитически для известных видов)"""
+        m = self.matrix
+        kind = self.kind
+        if kind == "identity":
+            return Transform(m.copy(), kind)
+        if kind == "translation":
+            inv = m.copy()
+            inv[..., :3, 3] = -m[..., :3, 3]
+            return Transform(inv, kind)
+        if kind == "scaling":
+            inv = m.copy()
+            diagonal = np.arange(3)
+            inv[..., diagonal, diagonal] = 1.0 / m[..., diagonal, diagonal]
+            return Transform(inv, kind)
+        if kind in ("rotation", "reflection", "rigid", "affine"):
+            linear = m[..., :3, :3]
+            if kind == "affine":
+                linear_inv = np.linalg.inv(linear)
+            else:
+                # Ортогональная часть: обратная матрица равна транспонированной
+                linear_inv = np.swapaxes(linear, -1, -2)
+            inv = np.zeros_like(m)
+            inv[..., :3, :3] = linear_inv
+            inv[..., :3, 3] = -(linear_inv @ m[..., :3, 3:4])[..., 0]
+            inv[..., 3, 3] = 1.0
+            return Transform(inv, kind)
+        return Transform(np.linalg.inv(m), kind)
+    
+    def is_identity(self, tol=1e-12):
+        """Является ли преобразование (все преобразования стопки) тождественным"""
+        return self.kind == "identity" or bool(np.all(np.abs(self.matrix - np.eye(4)) <= tol))
+    
+    def is_rigid(self, tol=1e-9):
+        """Сохраняет ли преобразование расстояния (поворот, отражение, смещение)"""
+        if self.kind in self.RIGID_KINDS:
+            return True
+        if self.kind == "projective":
+            return False
+        linear = self.matrix[..., :3, :3]
+        gram = np.swapaxes(linear, -1, -2) @ linear
+        return bool(np.all(np.abs(gram - np.eye(3)) <= tol))
+    
+    def apply(self, points):
+        """Применение к массиву точек (N, 3); для стопки результат (K, N, 3)"""
+        points = np.asarray(points, dtype=float)
+        if self.matrix.ndim == 2:
+            return transform_vertex_array(points, self.matrix)
+        
+        m = self.matrix
+        result = np.einsum('...ij,nj->...ni', m[..., :3, :3], points) + m[..., None, :3, 3]
+        if self.kind == "projective":
+            w = np.einsum('...j,nj->...n', m[..., 3, :3], points) + m[..., 3, None, 3]
+            result /= w[..., None]
+        return result
+    
+    def __repr__(self):
+        shape = "" if self.matrix.ndim == 2 else f", {len(self)} matrices"
+        return f"Transform({self.kind}{shape})"
+
+def _classify(matrix):
+    """Определение вида преобразования по самой матрице"""
+    if not np.all(matrix[..., 3, :] == (0.0, 0.0, 0.0, 1.0)):
+        return "projective"
+    linear = matrix[..., :3, :3]
+    if np.all(linear == np.eye(3)):
+        return "identity" if np.all(matrix[..., :3, 3] == 0) else "translation"
+    gram = np.swapaxes(linear, -1, -2) @ linear
+    if np.allclose(gram, np.eye(3), atol=1e-12):
+        return "rigid"
+    return "affine"
+
+def _compose_kind(first, second):
+    """Вид композиции двух преобразований известных видов"""
+    if first == "identity":
+        return second
+    if second == "identity":
+        return first
+    if first == second and first in ("translation", "rotation", "scaling"):
+        return first
+    if "projective" in (first, second):
+        return "projective"
+    if first in Transform.RIGID_KINDS and second in Transform.RIGID_KINDS:
+        return "rigid"
+    return "affine"
\ No newline at end of file
@@ -1,18 +1,94 @@
+import threading
+import time
+import traceback
 import pygame
 import numpy as np
-from transformations import *
+from clipping import clip_faces, faces_inside, faces_outside, perspective_frustum
+from geometry_worker import GeometryFrame, GeometryWorker
+from polyhedron import Polyhedron
+from profiler import FrameProfiler
+from rasterizer import Rasterizer
+from scene import Scene
+from spatial import UniformGrid, box_corners, face_bounds, points_in_polygons
+from transformations import axonometric_projection, perspective_projection
+
+# Направление на наблюдателя в аксонометрической проекции: вдоль него
+# проекция вырождается (x - z = 0, y + (x + z) / 2 = 0)
+AXONOMETRIC_VIEW = np.array([-1.0, 1.0, -1.0]) / np.sqrt(3.0)
+
+# Клавиши выбора многогранников: клавиша -> (фабрика, название)
+POLYHEDRON_KEYS = {
+    pygame.K_1: (Polyhedron.create_tetrahedron, "Tetrahedron"),
+    pygame.K_2: (Polyhedron.create_hexahedron, "Hexahedron (Cube)"),
+    pygame.K_3: (Polyhedron.create_octahedron, "Octahedron"),
+    pygame.K_4: (Polyhedron.create_icosahedron, "Icosahedron"),
+    pygame.K_5: (Polyhedron.create_dodecahedron, "Dodecahedron"),
+}
+
+# С этого числа видимых граней растеризатор заливает их одним пакетом
+# (Rasterizer.fill_polygons), а не по одной
+BATCH_FILL_FACES = 64
+
+# Событие, которым поток геометрии будит основной цикл после замены буферов
+GEOMETRY_READY = pygame.event.custom_type()
+
+def polyline_runs(slot_visible):
+    """Участки подряд идущих видимых рёбер ломаных: пары (начало, конец)
+    
+    slot_visible - видимость ребра между элементами i и i + 1 плоской
+    последовательности вершин; участок (a, b) - это вершины a..b
+    """
+    padded = np.concatenate([[False], slot_visible, [False]]).astype(np.int8)
+    steps = np.diff(padded)
+    return zip(np.flatnonzero(steps == 1).tolist(), np.flatnonzero(steps == -1).tolist())
+
+def copy_into(buffer, array):
+    """Копия array: в buffer, если он подходит по форме и типу, иначе в новый массив"""
+    if buffer is None or buffer.shape != array.shape or buffer.dtype != array.dtype:
+        return np.array(array)
+    np.copyto(buffer, array)
+    return buffer
 
 class Visualizer:
-    def __init__(self, width=1000, height=700):
+    def __init__(self, width=1000, height=700, backend="pygame"):
+        """
+        backend: "pygame" - окно pygame.display;
+                 "headless" - программная растеризация в NumPy-буфер без окна
+        """
+        if backend not in ("pygame", "headless"):
+            raise ValueError("backend must be 'pygame' or 'headless'")
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("3D Polyhedron Visualizer - All Platonic Solids")
-        self.clock = pygame.time.Clock()
+        self.backend = backend
+        self.rasterizer = None
+        if backend == "headless":
+            self.screen = None
+            self.clock = None
+        else:
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption("3D Polyhedron Visualizer - All Platonic Solids")
+            self.clock = pygame.time.Clock()
         self.running = True
         self.polyhedron = None
+        self.scene = None
         self.projection_type = "axonometric"  # "axonometric" or "perspective"
         self.perspective_d = 5  # Distance for perspective projection
+        self.near_distance = 0.05  # Ближняя плоскость отсечения перед наблюдателем
+        self.cull_back_faces = True  # Отсечение нелицевых граней
+        self.engine = None  # Параллельная проекция больших сеток (ParallelEngine)
+        
+        # Время этапов кадра; enabled = False отключает замеры
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.profile_output = None  # JSON/CSV, куда сохранить замеры при выходе
+        self._overlay = None  # (время обновления, поверхности строк)
+        
+        # Политика перерисовки: "idle" - ждать событий и перерисовывать только
+        # при изменениях, "continuous" - 60 кадров в секунду всегда
+        self.redraw_mode = "idle"
+        self.idle_timeout_ms = 500  # пробуждение для проверки изменений извне
+        self.animation = None  # animation(visualizer, dt) - включает непрерывный режим
+        self._needs_present = True  # окно нужно показать заново (например, после перекрытия)
         
         # Colors
         self.BG_COLOR = (20, 20, 40)
@@ -25,18 +101,112 @@ class Visualizer:
         self.EDGE_COLOR = (255, 255, 255)
         self.VERTEX_COLOR = (255, 255, 0)
         
-        # Font for UI
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        if backend == "headless":
+            self.rasterizer = Rasterizer(width, height, self.BG_COLOR)
+            self.font = self.small_font = None
+        else:
+            # Font for UI
+            self.font = pygame.font.Font(None, 36)
+            self.small_font = pygame.font.Font(None, 24)
         
         # Current polyhedron type
         self.current_polyhedron_type = "Tetrahedron"
+        
+        # Исходная копия показанного многогранника для сброса (клон с
+        # общими топологией и уровнями детализации)
+        self._pristine = None
+        
+        # Кэш отрисовки: кадр перерисовывается только при изменении ключа
+        self._frame_key = None
+        self._frame_surface = None
+        self._face_surface = None
+        self._text_cache = {}
+        self._vertex_sprite = None
+        
+        # Выбор вершины и грани под курсором: результат последнего щелчка
+        # и индексы экранного пространства для текущего кадра
+        self.picked = None
+        self.pick_radius = 6
+        self._pick_data = None
+        
+        # Уровни детализации: грань должна занимать на экране в среднем не
+        # меньше lod_pixels_per_face пикселей; уровень меняется, только когда
+        # размер проекции уходит за порог больше чем на долю lod_hysteresis
+        self.lod_enabled = True
+        self.lod_pixels_per_face = 4.0
+        self.lod_hysteresis = 0.2
+        self.lod_level = 0
+        # Пирамида строится в фоновом потоке; пока её нет, рисуется нулевой
+        # уровень. lod_serial меняется с каждой готовой пирамидой (часть
+        # ключа кадра)
+        self.lod_serial = 0
+        self._lod_thread = None
+        
+        # Поток геометрии (GeometryWorker): изменения сетки и проекция идут
+        # в нём, а цикл отрисовки рисует последний готовый кадр
+        self.worker = None
     
     def set_polyhedron(self, polyhedron, poly_type="Unknown"):
         """Установка многогранника для отображения"""
+        # Исходная копия для сброса (копия при записи, см. Polyhedron.clone)
+        self._pristine = polyhedron.clone()
         self.polyhedron = polyhedron
+        self.scene = None
+        self.picked = None
+        self.lod_level = 0
         self.current_polyhedron_type = poly_type
     
+    def start_geometry_worker(self):
+        """Запуск потока геометрии: изменения сетки, проекция и подготовка
+        кадра выполняются в фоне, отрисовка не ждёт их"""
+        if self.worker is None:
+            on_ready = None
+            if self.backend != "headless":
+                on_ready = lambda: pygame.event.post(pygame.event.Event(GEOMETRY_READY))
+            self.worker = GeometryWorker(self, on_ready).start()
+            self.worker.request()
+        return self.worker
+    
+    def stop_geometry_worker(self):
+        """Остановка потока геометрии; возвращает сводку задержек кадров"""
+        if self.worker is None:
+            return None
+        self.worker.stop()
+        summary = self.worker.latency_summary()
+        self.worker = None
+        self.invalidate()
+        return summary
+    
+    def update_geometry(self, change, message=None):
+        """Изменение геометрии change(): сразу или в потоке геометрии, если он запущен
+        
+        С потоком геометрии сетку нельзя менять из цикла отрисовки напрямую:
+        преобразования, смена многогранника и сброс передаются сюда.
+        message - что напечатать после изменения (с его временем)
+        """
+        def run():
+            start = time.perf_counter()
+            change()
+            if message:
+                print(f"{message} ({(time.perf_counter() - start) * 1e3:.2f} ms)")
+        
+        if self.worker is None:
+            run()
+        else:
+            self.worker.submit(run)
+    
+    def sync_geometry(self):
+        """Запрос нового кадра у потока геометрии, если показанный устарел"""
+        if self.worker is not None and not self.worker.is_current(self.frame_key()):
+            self.worker.request()
+    
+    def set_scene(self, scene, scene_type="Scene"):
+        """Установка сцены из множества экземпляров для отображения"""
+        self.scene = scene
+        self.polyhedron = None
+        self.picked = None
+        self.current_polyhedron_type = scene_type
+    
     def axonometric_project(self, point):
         """Аксонометрическая проекция (изометрическая)"""
         # Изометрическая проекция
@@ -69,96 +239,697 @@ class Visualizer:
         else:
             return self.axonometric_project(point)
     
+    def axonometric_project_array(self, vertex_array):
+        """Аксонометрическая проекция массива вершин (N, 3) -> (N, 2)"""
+        return axonometric_projection(vertex_array, self.width, self.height)
+    
+    def perspective_project_array(self, vertex_array):
+        """Перспективная проекция массива вершин (N, 3) -> (N, 2)"""
+        return perspective_projection(vertex_array, self.perspective_d, self.width, self.height)
+    
+    def project_vertices(self, vertex_array):
+        """Проекция всех вершин одним вызовом NumPy
+        
+        Если задан self.engine (ParallelEngine), большие массивы проецируются
+        параллельно; результат действителен до следующей проекции
+        """
+        if self.engine is not None:
+            return self.engine.project(vertex_array, self.projection_type,
+                                       self.width, self.height, self.perspective_d)
+        if self.projection_type == "perspective":
+            return self.perspective_project_array(vertex_array)
+        else:
+            return self.axonometric_project_array(vertex_array)
+    
+    def on_screen(self, bounds, matrices=None):
+        """Может ли параллелепипед bounds (2, 3) попасть в окно
+        
+        Проецируются только его 8 углов. matrices (K, 4, 4) - проверка
+        для каждого экземпляра сцены, результат - маска (K,)
+        """
+        corners = box_corners(*bounds)
+        if matrices is None:
+            world = corners[None]
+        else:
+            world = corners @ np.swapaxes(matrices[:, :3, :3], 1, 2) + matrices[:, None, :3, 3]
+        
+        if self.projection_type == "perspective":
+            points = perspective_projection(world.reshape(-1, 3), self.perspective_d, self.width, self.height)
+            # Углы за ближней плоскостью проецируются с переворотом: такой
+            # параллелепипед не отбрасывается, если он не целиком за ней
+            depth = world[..., 2] + self.perspective_d
+            behind = np.any(depth < self.near_distance, axis=1)
+            hidden = np.all(depth < self.near_distance, axis=1)
+        else:
+            points = axonometric_projection(world.reshape(-1, 3), self.width, self.height)
+            behind = hidden = False
+        points = points.reshape(len(world), 8, 2)
+        low = points.min(axis=1)
+        high = points.max(axis=1)
+        inside = (high[:, 0] >= 0) & (low[:, 0] <= self.width) & (high[:, 1] >= 0) & (low[:, 1] <= self.height)
+        visible = (inside | behind) & ~hidden
+        return visible if matrices is not None else bool(visible[0])
+    
+    def projected_size(self, bounds):
+        """Наибольшая сторона проекции параллелепипеда bounds (2, 3) в пикселях"""
+        corners = box_corners(*bounds)
+        if self.projection_type == "perspective":
+            if np.any(corners[:, 2] + self.perspective_d <= 0):
+                return np.inf
+            points = perspective_projection(corners, self.perspective_d, self.width, self.height)
+        else:
+            points = axonometric_projection(corners, self.width, self.height)
+        return float((points.max(axis=0) - points.min(axis=0)).max())
+    
+    def _lod_for_size(self, face_counts, size):
+        """Самый подробный уровень, грани которого помещаются в размер size"""
+        budget = size * size / self.lod_pixels_per_face
+        for level, faces in enumerate(face_counts):
+            if faces <= budget:
+                return level
+        return len(face_counts) - 1
+    
+    def select_lod(self, polyhedron):
+        """Уровень детализации многогранника для текущего кадра (с гистерезисом)"""
+        if not self.lod_enabled:
+            self.lod_level = 0
+            return 0
+        size = self.projected_size(polyhedron.get_bounds())
+        shrunk = size * (1.0 - self.lod_hysteresis)
+        faces = len(polyhedron.face_offsets) - 1
+        if self.lod_level == 0 and faces <= shrunk * shrunk / self.lod_pixels_per_face:
+            # Многогранник достаточно крупный: пирамида даже не строится
+            return 0
+        
+        if not polyhedron.has_lod_pyramid():
+            self.build_lod_in_background(polyhedron)
+            self.lod_level = 0
+            return 0
+        
+        face_counts = polyhedron.lod_face_counts()
+        finest = self._lod_for_size(face_counts, size * (1.0 + self.lod_hysteresis))
+        coarsest = self._lod_for_size(face_counts, shrunk)
+        if not finest <= self.lod_level <= coarsest:
+            self.lod_level = self._lod_for_size(face_counts, size)
+        return self.lod_level
+    
+    def build_lod_in_background(self, polyhedron):
+        """Построение пирамиды уровней детализации вне цикла отрисовки и
+        потока геометрии; по готовности кадр перерисовывается"""
+        if self._lod_thread is not None and self._lod_thread.is_alive():
+            return
+        
+        def build():
+            start = time.perf_counter()
+            try:
+                polyhedron.build_lod_pyramid()
+            except Exception:
+                traceback.print_exc()
+                return
+            print(f"Level of detail pyramid built in {time.perf_counter() - start:.2f} s")
+            self.lod_serial += 1
+            if self.backend != "headless":
+                pygame.event.post(pygame.event.Event(GEOMETRY_READY))
+        
+        self._lod_thread = threading.Thread(target=build, name="lod-builder", daemon=True)
+        self._lod_thread.start()
+    
+    def frustum_planes(self):
+        """Плоскости пирамиды видимости перспективной проекции (5, 4):
+        ближняя плоскость и четыре стороны окна"""
+        return perspective_frustum(self.perspective_d, self.width, self.height, self.near_distance)
+    
+    def clip_near(self, polyhedron):
+        """Многогранник, отсечённый ближней плоскостью (или None, если от
+        него ничего не осталось)
+        
+        Сетка целиком перед плоскостью возвращается без изменений; иначе
+        грани разрезаются Polyhedron.clip, и за наблюдателем не
+        проецируется ни одна вершина.
+        """
+        near = self.frustum_planes()[0]
+        low, high = polyhedron.get_bounds()
+        if low[2] + near[3] >= 0:
+            return polyhedron
+        if high[2] + near[3] < 0:
+            return None
+        clipped = polyhedron.clip(near)
+        return clipped if len(clipped.face_offsets) > 1 else None
+    
+    def visible_face_order(self, polyhedron):
+        """Номера видимых граней в порядке от дальних к ближним
+        
+        Отсечение нелицевых граней и сортировка по глубине выполняются
+        одним векторным проходом по нормалям и центрам граней
+        """
+        normals = polyhedron.face_normals
+        centroids = polyhedron.face_centroids
+        if self.projection_type == "perspective":
+            eye = np.array([0.0, 0.0, -self.perspective_d])
+            facing = np.einsum('ij,ij->i', normals, eye - centroids)
+            depth = centroids[:, 2]
+        else:
+            facing = normals @ AXONOMETRIC_VIEW
+            depth = -(centroids @ AXONOMETRIC_VIEW)
+        
+        if self.cull_back_faces:
+            faces = np.flatnonzero(facing > 0)
+        else:
+            faces = np.arange(len(normals))
+        return faces[np.argsort(-depth[faces], kind="stable")]
+    
+    def prepare_polyhedron(self, frame=None):
+        """Геометрия кадра многогранника без отрисовки: GeometryFrame
+        
+        Проекция, порядок граней, видимые рёбра и вершины и перевод их
+        в списки для pygame. frame - заполняемый буфер (по умолчанию новый);
+        в потоке геометрии вызывается для заднего буфера
+        """
+        frame = GeometryFrame() if frame is None else frame
+        frame.key = self.frame_key()
+        frame.polyhedron = None
+        frame.label = None
+        source = self.polyhedron
+        if not source:
+            return frame
+        frame.label = self.current_polyhedron_type
+        frame.vertex_count = len(source.base_vertices)
+        frame.face_count = frame.lod_face_count = len(source.face_offsets) - 1
+        frame.lod_level = 0
+        if not self.on_screen(source.get_bounds()):
+            return frame
+        
+        # Мелкая на экране сетка рисуется упрощённым уровнем детализации
+        frame.lod_level = self.select_lod(source)
+        polyhedron = source.get_lod(frame.lod_level)
+        frame.lod_face_count = len(polyhedron.face_offsets) - 1
+        if self.projection_type == "perspective":
+            # Части за ближней плоскостью отсекаются до проекции
+            polyhedron = self.clip_near(polyhedron)
+            if polyhedron is None:
+                return frame
+        
+        # Проецируем все вершины один раз за кадр; проходы ниже берут
+        # экранные координаты по индексам граней. Буфер ParallelEngine
+        # перезаписывается следующей проекцией, поэтому копируется в кадр
+        screen_points = self.project_vertices(polyhedron.vertex_array)
+        if self.engine is not None:
+            screen_points = copy_into(frame.screen_points, screen_points)
+        face_points = screen_points[polyhedron.face_index]
+        offsets = polyhedron.face_offsets
+        if self.backend != "headless":
+            # pygame рисует из списков, растеризатор - из массивов
+            face_points = face_points.tolist()
+            offsets = offsets.tolist()
+        
+        # Видимые грани от дальних к ближним; видимы рёбра и вершины,
+        # принадлежащие хотя бы одной видимой грани
+        order = self.visible_face_order(polyhedron)
+        if self.projection_type == "perspective":
+            # Грани целиком за стороной окна не рисуются (pygame сам
+            # обрезает частично видимые)
+            planes = self.frustum_planes()[1:]
+            order = order[~faces_outside(polyhedron.vertex_array, polyhedron.face_index,
+                                         polyhedron.face_offsets, planes, faces=order)]
+        edge_visible = np.zeros(len(polyhedron.get_edges()) + 1, dtype=bool)
+        if len(order) < len(offsets) - 1:
+            visible = np.zeros(len(offsets) - 1, dtype=bool)
+            visible[order] = True
+            corners = visible[polyhedron.get_corner_faces()]
+            edge_visible[polyhedron.get_side_edges()[corners]] = True
+            vertex_points = screen_points[np.unique(polyhedron.face_index[corners])]
+        else:
+            edge_visible[:-1] = True
+            vertex_points = screen_points
+        
+        if self.backend == "headless":
+            frame.edges = polyhedron.get_edges()[edge_visible[:-1]]
+            frame.lines = None
+        else:
+            # Каждое уникальное ребро один раз: видимые участки ломаных
+            # (номер ребра -1 на стыке ломаных указывает на невидимый последний элемент)
+            strip_vertices, strip_edges = polyhedron.get_edge_strips()
+            strip_points = screen_points[strip_vertices].tolist()
+            frame.lines = [strip_points[start:end + 1]
+                           for start, end in polyline_runs(edge_visible[strip_edges])]
+            frame.edges = None
+            # Левые верхние углы изображений вершин
+            vertex_points = (vertex_points.astype(int) - 3).tolist()
+        
+        frame.polyhedron = polyhedron
+        frame.screen_points = screen_points
+        frame.face_points = face_points
+        frame.offsets = offsets
+        frame.order = order if self.backend == "headless" else order.tolist()
+        frame.vertex_points = vertex_points
+        return frame
+    
     def draw_polyhedron(self):
-        """Отрисовка многогранника"""
+        """Отрисовка многогранника
+        
+        С потоком геометрии рисуется последний готовый кадр из него,
+        иначе кадр готовится здесь же. Возвращает GeometryFrame.summary()
+        нарисованного кадра для интерфейса (или None)
+        """
+        if self.worker is not None:
+            frame = self.worker.acquire()
+            try:
+                if frame is None:
+                    return None
+                if frame.polyhedron is not None:
+                    self.draw_geometry(frame)
+                return frame.summary()
+            finally:
+                self.worker.release()
+        
         if not self.polyhedron:
+            return None
+        frame = self.prepare_polyhedron()
+        self.profiler.mark("projection")
+        if frame.polyhedron is not None:
+            self.draw_geometry(frame)
+        return frame.summary()
+    
+    def draw_geometry(self, frame):
+        """Отрисовка подготовленного кадра многогранника (GeometryFrame)"""
+        if self.backend == "headless":
+            self.rasterize_polyhedron(frame.screen_points, frame.face_points, frame.offsets,
+                                      frame.order, frame.edges, frame.vertex_points)
             return
         
-        # Создаем поверхность для полупрозрачных граней
-        face_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        # Поверхность для полупрозрачных граней (переиспользуется между кадрами)
+        face_surface = self.layer_surface()
+        face_points = frame.face_points
+        offsets = frame.offsets
         
         # Сначала рисуем грани на отдельной поверхности
-        for i, face in enumerate(self.polyhedron.faces):
-            if len(face.points) < 3:
+        for i in frame.order:
+            points_2d = face_points[offsets[i]:offsets[i + 1]]
+            if len(points_2d) < 3:
                 continue
-                
-            color = self.FACE_COLORS[i % len(self.FACE_COLORS)]
-            points_2d = [self.project_point(p) for p in face.points]
             
+            color = self.FACE_COLORS[i % len(self.FACE_COLORS)]
             # Рисуем заполненную грань на отдельной поверхности
-            if len(points_2d) >= 3:
-                pygame.draw.polygon(face_surface, color, points_2d)
+            pygame.draw.polygon(face_surface, color, points_2d)
+        self.profiler.mark("faces")
         
         # Отображаем поверхность с гранями
         self.screen.blit(face_surface, (0, 0))
+        self.profiler.mark("blit")
         
-        # Затем рисуем рёбра поверх граней
-        for face in self.polyhedron.faces:
-            points_2d = [self.project_point(p) for p in face.points]
-            if len(points_2d) >= 2:
-                # Рисуем контур грани
-                for j in range(len(points_2d)):
-                    start = points_2d[j]
-                    end = points_2d[(j + 1) % len(points_2d)]
-                    pygame.draw.line(self.screen, self.EDGE_COLOR, start, end, 2)
-        
-        # И наконец рисуем вершины поверх всего
-        for vertex in self.polyhedron.vertices:
-            x, y = self.project_point(vertex)
-            pygame.draw.circle(self.screen, self.VERTEX_COLOR, (int(x), int(y)), 3)
-    
-    def draw_ui(self):
-        """Отрисовка пользовательского интерфейса"""
-        # Информация о многограннике
+        # Затем рисуем рёбра поверх граней, видимые участки ломаных -
+        # одним вызовом draw.lines
+        for points_2d in frame.lines:
+            pygame.draw.lines(self.screen, self.EDGE_COLOR, False, points_2d, 2)
+        
+        # И наконец рисуем вершины поверх всего (одним вызовом blits)
+        sprite = self.vertex_sprite()
+        self.screen.blits([(sprite, point) for point in frame.vertex_points], doreturn=False)
+        self.profiler.mark("edges")
+    
+    def vertex_sprite(self):
+        """Изображение вершины (круг радиуса 3), создаётся один раз"""
+        if self._vertex_sprite is None:
+            self._vertex_sprite = pygame.Surface((7, 7), pygame.SRCALPHA)
+            pygame.draw.circle(self._vertex_sprite, self.VERTEX_COLOR, (3, 3), 3)
+        return self._vertex_sprite
+    
+    def rasterize_polyhedron(self, screen_points, face_points, offsets, order, edges, vertex_points):
+        """Отрисовка многогранника программным растеризатором (те же правила)"""
+        raster = self.rasterizer
+        raster.clear_face_layer()
+        if len(order) >= BATCH_FILL_FACES:
+            # Все грани одним проходом по строкам развёртки
+            palette = np.array(self.FACE_COLORS, dtype=np.uint8)
+            raster.fill_polygons(face_points, offsets, order, palette[np.asarray(order) % len(palette)])
+        else:
+            for i in order:
+                points_2d = face_points[offsets[i]:offsets[i + 1]]
+                if len(points_2d) >= 3:
+                    raster.fill_polygon(points_2d, self.FACE_COLORS[i % len(self.FACE_COLORS)])
+        self.profiler.mark("faces")
+        raster.composite_face_layer()
+        self.profiler.mark("blit")
+        
+        raster.draw_segments(screen_points[edges[:, 0]], screen_points[edges[:, 1]], self.EDGE_COLOR, 2)
+        raster.draw_circles(vertex_points, 3, self.VERTEX_COLOR)
+        self.profiler.mark("edges")
+    
+    def draw_scene(self):
+        """Отрисовка всех экземпляров сцены (пакетно по каждой сетке;
+        экземпляры на ближней плоскости отсекаются по одному)"""
+        if not self.scene:
+            return
+        
+        headless = self.backend == "headless"
+        if headless:
+            self.rasterizer.clear_face_layer()
+            face_surface = None
+        else:
+            face_surface = self.layer_surface()
+        outlines = []
+        
+        near = self.frustum_planes()[0] if self.projection_type == "perspective" else None
+        for name, mesh in self.scene:
+            # Экземпляры вне окна отбрасываются по параллелепипеду сетки;
+            # остальные преобразуются и проецируются одним вызовом
+            instances = np.flatnonzero(self.on_screen(mesh.get_bounds(), self.scene.transforms[name]))
+            if len(instances) == 0:
+                continue
+            world = self.scene.world_vertices(name, instances)
+            crossing = np.zeros(len(world), dtype=bool)
+            if near is not None:
+                # Экземпляры, пересекающие ближнюю плоскость, отсекаются по
+                # одному, как многогранник в draw_polyhedron
+                crossing = world[..., 2].min(axis=1) + near[3] < 0
+            front = world[~crossing]
+            if len(front):
+                count, vertex_count = front.shape[:2]
+                screen_points = self.project_vertices(front.reshape(-1, 3)).reshape(count, vertex_count, 2)
+                self.profiler.mark("projection")
+                self._draw_instances(screen_points, mesh, None, face_surface, outlines)
+            for instance in world[crossing]:
+                vertices, face_index, face_offsets, faces = clip_faces(
+                    instance, mesh.face_index, mesh.face_offsets, near)
+                if len(faces) == 0:
+                    continue
+                clipped = Polyhedron.from_arrays(vertices, face_index, face_offsets)
+                screen_points = self.project_vertices(clipped.vertex_array)[None]
+                self.profiler.mark("projection")
+                self._draw_instances(screen_points, clipped, faces, face_surface, outlines)
+        
+        if headless:
+            self.rasterizer.composite_face_layer()
+            self.profiler.mark("blit")
+            for starts, ends in outlines:
+                self.rasterizer.draw_segments(starts, ends, self.EDGE_COLOR, 1)
+            self.profiler.mark("edges")
+            return
+        
+        self.screen.blit(face_surface, (0, 0))
+        self.profiler.mark("blit")
+        for points_2d in outlines:
+            pygame.draw.lines(self.screen, self.EDGE_COLOR, False, points_2d, 1)
+        self.profiler.mark("edges")
+    
+    def _draw_instances(self, screen_points, mesh, faces, face_surface, outlines):
+        """Грани экземпляров сетки (экранные точки (K, N, 2)) в слой граней,
+        их рёбра - в outlines (отрезки для растеризатора или ломаные)
+        
+        faces: номер исходной грани для каждой грани mesh (цвет отсечённых
+        граней), None - грани те же
+        """
+        headless = self.backend == "headless"
+        offsets = mesh.face_offsets.tolist()
+        colors = range(len(offsets) - 1) if faces is None else faces.tolist()
+        for instance_points in screen_points[:, mesh.face_index].tolist():
+            for i, face in enumerate(colors):
+                points_2d = instance_points[offsets[i]:offsets[i + 1]]
+                color = self.FACE_COLORS[face % len(self.FACE_COLORS)]
+                if headless:
+                    self.rasterizer.fill_polygon(points_2d, color)
+                else:
+                    pygame.draw.polygon(face_surface, color, points_2d)
+        self.profiler.mark("faces")
+        
+        # Уникальные рёбра всех экземпляров: отрезки для растеризатора
+        # или ломаные сетки для draw.lines
+        if headless:
+            edges = mesh.get_edges()
+            outlines.append((screen_points[:, edges[:, 0]], screen_points[:, edges[:, 1]]))
+        else:
+            strip_vertices, strip_edges = mesh.get_edge_strips()
+            runs = list(polyline_runs(strip_edges >= 0))
+            for strip_points in screen_points[:, strip_vertices].tolist():
+                outlines.extend(strip_points[start:end + 1] for start, end in runs)
+        self.profiler.mark("edges")
+    
+    def pick(self, x, y):
+        """Вершина и грань под точкой окна (x, y): пара номеров или None
+        
+        Грань - ближайшая к наблюдателю из видимых граней, содержащих точку;
+        вершина - ближайшая видимая в пределах pick_radius пикселей.
+        Индексы экранного пространства строятся один раз на кадр, сам
+        запрос просматривает несколько ячеек сетки.
+        """
+        data = self.pick_index()
+        if data is None:
+            return None, None
+        screen_points, face_grid, vertex_grid, vertices, rank = data
+        polyhedron = self.polyhedron
+        point = np.array([x, y], dtype=float)
+        
+        face = None
+        candidates = face_grid.query_point(point)
+        if len(candidates):
+            candidates = rank[0][candidates]
+            inside = points_in_polygons(point, screen_points, polyhedron.face_index,
+                                        polyhedron.face_offsets, candidates)
+            if inside.any():
+                hits = candidates[inside]
+                face = int(hits[np.argmax(rank[1][hits])])
+        
+        vertex = None
+        radius = self.pick_radius
+        candidates = vertices[vertex_grid.query_box(point - radius, point + radius)]
+        if len(candidates):
+            distance = np.hypot(*(screen_points[candidates] - point).T)
+            nearest = np.argmin(distance)
+            if distance[nearest] <= radius:
+                vertex = int(candidates[nearest])
+        return vertex, face
+    
+    def pick_at(self, x, y):
+        """Выбор под точкой окна с выводом результата (обработчик щелчка)"""
+        start = time.perf_counter()
+        self.picked = self.pick(x, y)
+        print(f"Picked vertex {self.picked[0]}, face {self.picked[1]} "
+              f"({(time.perf_counter() - start) * 1e3:.3f} ms)")
+        self.invalidate()
+    
+    def pick_index(self):
+        """Экранные индексы для pick (строятся заново после изменения кадра)"""
+        if not self.polyhedron:
+            return None
+        key = self.frame_key()
+        if self._pick_data is not None and self._pick_data[0] == key:
+            return self._pick_data[1]
+        
+        polyhedron = self.polyhedron
+        screen_points = np.array(self.project_vertices(polyhedron.vertex_array))
+        order = self.visible_face_order(polyhedron)
+        if self.projection_type == "perspective":
+            # Грани, задевающие ближнюю плоскость, проецируются с переворотом
+            order = order[faces_inside(polyhedron.vertex_array, polyhedron.face_index,
+                                       polyhedron.face_offsets, self.frustum_planes()[:1], faces=order)]
+        low, high = face_bounds(screen_points, polyhedron.face_index, polyhedron.face_offsets)
+        order = order[np.all(np.isfinite(low[order]) & np.isfinite(high[order]), axis=1)]
+        # Положение грани в порядке отрисовки: чем больше, тем ближе
+        depth_rank = np.full(len(low), -1)
+        depth_rank[order] = np.arange(len(order))
+        
+        visible = np.zeros(len(low), dtype=bool)
+        visible[order] = True
+        used = np.zeros(len(screen_points), dtype=bool)
+        used[polyhedron.face_index[visible[polyhedron.get_corner_faces()]]] = True
+        vertices = np.flatnonzero(used)
+        vertex_points = screen_points[vertices]
+        
+        data = (screen_points, UniformGrid(low[order], high[order]),
+                UniformGrid(vertex_points, vertex_points), vertices, (order, depth_rank))
+        self._pick_data = (key, data)
+        return data
+    
+    def layer_surface(self):
+        """Прозрачная поверхность размером с окно (создаётся один раз на размер)"""
+        size = (self.width, self.height)
+        if self._face_surface is None or self._face_surface.get_size() != size:
+            self._face_surface = pygame.Surface(size, pygame.SRCALPHA)
+        else:
+            self._face_surface.fill((0, 0, 0, 0))
+        return self._face_surface
+    
+    def render_text(self, text, color):
+        """Отрисовка строки шрифтом UI с кэшированием готовых поверхностей"""
+        key = (text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 256:
+                self._text_cache.clear()
+            surface = self.small_font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+    
+    def frame_key(self):
+        """Всё, от чего зависит изображение кадра"""
         if self.polyhedron:
-            poly_info = f"{self.current_polyhedron_type} - V: {len(self.polyhedron.vertices)} F: {len(self.polyhedron.faces)}"
-            info_text = self.small_font.render(poly_info, True, (255, 255, 255))
+            geometry = (self.polyhedron, self.polyhedron.version)
+        elif self.scene:
+            geometry = (self.scene, self.scene.version,
+                        tuple(mesh.version for mesh in self.scene.meshes.values()))
+        else:
+            geometry = None
+        return (geometry, self.projection_type, self.perspective_d, self.cull_back_faces,
+                self.width, self.height, self.current_polyhedron_type, self.lod_enabled, self.lod_serial)
+    
+    def display_key(self):
+        """Ключ показанного изображения: frame_key и номер кадра потока геометрии"""
+        key = self.frame_key()
+        if self.worker is not None:
+            key = (key, self.worker.serial)
+        return key
+    
+    def invalidate(self):
+        """Принудительная перерисовка следующего кадра"""
+        self._frame_key = None
+    
+    def draw_frame(self):
+        """Отрисовка кадра; если ничего не изменилось, используется готовый кадр"""
+        self.sync_geometry()
+        key = self.display_key()
+        headless = self.backend == "headless"
+        if key == self._frame_key:
+            if not headless:
+                self.screen.blit(self._frame_surface, (0, 0))
+            self.profiler.mark("blit")
+            return
+        
+        # Очистка экрана
+        if headless:
+            self.rasterizer.clear()
+        else:
+            self.screen.fill(self.BG_COLOR)
+        self.profiler.mark("blit")
+        
+        # Отрисовка
+        summary = self.draw_polyhedron()
+        self.draw_scene()
+        self.draw_ui(summary)
+        self.profiler.mark("ui")
+        
+        if not headless:
+            size = (self.width, self.height)
+            if self._frame_surface is None or self._frame_surface.get_size() != size:
+                self._frame_surface = pygame.Surface(size)
+            self._frame_surface.blit(self.screen, (0, 0))
+        self._frame_key = key
+        self.profiler.mark("blit")
+    
+    def render_frame(self):
+        """Отрисовка одного кадра без ограничения частоты; возвращает массив RGBA"""
+        self.draw_frame()
+        if self.backend == "headless":
+            return self.rasterizer.to_array()
+        return np.dstack([pygame.surfarray.array3d(self.screen).swapaxes(0, 1),
+                          np.full((self.height, self.width), 255, dtype=np.uint8)])
+    
+    def save_frame(self, path):
+        """Сохранение текущего кадра в PNG"""
+        if self.backend == "headless":
+            self.rasterizer.save_png(path)
+        else:
+            pygame.image.save(self.screen, path)
+    
+    def measure_fps(self, frames=100, cached=False):
+        """Пропускная способность отрисовки в кадрах в секунду (без clock.tick)
+        
+        cached=False перерисовывает каждый кадр полностью, cached=True
+        измеряет статичные кадры, отдаваемые из кэша
+        """
+        start = time.perf_counter()
+        for _ in range(frames):
+            if not cached:
+                self.invalidate()
+            self.draw_frame()
+        return frames / (time.perf_counter() - start)
+    
+    def draw_profiler_overlay(self):
+        """Замеры кадров поверх изображения (текст обновляется 4 раза в секунду)"""
+        now = time.perf_counter()
+        if self._overlay is None or now - self._overlay[0] > 0.25:
+            lines = self.profiler.overlay_lines() if self.profiler.enabled else ["Profiler disabled"]
+            summary = self.worker.latency_summary() if self.worker is not None else None
+            if summary:
+                latency = summary["latency_ms"]
+                lines.append(f"Geometry latency p50 {latency['p50']:.1f} p95 {latency['p95']:.1f} "
+                             f"max {latency['max']:.1f} ms, prepare {summary['prepare_ms']:.1f} ms")
+            self._overlay = (now, [self.small_font.render(line, True, (120, 255, 120)) for line in lines])
+        
+        surfaces = self._overlay[1]
+        width = max(surface.get_width() for surface in surfaces)
+        x = self.width - width - 10
+        self.screen.fill((0, 0, 0), (x - 5, 5, width + 10, len(surfaces) * 20 + 10))
+        for i, surface in enumerate(surfaces):
+            self.screen.blit(surface, (x, 10 + i * 20))
+    
+    def draw_ui(self, summary=None):
+        """Отрисовка пользовательского интерфейса
+        
+        summary - GeometryFrame.summary() нарисованного кадра многогранника:
+        подпись берётся из него, а не из многогранника, который поток
+        геометрии может менять во время отрисовки
+        """
+        if self.backend == "headless":
+            return
+        
+        # Информация о многограннике
+        scene = self.scene
+        if summary is not None:
+            label, vertex_count, face_count, lod_level, lod_face_count = summary
+            poly_info = f"{label} - V: {vertex_count} F: {face_count}"
+            if lod_level:
+                poly_info += f" LOD {lod_level}: {lod_face_count} F"
+            info_text = self.render_text(poly_info, (255, 255, 255))
+            self.screen.blit(info_text, (10, 10))
+        elif scene:
+            scene_info = f"{self.current_polyhedron_type} - Instances: {scene.instance_count()} F: {scene.face_count()}"
+            info_text = self.render_text(scene_info, (255, 255, 255))
             self.screen.blit(info_text, (10, 10))
         
         # Информация о проекции
-        proj_text = self.small_font.render(f"Projection: {self.projection_type.upper()}", True, (255, 255, 255))
+        proj_text = self.render_text(f"Projection: {self.projection_type.upper()}", (255, 255, 255))
         self.screen.blit(proj_text, (10, 35))
         
+        # Выбранные щелчком вершина и грань
+        if self.picked is not None:
+            vertex, face = self.picked
+            pick_text = self.render_text(f"Picked: vertex {vertex} face {face}", (255, 255, 0))
+            self.screen.blit(pick_text, (10, 60))
+        
         # Управление
         controls = [
             "Controls:",
-            "1-Tetrahedron 2-Cube 3-Octahedron 4-Icosahedron 5-Dodecahedron",
-            "P-Perspective A-Axonometric",
-            "R-Reset Transformations ESC-Exit"
+            "1-Tetrahedron 2-Cube 3-Octahedron 4-Icosahedron 5-Dodecahedron 6-Swarm",
+            "P-Perspective A-Axonometric C-Back-face culling",
+            "R-Reset Transformations F-Frame profiler L-Level of detail Click-Pick ESC-Exit"
         ]
         
         for i, text in enumerate(controls):
-            control_text = self.small_font.render(text, True, (200, 200, 100))
+            control_text = self.render_text(text, (200, 200, 100))
             self.screen.blit(control_text, (10, self.height - 120 + i * 20))
     
-    def handle_events(self):
-        """Обработка событий"""
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        """Обработка событий (по умолчанию - всех событий из очереди)"""
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 self.running = False
             
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self._needs_present = True
+            
+            # Выбор вершины и грани под курсором
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.polyhedron:
+                self.update_geometry(lambda pos=event.pos: self.pick_at(*pos))
+            
             elif event.type == pygame.KEYDOWN:
-                # Смена многогранников
-                if event.key == pygame.K_1:
-                    from polyhedron import Polyhedron
-                    self.set_polyhedron(Polyhedron.create_tetrahedron(), "Tetrahedron")
-                    print("Switched to Tetrahedron")
-                elif event.key == pygame.K_2:
-                    from polyhedron import Polyhedron
-                    self.set_polyhedron(Polyhedron.create_hexahedron(), "Hexahedron (Cube)")
-                    print("Switched to Hexahedron")
-                elif event.key == pygame.K_3:
-                    from polyhedron import Polyhedron
-                    self.set_polyhedron(Polyhedron.create_octahedron(), "Octahedron")
-                    print("Switched to Octahedron")
-                elif event.key == pygame.K_4:
-                    from polyhedron import Polyhedron
-                    self.set_polyhedron(Polyhedron.create_icosahedron(), "Icosahedron")
-                    print("Switched to Icosahedron")
-                elif event.key == pygame.K_5:
-                    from polyhedron import Polyhedron
-                    self.set_polyhedron(Polyhedron.create_dodecahedron(), "Dodecahedron")
-                    print("Switched to Dodecahedron")
+                # Смена многогранников (фабрики отдают копии готовых прототипов)
+                if event.key in POLYHEDRON_KEYS:
+                    factory, name = POLYHEDRON_KEYS[event.key]
+                    self.update_geometry(lambda factory=factory, name=name: self.set_polyhedron(factory(), name),
+                                         f"Switched to {name}")
+                elif event.key == pygame.K_6:
+                    self.update_geometry(lambda: self.set_scene(Scene.create_platonic_swarm(), "Platonic Swarm"),
+                                         "Switched to Platonic Swarm")
                 
                 # Смена проекций
                 elif event.key == pygame.K_p:
@@ -168,46 +939,116 @@ class Visualizer:
                     self.projection_type = "axonometric"
                     print("Switched to Axonometric projection")
                 
+                # Отсечение нелицевых граней
+                elif event.key == pygame.K_c:
+                    self.cull_back_faces = not self.cull_back_faces
+                    print(f"Back-face culling {'on' if self.cull_back_faces else 'off'}")
+                
+                # Уровни детализации
+                elif event.key == pygame.K_l:
+                    self.lod_enabled = not self.lod_enabled
+                    print(f"Level of detail {'on' if self.lod_enabled else 'off'}")
+                
+                # Оверлей замеров кадра
+                elif event.key == pygame.K_f:
+                    self.show_profiler = not self.show_profiler
+                
                 # Сброс преобразований
                 elif event.key == pygame.K_r and self.polyhedron:
-                    self.reset_polyhedron()
+                    self.update_geometry(self.reset_polyhedron)
                 
                 # Выход
                 elif event.key == pygame.K_ESCAPE:
                     self.running = False
     
     def reset_polyhedron(self):
-        """Сброс многогранника к исходному состоянию"""
-        from polyhedron import Polyhedron
+        """Сброс многогранника к исходному состоянию
         
+        Пока исходные вершины не менялись (общие данные исходной геометрии
+        с копией из set_polyhedron), сбрасывается только матрица; иначе
+        показывается клон исходной копии. Топология и пирамида уровней
+        детализации в обоих случаях не строятся заново.
+        """
         poly_type = self.current_polyhedron_type
-        if "Tetrahedron" in poly_type:
-            self.set_polyhedron(Polyhedron.create_tetrahedron(), "Tetrahedron")
-        elif "Hexahedron" in poly_type:
-            self.set_polyhedron(Polyhedron.create_hexahedron(), "Hexahedron (Cube)")
-        elif "Octahedron" in poly_type:
-            self.set_polyhedron(Polyhedron.create_octahedron(), "Octahedron")
-        elif "Icosahedron" in poly_type:
-            self.set_polyhedron(Polyhedron.create_icosahedron(), "Icosahedron")
-        elif "Dodecahedron" in poly_type:
-            self.set_polyhedron(Polyhedron.create_dodecahedron(), "Dodecahedron")
+        if self.polyhedron._base_data is self._pristine._base_data:
+            self.polyhedron.reset_transform()
+        else:
+            self.set_polyhedron(self._pristine.clone(), poly_type)
         
         print(f"Reset {poly_type}")
     
-    def run(self):
-        """Основной цикл приложения"""
-        while self.running:
-            self.handle_events()
+    def needs_redraw(self):
+        """Изменилось ли что-либо, что требует показать новый кадр"""
+        return self._needs_present or self.show_profiler or self.display_key() != self._frame_key
+    
+    def run(self, max_frames=None, mode=None):
+        """Основной цикл приложения
+        
+        mode: "idle" - цикл спит в pygame.event.wait и рисует кадр, только
+              когда событие изменило состояние (смена многогранника, проекции,
+              сброс, преобразование); "continuous" - кадр каждые 1/60 с.
+              По умолчанию self.redraw_mode; при заданной self.animation
+              цикл работает непрерывно.
+              С потоком геометрии (start_geometry_worker) анимация и
+              изменения сетки выполняются в нём, а цикл рисует последний
+              готовый кадр, не дожидаясь их.
+        max_frames: завершиться после указанного числа показанных кадров
+        
+        Цикл работает с окном pygame; без окна (backend="headless") кадры
+        рисуются вызовом draw_frame().
+        """
+        if self.backend == "headless":
+            raise RuntimeError("run() needs the pygame backend; draw headless frames with draw_frame()")
+        mode = mode or self.redraw_mode
+        frames = 0
+        profiler = self.profiler
+        last = time.perf_counter()
+        while self.running and (max_frames is None or frames < max_frames):
+            profiler.begin_frame()
+            continuous = mode == "continuous" or self.animation is not None
+            if continuous:
+                events = pygame.event.get()
+            else:
+                # Ожидание без нагрузки на процессор; тайм-аут позволяет заметить
+                # изменения сетки извне и обновлять оверлей замеров
+                timeout = 250 if self.show_profiler else self.idle_timeout_ms
+                events = [pygame.event.wait(timeout)] + pygame.event.get()
+                profiler.mark("wait")
+            self.handle_events(events)
             
-            # Очистка экрана
-            self.screen.fill(self.BG_COLOR)
+            now = time.perf_counter()
+            if self.animation is not None:
+                self.update_geometry(lambda dt=now - last: self.animation(self, dt))
+            last = now
+            self.sync_geometry()
+            profiler.mark("events")
+            
+            if not continuous and not self.needs_redraw():
+                profiler.discard_frame()
+                continue
             
-            # Отрисовка
-            self.draw_polyhedron()
-            self.draw_ui()
+            # Отрисовка (из кэша, если кадр не изменился)
+            self.draw_frame()
+            if self.show_profiler:
+                self.draw_profiler_overlay()
+                profiler.mark("ui")
             
             # Обновление экрана
             pygame.display.flip()
-            self.clock.tick(60)
+            self._needs_present = False
+            profiler.mark("flip")
+            frames += 1
+            if continuous:
+                self.clock.tick(60)
+                profiler.mark("wait")
+            profiler.end_frame()
         
+        if self.profile_output and profiler.count:
+            profiler.export(self.profile_output)
+            print(f"Frame profile written to {self.profile_output}")
+        summary = self.stop_geometry_worker()
+        if summary:
+            latency = summary["latency_ms"]
+            print(f"Geometry latency over {summary['frames']} frames: p50 {latency['p50']:.1f} ms, "
+                  f"p95 {latency['p95']:.1f} ms, max {latency['max']:.1f} ms")
         pygame.quit()
\ No newline at end of file